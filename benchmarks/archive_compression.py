@@ -0,0 +1,101 @@
+#
+# Copyright 2018-2020 IBM Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Measures the throughput of each compression of dependency archives.
+
+Synthetic dependency trees are archived with each of elyra.util.archive's compressions and the
+throughput (MB of files archived per second) and compression ratio are reported.  The trees
+consist of source code and CSV files ('text'), already compressed files such as .parquet and
+.png files ('compressed'), or an even mix of both ('mixed').
+
+    python benchmarks/archive_compression.py [--size MB] [--files N] [--repeat R]
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from elyra.util.archive import COMPRESSIONS, write_archive
+
+TEXT_EXTENSIONS = ['.py', '.csv', '.ipynb']
+COMPRESSED_EXTENSIONS = ['.parquet', '.png', '.zip']
+
+
+def create_tree(tree_dir, kind, size, files):
+    rng = random.Random(0)
+    words = ['alpha', 'beta', 'gamma', 'delta', 'epsilon', '0.125', '42', 'True', 'None', 'print', 'import']
+    lines = [','.join(rng.choice(words) + str(rng.randint(0, 999)) for _ in range(8)).encode() + b'\n'
+             for _ in range(4096)]
+    for i in range(files):
+        compressed = kind == 'compressed' or (kind == 'mixed' and i % 2)
+        extension = rng.choice(COMPRESSED_EXTENSIONS if compressed else TEXT_EXTENSIONS)
+        file_path = os.path.join(tree_dir, 'dir-{}'.format(i % 10), 'file-{}{}'.format(i, extension))
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        file_size = size // files
+        with open(file_path, 'wb') as f:
+            if compressed:
+                f.write(os.urandom(file_size))
+            else:
+                text = b''.join(rng.choice(lines) for _ in range(file_size // len(lines[0]) + 1))
+                f.write(text[:file_size])
+
+
+class _CountingWriter(object):
+    size = 0
+
+    def write(self, data):
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+
+def measure(tree_dir, compression, repeat):
+    best = None
+    for _ in range(repeat):
+        writer = _CountingWriter()
+        start = time.perf_counter()
+        write_archive(writer, tree_dir, recursive=True, compression=compression)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, writer.size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=256, help='size of each dependency tree in MB')
+    parser.add_argument('--files', type=int, default=200, help='number of files in each dependency tree')
+    parser.add_argument('--repeat', type=int, default=3, help='number of times each tree is archived (best is kept)')
+    args = parser.parse_args()
+
+    size = args.size * 1000 * 1000
+    print("Archiving {} MB dependency trees of {} files on {} cores:".format(args.size, args.files, os.cpu_count()))
+    for kind in ['text', 'compressed', 'mixed']:
+        tree_dir = tempfile.mkdtemp(prefix='elyra-benchmark-')
+        try:
+            create_tree(tree_dir, kind, size, args.files)
+            for compression in COMPRESSIONS:
+                elapsed, archive_size = measure(tree_dir, compression, args.repeat)
+                print("  {:<11} {:<14} {:>8.1f} MB/s   ratio {:>5.2f}".
+                      format(kind, compression, size / elapsed / 1000 / 1000, size / archive_size))
+        finally:
+            shutil.rmtree(tree_dir)
+
+
+if __name__ == '__main__':
+    main()
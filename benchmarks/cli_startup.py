@@ -0,0 +1,81 @@
+#
+# Copyright 2018-2020 IBM Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Measures the cold-start import cost of the elyra-metadata CLI.
+
+Imports the CLI's module in a fresh interpreter using 'python -X importtime' and reports the
+cumulative import time of the best run.  Exits with a non-zero status if that time exceeds the
+budget or if any of the server's dependencies (notebook, tornado, kfp, ...) were imported.
+
+    python benchmarks/cli_startup.py [--budget MS] [--repeat R]
+"""
+import argparse
+import re
+import subprocess
+import sys
+
+CLI_MODULE = 'elyra.metadata.metadata_app'
+# Dependencies of the server extension and pipeline processors that the CLI must not import.
+FORBIDDEN_MODULES = ['notebook', 'tornado', 'kfp', 'kubernetes', 'minio', 'elyra.pipeline', 'elyra.scheduler']
+
+IMPORT_TIME_LINE = re.compile(r'^import time:\s+\d+ \|\s+(\d+) \|\s+(\S+)$')
+
+
+def measure_import():
+    """Returns the cumulative import time (in microseconds) of the CLI module and the set of
+       modules imported along the way.
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import {}'.format(CLI_MODULE)],
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    if result.returncode != 0:
+        raise RuntimeError("Unable to import '{}':\n{}".format(CLI_MODULE, result.stderr))
+
+    # The CLI module is reported last, its cumulative time covering everything it imported.
+    total = 0
+    modules = set()
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match is not None:
+            total, module = int(match.group(1)), match.group(2)
+            modules.add(module)
+    return total, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--budget', type=float, default=250.0, help='import time budget in milliseconds')
+    parser.add_argument('--repeat', type=int, default=5, help='number of runs (best run is reported)')
+    args = parser.parse_args()
+
+    runs = [measure_import() for _ in range(args.repeat)]
+    best = min(total for total, _ in runs) / 1000
+    modules = runs[0][1]
+    forbidden = sorted(module for module in modules
+                       if any(module == name or module.startswith(name + '.') for name in FORBIDDEN_MODULES))
+
+    print("Importing {} ({} modules), best of {} runs: {:.1f} ms (budget {:.1f} ms)".
+          format(CLI_MODULE, len(modules), args.repeat, best, args.budget))
+    failed = False
+    if forbidden:
+        print("  FAIL: server dependencies were imported: {}".format(", ".join(forbidden)))
+        failed = True
+    if best > args.budget:
+        print("  FAIL: import time exceeds the budget by {:.1f} ms".format(best - args.budget))
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
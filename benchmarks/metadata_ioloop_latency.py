@@ -0,0 +1,118 @@
+#
+# Copyright 2018-2020 IBM Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Measures how metadata requests affect the responsiveness of the server's IOLoop.
+
+Concurrent clients repeatedly list a namespace of code snippets while a heartbeat, standing in for
+kernel messaging, measures how late the IOLoop runs its callbacks.  The listings are performed as
+the metadata handlers once did (synchronously on the IOLoop) and as they now do (on the
+MetadataExecutor's threads).
+
+    python benchmarks/metadata_ioloop_latency.py [--instances N] [--clients C] [--requests R]
+"""
+import argparse
+import asyncio
+import copy
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from tornado.ioloop import IOLoop
+
+NAMESPACE = 'code-snippets'
+HEARTBEAT_INTERVAL = 0.005  # seconds
+
+snippet_json = {
+    'schema_name': 'code-snippet',
+    'display_name': 'Snippet',
+    'metadata': {
+        'description': 'A code snippet used to measure metadata listings',
+        'language': 'Python',
+        'code': ['print("line {}")'.format(i) for i in range(200)]
+    }
+}
+
+
+def create_instances(data_dir, count):
+    metadata_dir = os.path.join(data_dir, 'metadata', NAMESPACE)
+    os.makedirs(metadata_dir)
+    for i in range(count):
+        instance_json = copy.deepcopy(snippet_json)
+        instance_json['display_name'] = 'Snippet {}'.format(i)
+        with open(os.path.join(metadata_dir, 'snippet-{}.json'.format(i)), 'w') as f:
+            json.dump(instance_json, f)
+
+
+def list_instances():
+    from elyra.metadata import MetadataManager
+    instances, _ = MetadataManager(namespace=NAMESPACE).get_page()
+    return {metadata.name: metadata.to_dict() for metadata in instances}
+
+
+async def measure(use_executor, clients, requests):
+    from elyra.metadata.handlers import MetadataExecutor
+
+    lags = []
+    done = asyncio.Event()
+
+    async def heartbeat():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            lags.append(time.perf_counter() - start - HEARTBEAT_INTERVAL)
+
+    async def client():
+        for _ in range(requests):
+            if use_executor:
+                await MetadataExecutor.instance().run(list_instances)
+            else:
+                list_instances()
+                await asyncio.sleep(0)
+
+    heartbeat_task = asyncio.ensure_future(heartbeat())
+    start = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(clients)])
+    elapsed = time.perf_counter() - start
+    done.set()
+    await heartbeat_task
+    return elapsed, sorted(lags)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--instances', type=int, default=500, help='number of code snippets in the namespace')
+    parser.add_argument('--clients', type=int, default=8, help='number of concurrent clients')
+    parser.add_argument('--requests', type=int, default=5, help='number of listings requested per client')
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix='elyra-benchmark-')
+    os.environ['JUPYTER_DATA_DIR'] = data_dir
+    try:
+        create_instances(data_dir, args.instances)
+        print("{} clients each listing {} '{}' instances {} times:".
+              format(args.clients, args.instances, NAMESPACE, args.requests))
+        for label, use_executor in [('on the IOLoop (blocking)', False), ('on the MetadataExecutor', True)]:
+            elapsed, lags = IOLoop.current().run_sync(lambda: measure(use_executor, args.clients, args.requests))
+            print("  {:<28} total {:>7.2f} s   IOLoop lag p50 {:>7.1f} ms  p99 {:>7.1f} ms  max {:>7.1f} ms".
+                  format(label, elapsed, lags[len(lags) // 2] * 1000, lags[int(len(lags) * 0.99)] * 1000,
+                         lags[-1] * 1000))
+    finally:
+        shutil.rmtree(data_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+#
+# Copyright 2018-2020 IBM Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Measures the per-instance cost of metadata validation.
+
+Compares validating each instance via jsonschema.validate(), which builds and checks a new
+validator on every call, against the compiled validators cached by the SchemaManager.
+
+    python benchmarks/metadata_validation.py [--instances N] [--repeat R]
+"""
+import argparse
+import glob
+import io
+import json
+import os
+import timeit
+
+from jsonschema import validate, draft7_format_checker
+from jsonschema.exceptions import best_match
+
+from elyra.metadata import SchemaManager
+
+NAMESPACE = 'runtime-images'
+SCHEMA_NAME = 'runtime-image'
+INSTANCES_DIR = os.path.join(os.path.dirname(__file__), '..', 'etc', 'config', 'metadata', NAMESPACE)
+
+
+def load_instances(count):
+    instances = []
+    for resource in sorted(glob.glob(os.path.join(INSTANCES_DIR, '*.json'))):
+        with io.open(resource, 'r', encoding='utf-8') as f:
+            instances.append(json.load(f))
+    return [instances[i % len(instances)] for i in range(count)]
+
+
+def validate_uncached(schema, instances):
+    for instance in instances:
+        validate(instance=instance, schema=schema, format_checker=draft7_format_checker)
+
+
+def validate_cached(schema_mgr, instances):
+    for instance in instances:
+        error = best_match(schema_mgr.get_validator(NAMESPACE, SCHEMA_NAME).iter_errors(instance))
+        if error is not None:
+            raise error
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--instances', type=int, default=500, help='number of instances validated per run')
+    parser.add_argument('--repeat', type=int, default=5, help='number of runs (best run is reported)')
+    args = parser.parse_args()
+
+    schema_mgr = SchemaManager.instance()
+    schema = schema_mgr.get_schema(NAMESPACE, SCHEMA_NAME)
+    instances = load_instances(args.instances)
+
+    results = [
+        ('jsonschema.validate (uncached)', lambda: validate_uncached(schema, instances)),
+        ('SchemaManager.get_validator (cached)', lambda: validate_cached(schema_mgr, instances)),
+    ]
+    print("Validating {} '{}' instances, best of {} runs:".format(args.instances, SCHEMA_NAME, args.repeat))
+    baseline = None
+    for label, func in results:
+        best = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        per_instance = best / args.instances * 1e6
+        baseline = baseline or per_instance
+        print("  {:<40} {:>10.1f} us/instance  ({:.1f}x)".format(label, per_instance, baseline / per_instance))
+
+
+if __name__ == '__main__':
+    main()
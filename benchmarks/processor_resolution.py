@@ -0,0 +1,68 @@
+#
+# Copyright 2018-2020 IBM Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Measures how long it takes to resolve the pipeline processor of a runtime.
+
+Reports the cost of creating the PipelineProcessorRegistry (reading the entry points), of the
+first resolution of the runtime's processor (importing and instantiating it) and of subsequent
+resolutions, as made by each submission.  For comparison, it also reports the cost of each
+submission creating a registry that instantiates every registered processor, as submissions once
+did (after the first, whose imports are shared with the first resolution).
+
+    python benchmarks/processor_resolution.py [--runtime TYPE] [--repeat R]
+"""
+import argparse
+import time
+
+from elyra.pipeline import PipelineProcessorRegistry
+
+
+def timed(func, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def load_all():
+    # A registry of its own, not the singleton, which loads every processor
+    registry = PipelineProcessorRegistry()
+    for name in list(registry._entry_points.keys()):
+        registry.get_processor(name)
+    return registry
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runtime', default='kfp', help='the runtime type whose processor is resolved')
+    parser.add_argument('--repeat', type=int, default=100, help='number of times the processor is resolved')
+    args = parser.parse_args()
+
+    startup, registry = timed(PipelineProcessorRegistry.instance)
+    first, processor = timed(lambda: registry.get_processor(args.runtime))
+    if processor is None:
+        parser.error("No pipeline processor is registered for runtime '{}'.".format(args.runtime))
+    subsequent, _ = timed(lambda: registry.get_processor(args.runtime), args.repeat)
+    previous, _ = timed(load_all, args.repeat)
+
+    print("Resolving the '{}' pipeline processor ({}):".format(args.runtime, type(processor).__name__))
+    print("  {:<48} {:>10.3f} ms".format('registry creation (at server startup)', startup))
+    print("  {:<48} {:>10.3f} ms".format('first resolution', first))
+    print("  {:<48} {:>10.3f} ms".format('subsequent resolutions (per submission)', subsequent))
+    print("  {:<48} {:>10.3f} ms".format('registry per submission (previous behavior)', previous))
+
+
+if __name__ == '__main__':
+    main()
@@ -15,16 +15,9 @@
 #
 from ._version import __version__
 
-from notebook.utils import url_path_join
-
-from .api.handlers import YamlSpecHandler
-from .scheduler.handler import SchedulerHandler
-from .metadata.handlers import MetadataHandler, MetadataResourceHandler, SchemaHandler, SchemaResourceHandler, \
-    NamespaceHandler
-from .pipeline import PipelineExportHandler
-
 namespace_regex = r"(?P<namespace>[\w\.\-]+)"
 resource_regex = r"(?P<resource>[\w\.\-]+)"
+job_id_regex = r"(?P<job_id>[\w\-]+)"
 
 def _jupyter_server_extension_paths():
     return [{
@@ -33,12 +26,34 @@ def _jupyter_server_extension_paths():
 
 
 def load_jupyter_server_extension(nb_server_app):
+    # The server's dependencies (notebook, tornado, kfp, ...) are imported here rather than at module
+    # level so that importing elyra, as the elyra-metadata CLI does, remains inexpensive.
+    from notebook.utils import url_path_join
+
+    from .api.handlers import YamlSpecHandler
+    from .scheduler.handler import SchedulerHandler, SchedulerJobHandler
+    from .metadata import FileMetadataCache, SqliteMetadataDatabase, ValidationResultCache
+    from .metadata.handlers import MetadataExecutor, MetadataHandler, MetadataResourceHandler, SchemaHandler, \
+        SchemaResourceHandler, NamespaceHandler
+    from .metadata.watcher import MetadataWatcher
+    from .pipeline import PipelineExportHandler, PipelineJobManager, PipelineProcessorRegistry
+
+    # Parent the singletons to the server so they (and the pipeline processors) pick up its configuration
+    FileMetadataCache.instance(parent=nb_server_app)
+    ValidationResultCache.instance(parent=nb_server_app)
+    SqliteMetadataDatabase.instance(parent=nb_server_app)
+    MetadataExecutor.instance(parent=nb_server_app)
+    MetadataWatcher.instance(parent=nb_server_app).start()
+    PipelineJobManager.instance(parent=nb_server_app)
+    PipelineProcessorRegistry.instance(parent=nb_server_app)
+
     web_app = nb_server_app.web_app
     host_pattern = '.*$'
     web_app.add_handlers(host_pattern, [
         (url_path_join(web_app.settings['base_url'], r'/api/{}'.format(YamlSpecHandler.get_resource_metadata()[0])),
          YamlSpecHandler),
         (url_path_join(web_app.settings['base_url'], r'/api/scheduler'), SchedulerHandler),
+        (url_path_join(web_app.settings['base_url'], r'/api/scheduler/%s' % (job_id_regex)), SchedulerJobHandler),
         (url_path_join(web_app.settings['base_url'], r'/api/metadata/%s' % (namespace_regex)), MetadataHandler),
         (url_path_join(web_app.settings['base_url'], r'/api/metadata/%s/%s' % (namespace_regex, resource_regex)),
          MetadataResourceHandler),
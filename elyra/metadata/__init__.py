@@ -13,5 +13,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
-from .metadata import FileMetadataStore, Metadata, MetadataManager, MetadataStore, SchemaManager, \
-    METADATA_TEST_NAMESPACE
+from .metadata import FileMetadataCache, FileMetadataStore, Metadata, MetadataManager, MetadataStore, SchemaManager, \
+    ValidationResultCache, METADATA_TEST_NAMESPACE
+from .sqlite_store import SqliteMetadataDatabase, SqliteMetadataStore
+from .watcher import MetadataWatcher
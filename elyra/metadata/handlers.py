@@ -13,37 +13,182 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from functools import partial
 from jsonschema import ValidationError
 from tornado import web, gen
+from tornado.concurrent import Future
+from tornado.ioloop import IOLoop
+from traitlets import Integer
+from traitlets.config import SingletonConfigurable
 from notebook.base.handlers import APIHandler
 from notebook.utils import maybe_future, url_unescape
-from .metadata import MetadataManager, SchemaManager
-from ..util.http import HttpErrorMixin
+from .metadata import FileMetadataStore, MetadataManager, SchemaManager
+from .watcher import MetadataWatcher
+from ..util.http import HttpCacheMixin, HttpErrorMixin
 
 
-class MetadataHandler(HttpErrorMixin, APIHandler):
-    """Handler for metadata configurations collection. """
+class MetadataExecutor(SingletonConfigurable):
+    """Singleton that runs metadata store operations, which read files or the database and validate
+       instances, on a bounded pool of threads so they don't block the server's IOLoop.
+    """
+
+    max_workers = Integer(4, config=True,
+                          help="""The maximum number of threads used to run metadata store operations.""")
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='MetadataExecutor')
+
+    def run(self, func, *args, **kwargs):
+        """Runs func on the pool, returning a future resolving to its result. """
+        return IOLoop.current().run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+def _get_metadata_version(metadata_manager):
+    """Returns a tuple identifying the content of the namespace's instances, or None if it can't be
+       determined without loading them.  While the watcher tracks the namespace's files, its generation
+       identifies their content, otherwise the store's version does (for the file store, the stat()
+       signatures of its files).  Their validity also depends on the namespace's schemas.
+    """
+    namespace = metadata_manager.namespace
+    metadata_store = metadata_manager.metadata_store
+    watcher = MetadataWatcher.instance()
+    if watcher.is_running and isinstance(metadata_store, FileMetadataStore):
+        version = (watcher.run_id, watcher.get_generation(namespace))
+    else:
+        version = metadata_store.get_version()
+        if version is None:
+            return None
+    return (namespace, version, SchemaManager.instance().get_namespace_hash(namespace))
+
+
+class MetadataHandler(HttpErrorMixin, HttpCacheMixin, APIHandler):
+    """Handler for metadata configurations collection.
+
+       When the MetadataWatcher is running, the namespace's change events can be long-polled by
+       specifying the last generation seen via the 'since' query parameter (-1 to obtain the current
+       generation).  The request completes once the namespace moves past that generation or after
+       'timeout' seconds.  The generation corresponding to a listing is returned in the
+       Elyra-Metadata-Generation header.
+
+       Listings are ordered by name and can be paged via the 'offset' and 'limit' query parameters,
+       filtered by 'schema_name' and 'display_name' prefixes, and trimmed to the comma-separated
+       'fields' of each instance (e.g., 'fields=name,display_name,metadata.language').  The number
+       of instances matching the filters is returned in the Elyra-Metadata-Total-Count header.
+    """
+
+    long_poll_timeout = 30.0  # default seconds to wait for changes
+    max_long_poll_timeout = 300.0
 
     @web.authenticated
     @gen.coroutine
     def get(self, namespace):
         namespace = url_unescape(namespace)
+        since = self.get_query_argument('since', None)
+        if since is not None:
+            yield self._get_events(namespace, since)
+            return
+
         try:
-            metadata_manager = MetadataManager(namespace=namespace)
-            self.log.debug("MetadataHandler: Fetching all metadata resources from namespace '{}'...".format(namespace))
-            metadata = yield maybe_future(metadata_manager.get_all())
+            offset = int(self.get_query_argument('offset', 0))
+            limit = self.get_query_argument('limit', None)
+            limit = int(limit) if limit is not None else None
+            if offset < 0 or (limit is not None and limit < 0):
+                raise ValueError("Query arguments 'offset' and 'limit' must not be negative.")
+        except ValueError as err:
+            raise web.HTTPError(400, str(err))
+        schema_name = self.get_query_argument('schema_name', None)
+        display_name = self.get_query_argument('display_name', None)
+        fields = self.get_query_argument('fields', None)
+
+        watcher = MetadataWatcher.instance()
+        try:
+            metadata_manager = MetadataManager(namespace=namespace, config=self.config)
+            if watcher.is_running:
+                self.set_header("Elyra-Metadata-Generation", str(watcher.get_generation(namespace)))
+            version = yield MetadataExecutor.instance().run(_get_metadata_version, metadata_manager)
+            if version is not None and self.check_not_modified(*version):
+                return
+            self.log.debug("MetadataHandler: Fetching metadata resources from namespace '{}'...".format(namespace))
+            metadata, total = yield MetadataExecutor.instance().run(metadata_manager.get_page, offset=offset,
+                                                                    limit=limit, schema_name=schema_name,
+                                                                    display_name=display_name)
         except (ValidationError, ValueError, KeyError) as err:
             raise web.HTTPError(404, str(err))
         except Exception as ex:
             raise web.HTTPError(500, repr(ex))
 
         metadata_model = dict()
-        metadata_model[namespace] = {r.name: r.to_dict() for r in metadata}
+        if fields is None:
+            metadata_model[namespace] = {r.name: r.to_dict() for r in metadata}
+        else:
+            fields = [field.strip() for field in fields.split(',') if field.strip()]
+            metadata_model[namespace] = {r.name: self._project(r.to_dict(), fields) for r in metadata}
+        self.set_header("Elyra-Metadata-Total-Count", str(total))
         self.set_header("Content-Type", 'application/json')
         self.finish(metadata_model)
 
+    @staticmethod
+    def _project(metadata_dict, fields):
+        """Returns the subset of metadata_dict named by fields, where 'metadata.<property>' names a
+           property of the instance's metadata.
+        """
+        projection = dict()
+        for field in fields:
+            key, _, sub_key = field.partition('.')
+            if key not in metadata_dict:
+                continue
+            if not sub_key:
+                projection[key] = metadata_dict[key]
+            elif key == 'metadata' and sub_key in metadata_dict[key]:
+                projection.setdefault(key, dict())[sub_key] = metadata_dict[key][sub_key]
+        return projection
+
+    @gen.coroutine
+    def _get_events(self, namespace, since):
+        if not SchemaManager.instance().is_valid_namespace(namespace):
+            raise web.HTTPError(404, "Namespace '{}' is not in the list of valid namespaces: {}".
+                                format(namespace, SchemaManager.instance().get_namespaces()))
+        watcher = MetadataWatcher.instance()
+        if not watcher.is_running:
+            raise web.HTTPError(400, "Metadata change events require the metadata watcher to be enabled.")
+        try:
+            since = int(since)
+            timeout = min(float(self.get_query_argument('timeout', self.long_poll_timeout)),
+                          self.max_long_poll_timeout)
+        except ValueError as err:
+            raise web.HTTPError(400, str(err))
+
+        changed = Future()
+        io_loop = IOLoop.current()
+
+        def on_change(changed_namespace, generation):  # called from the watcher's thread
+            if changed_namespace == namespace:
+                io_loop.add_callback(lambda: changed.done() or changed.set_result(generation))
+
+        watcher.add_listener(on_change)
+        try:
+            if watcher.get_generation(namespace) == since:
+                self.log.debug("MetadataHandler: Waiting for changes to namespace '{}' beyond generation {}...".
+                               format(namespace, since))
+                try:
+                    yield gen.with_timeout(timedelta(seconds=timeout), changed)
+                except gen.TimeoutError:
+                    pass
+        finally:
+            watcher.remove_listener(on_change)
+
+        generation, events = watcher.get_events(namespace, since)
+        self.set_header("Content-Type", 'application/json')
+        self.finish(dict(namespace=namespace, generation=generation, events=events))
+
 
-class MetadataResourceHandler(HttpErrorMixin, APIHandler):
+class MetadataResourceHandler(HttpErrorMixin, HttpCacheMixin, APIHandler):
     """Handler for metadata configuration specific resource (e.g. a runtime element). """
 
     @web.authenticated
@@ -53,10 +198,13 @@ class MetadataResourceHandler(HttpErrorMixin, APIHandler):
         resource = url_unescape(resource)
 
         try:
-            metadata_manager = MetadataManager(namespace=namespace)
+            metadata_manager = MetadataManager(namespace=namespace, config=self.config)
+            version = yield MetadataExecutor.instance().run(_get_metadata_version, metadata_manager)
+            if version is not None and self.check_not_modified(resource, *version):
+                return
             self.log.debug("MetadataResourceHandler: Fetching metadata resource '{}' from namespace '{}'...".
                            format(resource, namespace))
-            metadata = yield maybe_future(metadata_manager.get(resource))
+            metadata = yield MetadataExecutor.instance().run(metadata_manager.get, resource)
         except (ValidationError, ValueError, KeyError) as err:
             raise web.HTTPError(404, str(err))
         except Exception as ex:
@@ -66,15 +214,17 @@ class MetadataResourceHandler(HttpErrorMixin, APIHandler):
         self.finish(metadata.to_dict())
 
 
-class SchemaHandler(HttpErrorMixin, APIHandler):
+class SchemaHandler(HttpErrorMixin, HttpCacheMixin, APIHandler):
     """Handler for namespace schemas. """
 
     @web.authenticated
     @gen.coroutine
     def get(self, namespace):
         namespace = url_unescape(namespace)
-        schema_manager = SchemaManager()
+        schema_manager = SchemaManager.instance()
         try:
+            if self.check_not_modified(namespace, schema_manager.get_namespace_hash(namespace)):
+                return
             self.log.debug("SchemaHandler: Fetching all schemas for namespace '{}'...".format(namespace))
             schemas = yield maybe_future(schema_manager.get_namespace_schemas(namespace))
         except (ValidationError, ValueError, KeyError) as err:
@@ -88,7 +238,7 @@ class SchemaHandler(HttpErrorMixin, APIHandler):
         self.finish(schemas_model)
 
 
-class SchemaResourceHandler(HttpErrorMixin, APIHandler):
+class SchemaResourceHandler(HttpErrorMixin, HttpCacheMixin, APIHandler):
     """Handler for a specific schema (resource) for a given namespace. """
 
     @web.authenticated
@@ -96,8 +246,10 @@ class SchemaResourceHandler(HttpErrorMixin, APIHandler):
     def get(self, namespace, resource):
         namespace = url_unescape(namespace)
         resource = url_unescape(resource)
-        schema_manager = SchemaManager()
+        schema_manager = SchemaManager.instance()
         try:
+            if self.check_not_modified(namespace, resource, schema_manager.get_schema_hash(namespace, resource)):
+                return
             self.log.debug("SchemaResourceHandler: Fetching schema '{}' for namespace '{}'...".
                            format(resource, namespace))
             schema = yield maybe_future(schema_manager.get_schema(namespace, resource))
@@ -110,14 +262,16 @@ class SchemaResourceHandler(HttpErrorMixin, APIHandler):
         self.finish(schema)
 
 
-class NamespaceHandler(HttpErrorMixin, APIHandler):
+class NamespaceHandler(HttpErrorMixin, HttpCacheMixin, APIHandler):
     """Handler for retrieving namespaces """
 
     @web.authenticated
     @gen.coroutine
     def get(self):
-        schema_manager = SchemaManager()
+        schema_manager = SchemaManager.instance()
         try:
+            if self.check_not_modified(*schema_manager.get_namespaces()):
+                return
             self.log.debug("NamespaceHandler: Fetching namespaces...")
             namespaces = schema_manager.get_namespaces()
         except (ValidationError, ValueError, KeyError) as err:
@@ -13,17 +13,24 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import copy
+import hashlib
 import io
 import json
 import os
 import re
 import shutil
+import stat
+import tempfile
+import threading
+import time
 import warnings
 
 from abc import ABC, abstractmethod
-from jsonschema import validate, ValidationError, draft7_format_checker
-from jupyter_core.paths import jupyter_data_dir, jupyter_path
-from traitlets import HasTraits, Unicode, Dict, Type, log
+from jsonschema import ValidationError, draft7_format_checker, validators
+from jsonschema.exceptions import best_match
+from jupyter_core.paths import jupyter_data_dir, jupyter_path, jupyter_runtime_dir
+from traitlets import HasTraits, Bool, Integer, Unicode, Dict, Type, default, log
 from traitlets.config import SingletonConfigurable, LoggingConfigurable
 
 
@@ -81,6 +88,11 @@ class MetadataManager(LoggingConfigurable):
                           help="""The metadata class.  This is configurable to allow subclassing of
                           the MetadataManager for customized behavior.""")
 
+    metadata_store_class = Type(default_value='elyra.metadata.metadata.FileMetadataStore',
+                                klass='elyra.metadata.metadata.MetadataStore', config=True,
+                                help="""The metadata store class used when a store is not provided.
+                                (e.g., elyra.metadata.FileMetadataStore or elyra.metadata.SqliteMetadataStore)""")
+
     def __init__(self, namespace, store=None, **kwargs):
         """
         Generic object to read Notebook related metadata
@@ -95,7 +107,7 @@ class MetadataManager(LoggingConfigurable):
         if store:
             self.metadata_store = store
         else:
-            self.metadata_store = FileMetadataStore(namespace, **kwargs)
+            self.metadata_store = self.metadata_store_class(namespace, **kwargs)
 
     def namespace_exists(self):
         return self.metadata_store.namespace_exists()
@@ -113,9 +125,16 @@ class MetadataManager(LoggingConfigurable):
     def get(self, name):
         return self.metadata_store.read(name)
 
+    def get_page(self, offset=0, limit=None, schema_name=None, display_name=None):
+        return self.metadata_store.get_page(offset=offset, limit=limit, schema_name=schema_name,
+                                            display_name=display_name)
+
     def add(self, name, metadata, replace=True):
         return self.metadata_store.save(name, metadata, replace)
 
+    def add_all(self, instances, replace=True):
+        return self.metadata_store.save_all(instances, replace)
+
     def remove(self, name):
         return self.metadata_store.remove(name)
 
@@ -128,6 +147,7 @@ class MetadataStore(ABC):
                              format(namespace, self.schema_mgr.get_namespaces()))
 
         self.namespace = namespace
+        self.validation_cache = ValidationResultCache.instance()
         self.log = log.get_logger()
 
     @abstractmethod
@@ -150,28 +170,123 @@ class MetadataStore(ABC):
     def read(self, name):
         pass
 
+    def get_page(self, offset=0, limit=None, schema_name=None, display_name=None):
+        """Returns a (instances, total) tuple where instances is the list of at most limit valid
+           instances, ordered by name, starting at offset and total is the number of valid instances
+           matching the filters.  schema_name and display_name are (case-insensitive) prefixes the
+           corresponding properties must start with.
+           Stores able to filter instances without loading each of them should override this method.
+        """
+        instances = sorted((metadata for metadata in self.get_all()
+                            if self._matches(metadata.to_dict(), schema_name, display_name)),
+                           key=lambda metadata: metadata.name)
+        return self._slice(instances, offset, limit), len(instances)
+
+    def get_version(self):
+        """Returns a value that changes whenever the namespace's instances change, so that unchanged
+           instances need not be loaded to know they haven't changed, or None if there's no such value.
+           Stores able to tell when instances change should override this method.
+        """
+        return None
+
     @abstractmethod
     def save(self, name, metadata, replace=True):
         pass
 
+    def save_all(self, instances, replace=True):
+        """Saves each Metadata instance in the dictionary of instances, indexed by name, returning a
+           dictionary of the resulting resources indexed by name.  The resource of an instance that
+           was not saved (because it is invalid or exists and replace is False) is None.
+           Stores able to write instances in a batch should override this method.
+        """
+        return {name: self.save(name, metadata, replace=replace) for name, metadata in instances.items()}
+
     @abstractmethod
     def remove(self, name):
         pass
 
     # FIXME - we should rework this area so that its more a function of the processor provider
     # since its the provider that knows what is 'valid' or not.  Same goes for _get_schema() below.
-    def validate(self, name, schema_name, schema, metadata):
-        """Ensure metadata is valid based on its schema.  If invalid, ValidationError will be raised. """
-        self.log.debug("Validating metadata resource '{}' against schema '{}'...".format(name, schema_name))
+    def validate(self, name, schema_name, metadata):
+        """Ensure metadata is valid based on its schema.  If invalid, ValidationError will be raised.
+           Results are remembered by the ValidationResultCache, so a given schema and instance content
+           are only validated once.
+        """
+        error_message = self.get_validation_error(name, schema_name, metadata)
+        if error_message is not None:
+            self._raise_validation_error(name, error_message)
+
+    def get_validation_error(self, name, schema_name, metadata):
+        """Returns the (first line of the) message describing why metadata is invalid based on its
+           schema, or None if metadata is valid.
+        """
+        key = self.validation_cache.get_key(self.schema_mgr.get_schema_hash(self.namespace, schema_name), metadata)
         try:
-            validate(instance=metadata, schema=schema, format_checker=draft7_format_checker)
-        except ValidationError as ve:
+            error_message = self.validation_cache.get(key)
+        except KeyError:
+            self.log.debug("Validating metadata resource '{}' against schema '{}'...".format(name, schema_name))
+            validator = self.schema_mgr.get_validator(self.namespace, schema_name)
+            error = best_match(validator.iter_errors(metadata))
             # Because validation errors are so verbose, only provide the first line.
-            first_line = str(ve).partition('\n')[0]
-            msg = "Schema validation failed for metadata '{}' in namespace '{}' with error: {}.".\
-                format(name, self.namespace, first_line)
-            self.log.error(msg)
-            raise ValidationError(msg)
+            error_message = str(error).partition('\n')[0] if error is not None else None
+            self.validation_cache.put(key, error_message)
+        return error_message
+
+    @staticmethod
+    def _matches(metadata_json, schema_name=None, display_name=None):
+        """Returns True if the instance's properties start with the given (optional) prefixes. """
+        for prefix, value in ((schema_name, metadata_json.get('schema_name')),
+                              (display_name, metadata_json.get('display_name'))):
+            if prefix and not str(value or '').lower().startswith(prefix.lower()):
+                return False
+        return True
+
+    @staticmethod
+    def _slice(items, offset=0, limit=None):
+        if offset < 0 or (limit is not None and limit < 0):
+            raise ValueError("Offset and limit must not be negative.")
+        return items[offset:] if limit is None else items[offset:offset + limit]
+
+    @staticmethod
+    def _check_instance(name, metadata):
+        """Ensures the name and metadata instance provided to save() are usable. """
+        if not name:
+            raise ValueError('Name of metadata was not provided.')
+
+        match = re.search("^[a-z][a-z0-9-_]*[a-z,0-9]$", name)
+        if match is None:
+            raise ValueError("Name of metadata must be lowercase alphanumeric, beginning with alpha and can include "
+                             "embedded hyphens ('-') and underscores ('_').")
+
+        if not metadata:
+            raise ValueError("An instance of class 'Metadata' was not provided.")
+
+        if not isinstance(metadata, Metadata):
+            raise TypeError("'metadata' is not an instance of class 'Metadata'.")
+
+    def _raise_validation_error(self, name, error_message):
+        msg = "Schema validation failed for metadata '{}' in namespace '{}' with error: {}.".\
+            format(name, self.namespace, error_message)
+        self.log.error(msg)
+        raise ValidationError(msg)
+
+    def _get_schema(self, schema_name):
+        """Loads the schema based on the schema_name and returns the loaded schema json.
+           Throws ValidationError if schema file is not present.
+        """
+
+        schema_json = self.schema_mgr.get_schema(self.namespace, schema_name)
+        if schema_json is None:
+            schema_file = os.path.join(os.path.dirname(__file__), 'schemas', schema_name + '.json')
+            if not os.path.exists(schema_file):
+                raise ValidationError("Metadata schema file '{}' is missing!".format(schema_file))
+
+            self.log.debug("Loading metadata schema from: '{}'".format(schema_file))
+            with io.open(schema_file, 'r', encoding='utf-8') as f:
+                schema_json = json.load(f)
+            self.schema_mgr.add_schema(self.namespace, schema_name, schema_json)
+
+        return schema_json
 
 
 class FileMetadataStore(MetadataStore):
@@ -179,6 +294,7 @@ class FileMetadataStore(MetadataStore):
     def __init__(self, namespace, **kwargs):
         super(FileMetadataStore, self).__init__(namespace, **kwargs)
         self.metadata_dir = os.path.join(jupyter_data_dir(), 'metadata', self.namespace)
+        self.cache = FileMetadataCache.instance()
         self.log.debug("Namespace '{}' is using metadata directory: {}".format(self.namespace, self.metadata_dir))
 
     @property
@@ -188,8 +304,7 @@ class FileMetadataStore(MetadataStore):
     def namespace_exists(self):
         is_valid_namespace = False
 
-        all_metadata_dirs = jupyter_path(os.path.join('metadata', self.namespace))
-        for d in all_metadata_dirs:
+        for d in self._get_metadata_dirs():
             if os.path.isdir(d):
                 is_valid_namespace = True
                 break
@@ -217,30 +332,63 @@ class FileMetadataStore(MetadataStore):
             raise ValueError('Name of metadata was not provided')
         return self._load_metadata_resources(name=name)
 
-    def save(self, name, metadata, replace=True):
-        if not name:
-            raise ValueError('Name of metadata was not provided.')
-
-        match = re.search("^[a-z][a-z0-9-_]*[a-z,0-9]$", name)
-        if match is None:
-            raise ValueError("Name of metadata must be lowercase alphanumeric, beginning with alpha and can include "
-                             "embedded hyphens ('-') and underscores ('_').")
+    def get_page(self, offset=0, limit=None, schema_name=None, display_name=None):
+        """Filters the instances using their cached content, so only the requested page of
+           instances is built.  See MetadataStore.get_page().
+        """
+        if not self.namespace_exists():  # namespace doesn't exist, treat as KeyError
+            raise KeyError("Metadata namespace '{}' was not found!".format(self.namespace))
+        try:
+            matches = self._get_matching_resources(schema_name=schema_name, display_name=display_name)
+            instances = [self._load_from_resource(resource) for _, resource in self._slice(matches, offset, limit)]
+        finally:
+            self.validation_cache.flush()
+        return instances, len(matches)
+
+    def get_version(self):
+        """Returns the stat() signatures of the namespace's directories and resources.
+           See MetadataStore.get_version().
+        """
+        return self.cache.get_version(self._get_metadata_dirs())
 
-        if not metadata:
-            raise ValueError("An instance of class 'Metadata' was not provided.")
+    def _get_matching_resources(self, schema_name=None, display_name=None):
+        """Returns the list of (name, resource) tuples, ordered by name, of the valid instances
+           matching the filters.  See MetadataStore.get_page().
+        """
+        matches = []
+        for name, resource in sorted(self.cache.get_name_index(self._get_metadata_dirs()).items()):
+            try:
+                # The content is only read, so the cached copy can be used directly.
+                metadata_json = self.cache.load_resource(resource, read_only=True)
+                if not self._matches(metadata_json, schema_name, display_name) or \
+                        'display_name' not in metadata_json or 'schema_name' not in metadata_json:
+                    continue
+                self._get_schema(metadata_json['schema_name'])  # returns a value or throws
+                if self.get_validation_error(name, metadata_json['schema_name'], metadata_json) is None:
+                    matches.append((name, resource))
+            except Exception:
+                pass  # Ignore ValidationError and others, as when loading all resources
+        return matches
 
-        if not isinstance(metadata, Metadata):
-            raise TypeError("'metadata' is not an instance of class 'Metadata'.")
+    def save(self, name, metadata, replace=True):
+        self._check_instance(name, metadata)
 
         metadata_resource_name = '{}.json'.format(name)
         resource = os.path.join(self.metadata_dir, metadata_resource_name)
 
-        if os.path.exists(resource):
-            if replace:
-                os.remove(resource)
-            else:
-                self.log.error("Metadata resource '{}' already exists. Use the replace flag to overwrite.".
-                               format(resource))
+        if not replace and os.path.exists(resource):
+            self.log.error("Metadata resource '{}' already exists. Use the replace flag to overwrite.".
+                           format(resource))
+            return None
+
+        # Validate prior to writing anything so invalid instances never reach the file system.
+        metadata_json = metadata.to_dict(trim=True)  # Only persist necessary items
+        schema_name = metadata_json.get('schema_name')
+        if schema_name:
+            self._get_schema(schema_name)  # returns a value or throws
+            try:
+                self.validate(name, schema_name, metadata_json)
+            except ValidationError:
                 return None
 
         created_namespace_dir = False
@@ -250,28 +398,44 @@ class FileMetadataStore(MetadataStore):
             created_namespace_dir = True
 
         try:
-            with io.open(resource, 'w', encoding='utf-8') as f:
-                f.write(metadata.to_json(trim=True))  # Only persist necessary items
+            self._write_resource(resource, json.dumps(metadata_json, indent=2))
         except Exception:
             if created_namespace_dir:
                 shutil.rmtree(self.metadata_dir)
-        else:
-            self.log.debug("Created metadata resource: {}".format(resource))
-
-        # Now that its written, attempt to load it so, if a schema is present, we can validate it.
-        try:
-            self._load_from_resource(resource)
-        except ValidationError:
-            self.log.error("Removing metadata resource '{}' due to previous error.".format(resource))
-            # If we just created the directory, include that during cleanup
-            if created_namespace_dir:
-                shutil.rmtree(self.metadata_dir)
-            else:
-                os.remove(resource)
-            resource = None
+            raise
+        finally:
+            self.cache.invalidate(resource)
 
+        self.log.debug("Created metadata resource: {}".format(resource))
         return resource
 
+    @staticmethod
+    def _write_resource(resource, content):
+        """Atomically writes content to resource.  The content is written and flushed to a temporary
+           file in the same directory, which then replaces resource, so readers (and crashes) see
+           either the previous or the new content - never a partial file.
+        """
+        metadata_dir = os.path.dirname(resource)
+        fd, temp_file = tempfile.mkstemp(dir=metadata_dir, prefix='.{}.'.format(os.path.basename(resource)),
+                                         suffix='.tmp')
+        try:
+            with io.open(fd, 'w', encoding='utf-8') as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_file, resource)
+        except BaseException:
+            os.remove(temp_file)
+            raise
+
+        # Persist the rename itself.  Directories can't be opened on Windows, where this is skipped.
+        if hasattr(os, 'O_DIRECTORY'):
+            dir_fd = os.open(metadata_dir, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+
     def remove(self, name):
         self.log.info("Removing metadata resource '{}' from namespace '{}'.".format(name, self.namespace))
         try:
@@ -282,6 +446,7 @@ class FileMetadataStore(MetadataStore):
 
         resource = self._get_resource(metadata)
         os.remove(resource)
+        self.cache.invalidate(resource)
 
         return resource
 
@@ -290,62 +455,60 @@ class FileMetadataStore(MetadataStore):
         resource = os.path.join(self.metadata_dir, metadata_resource_name)
         return resource
 
+    def _get_metadata_dirs(self):
+        """Returns the namespace's metadata directories in order of precedence. """
+        return jupyter_path(os.path.join('metadata', self.namespace))
+
+    def _resolve_resource(self, name):
+        """Returns the resource corresponding to name from the highest precedence metadata
+           directory in which it exists, or None if no such resource exists.
+        """
+        metadata_resource_name = '{}.json'.format(name)
+        if os.path.basename(metadata_resource_name) != metadata_resource_name:
+            return None  # Don't let names reach outside of the namespace's directories
+        for metadata_dir in self._get_metadata_dirs():
+            resource = os.path.join(metadata_dir, metadata_resource_name)
+            if os.path.isfile(resource):
+                return resource
+        return None
+
     def _load_metadata_resources(self, name=None, validate_metadata=True, include_invalid=False):
         """Loads metadata files with .json suffix and return requested items.
            if 'name' is provided, the single file is loaded and returned, else
            all files ending in '.json' are loaded and returned in a list.
+           Resources located in higher precedence directories hide those of the same name
+           in lower precedence directories.
         """
-        resources = []
-        if self.namespace_exists():
-            all_metadata_dirs = jupyter_path(os.path.join('metadata', self.namespace))
-            for metadata_dir in all_metadata_dirs:
-                if os.path.isdir(metadata_dir):
-                    for f in os.listdir(metadata_dir):
-                        path = os.path.join(metadata_dir, f)
-                        if path.endswith(".json"):
-                            if name:
-                                if os.path.splitext(os.path.basename(path))[0] == name:
-                                    return self._load_from_resource(path, validate_metadata=validate_metadata)
-                            else:
-                                metadata = None
-                                try:
-                                    metadata = self._load_from_resource(path, validate_metadata=validate_metadata,
-                                                                        include_invalid=include_invalid)
-                                except Exception:
-                                    pass  # Ignore ValidationError and others when loading all resources
-                                if metadata is not None:
-                                    resources.append(metadata)
-        else:  # namespace doesn't exist, treat as KeyError
+        if not self.namespace_exists():  # namespace doesn't exist, treat as KeyError
             raise KeyError("Metadata namespace '{}' was not found!".format(self.namespace))
 
-        if name:  # If we're looking for a single metadata and we're here, then its not found
-            raise KeyError("Metadata '{}' in namespace '{}' was not found!".format(name, self.namespace))
-
-        return resources
-
-    def _get_schema(self, schema_name):
-        """Loads the schema based on the schema_name and returns the loaded schema json.
-           Throws ValidationError if schema file is not present.
-        """
-
-        schema_json = self.schema_mgr.get_schema(self.namespace, schema_name)
-        if schema_json is None:
-            schema_file = os.path.join(os.path.dirname(__file__), 'schemas', schema_name + '.json')
-            if not os.path.exists(schema_file):
-                raise ValidationError("Metadata schema file '{}' is missing!".format(schema_file))
+        if name:
+            resource = self._resolve_resource(name)
+            if resource is None:
+                raise KeyError("Metadata '{}' in namespace '{}' was not found!".format(name, self.namespace))
+            try:
+                return self._load_from_resource(resource, validate_metadata=validate_metadata)
+            finally:
+                self.validation_cache.flush()
 
-            self.log.debug("Loading metadata schema from: '{}'".format(schema_file))
-            with io.open(schema_file, 'r', encoding='utf-8') as f:
-                schema_json = json.load(f)
-            self.schema_mgr.add_schema(self.namespace, schema_name, schema_json)
+        resources = []
+        for path in self.cache.get_name_index(self._get_metadata_dirs()).values():
+            metadata = None
+            try:
+                metadata = self._load_from_resource(path, validate_metadata=validate_metadata,
+                                                    include_invalid=include_invalid)
+            except Exception:
+                pass  # Ignore ValidationError and others when loading all resources
+            if metadata is not None:
+                resources.append(metadata)
+        self.validation_cache.flush()
 
-        return schema_json
+        return resources
 
     def _load_from_resource(self, resource, validate_metadata=True, include_invalid=False):
         # This is always called with an existing resource (path) so no need to check existence.
         self.log.debug("Loading metadata resource from: '{}'".format(resource))
-        with io.open(resource, 'r', encoding='utf-8') as f:
-            metadata_json = json.load(f)
+        metadata_json = self.cache.load_resource(resource)
 
         # Always take name from resource so resources can be copied w/o having to change content
         name = os.path.splitext(os.path.basename(resource))[0]
@@ -354,9 +517,9 @@ class FileMetadataStore(MetadataStore):
         if validate_metadata:
             schema_name = metadata_json.get('schema_name')
             if schema_name:
-                schema = self._get_schema(schema_name)  # returns a value or throws
+                self._get_schema(schema_name)  # returns a value or throws
                 try:
-                    self.validate(name, schema_name, schema, metadata_json)
+                    self.validate(name, schema_name, metadata_json)
                 except ValidationError as ve:
                     if include_invalid:
                         reason = ve.__class__.__name__
@@ -374,6 +537,262 @@ class FileMetadataStore(MetadataStore):
         return metadata
 
 
+class FileMetadataCache(SingletonConfigurable):
+    """Singleton used to cache file-based metadata resources across FileMetadataStore instances.
+       Directory listings and parsed resources are keyed by the stat() signature of the directory
+       or file, so changes made outside of the metadata service (e.g., by hand or from another
+       process) are picked up on the next access while unchanged resources are never re-read.
+    """
+
+    # Entries whose modification time falls within this window of when they were cached are not
+    # trusted since file systems with coarse timestamp granularity could apply a second update
+    # without changing the signature.  Such entries are re-read until they age out of the window.
+    racy_window = 2.0  # seconds
+
+    enabled = Bool(True, config=True,
+                   help="""Cache metadata resources in memory.  When disabled, every access
+                   re-reads the metadata directories and resources from the file system.""")
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._lock = threading.Lock()
+        # directory -> (signature, list of '.json' resource paths)
+        self._directories = {}
+        # resource -> (signature, metadata_json)
+        self._resources = {}
+        # tuple of directories -> (tuple of directory signatures, dictionary of name to resource)
+        self._indexes = {}
+        # directories whose changes are tracked by the MetadataWatcher
+        self._watched_dirs = frozenset()
+
+    def get_name_index(self, metadata_dirs):
+        """Returns a dictionary of resource name to resource for the '.json' resources located in
+           metadata_dirs.  The directories are expected to be in order of precedence, so a name
+           found in more than one directory resolves to the resource in the first.
+        """
+        listings = [self._list_directory(metadata_dir) for metadata_dir in metadata_dirs]
+        key = tuple(metadata_dirs)
+        signatures = tuple(signature for signature, _, _ in listings)
+        with self._lock:
+            entry = self._indexes.get(key)
+        if entry is not None and entry[0] == signatures:
+            return dict(entry[1])
+
+        name_index = {}
+        for _, resources, _ in listings:
+            for resource in resources:
+                name_index.setdefault(os.path.splitext(os.path.basename(resource))[0], resource)
+        # Only cache the index if every listing it was built from could be cached
+        if self.enabled and all(cached for _, _, cached in listings):
+            with self._lock:
+                self._indexes[key] = (signatures, name_index)
+        return dict(name_index)
+
+    def get_version(self, metadata_dirs):
+        """Returns a tuple of the stat() signatures of metadata_dirs and of the '.json' resources
+           they contain, which changes whenever a resource is added, removed or modified, or None if
+           a signature is too recent to be trusted (see racy_window).
+        """
+        signatures = []
+        for metadata_dir in metadata_dirs:
+            signature, resources, _ = self._list_directory(metadata_dir)
+            signatures.append(signature)
+            for resource in sorted(resources):
+                try:
+                    signatures.append(self.get_signature(os.stat(resource)))
+                except OSError:
+                    signatures.append(None)  # Removed since the directory was listed
+        now = time.time()
+        if any(signature is not None and now - signature[2] / 1e9 < self.racy_window for signature in signatures):
+            return None
+        return tuple(signatures)
+
+    def load_resource(self, resource, read_only=False):
+        """Returns the JSON content of resource, only reading the file when it has changed
+           since it was last loaded.  If read_only is True, the cached content itself is returned,
+           which callers must not modify.
+        """
+        with self._lock:
+            entry = self._resources.get(resource)
+        # Changes to watched directories invalidate their entries, so there's no need to check.
+        if entry is None or os.path.dirname(resource) not in self._watched_dirs:
+            signature = self.get_signature(os.stat(resource))
+            if entry is not None and entry[0] != signature:
+                entry = None
+        if entry is None:
+            with io.open(resource, 'r', encoding='utf-8') as f:
+                metadata_json = json.load(f)
+            entry = (signature, metadata_json)
+            self._update(self._resources, resource, signature, metadata_json)
+
+        # Callers are otherwise free to modify what's returned, so hand out a copy of the cached content.
+        return entry[1] if read_only else copy.deepcopy(entry[1])
+
+    def _list_directory(self, metadata_dir):
+        """Returns a (signature, resources, cached) tuple for metadata_dir, where cached indicates
+           whether the listing is (or can be) held in the cache.  If metadata_dir is not a directory,
+           (None, [], True) is returned.
+        """
+        with self._lock:
+            entry = self._directories.get(metadata_dir)
+        # Changes to watched directories invalidate their entries, so there's no need to check.
+        if entry is not None and metadata_dir in self._watched_dirs:
+            return entry[0], entry[1], True
+
+        try:
+            dir_stat = os.stat(metadata_dir)
+        except OSError:
+            return None, [], True
+        if not stat.S_ISDIR(dir_stat.st_mode):
+            return None, [], True
+
+        signature = self.get_signature(dir_stat)
+        if entry is not None and entry[0] == signature:
+            return entry[0], entry[1], True
+
+        resources = [os.path.join(metadata_dir, f) for f in os.listdir(metadata_dir) if f.endswith('.json')]
+        cached = self._update(self._directories, metadata_dir, signature, resources)
+        return signature, resources, cached
+
+    def set_watched_directories(self, metadata_dirs):
+        """Sets the directories whose changes are tracked by a watcher that invalidates the
+           corresponding entries as changes occur.  Entries from these directories are served
+           without checking for changes.
+        """
+        with self._lock:
+            self._watched_dirs = frozenset(metadata_dirs)
+
+    def invalidate(self, resource=None):
+        """Drops the entries associated with resource (and its directory listing).  If resource
+           is not specified, all entries are dropped.
+        """
+        with self._lock:
+            if resource is None:
+                self._directories.clear()
+                self._resources.clear()
+            else:
+                self._resources.pop(resource, None)
+                self._directories.pop(os.path.dirname(resource), None)
+            self._indexes.clear()
+
+    def _update(self, entries, key, signature, value):
+        """Caches value under key unless caching is disabled or signature is too recent to be
+           trusted.  Returns True if value was cached.
+        """
+        if not self.enabled or time.time() - signature[2] / 1e9 < self.racy_window:
+            return False
+        with self._lock:
+            entries[key] = (signature, value)
+        return True
+
+    @staticmethod
+    def get_signature(stat_result):
+        return stat_result.st_ino, stat_result.st_size, stat_result.st_mtime_ns
+
+
+class ValidationResultCache(SingletonConfigurable):
+    """Singleton used to remember the outcome of validating metadata instances.  Results are keyed
+       by the hash of the schema and the hash of the instance's content, so an unchanged instance is
+       validated at most once for a given schema.  Results are optionally persisted so they survive
+       server restarts.
+    """
+
+    enabled = Bool(True, config=True,
+                   help="""Remember metadata validation results.  When disabled, instances are
+                   validated each time they are loaded.""")
+
+    persist = Bool(True, config=True,
+                   help="""Persist validation results to 'cache_file' so they are retained across
+                   restarts.""")
+
+    cache_file = Unicode(config=True,
+                         help="""The file in which validation results are persisted.""")
+
+    @default('cache_file')
+    def _cache_file_default(self):
+        return os.path.join(jupyter_runtime_dir(), 'elyra-metadata-validation.json')
+
+    max_entries = Integer(10000, config=True,
+                          help="""The maximum number of validation results to retain.  The least
+                          recently used results are discarded first.""")
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._lock = threading.Lock()
+        self._dirty = False
+        # key -> first line of the validation error message or None if the instance is valid
+        self._results = self._load() if self.persist else {}
+
+    @staticmethod
+    def get_key(schema_hash, metadata):
+        """Returns the key corresponding to the given schema hash and instance content. """
+        content = json.dumps(metadata, sort_keys=True, separators=(',', ':'))
+        return '{}:{}'.format(schema_hash, hashlib.sha256(content.encode('utf-8')).hexdigest())
+
+    def get(self, key):
+        """Returns the validation error message (None if valid) associated with key.
+           Raises KeyError if no result has been recorded for key.
+        """
+        if not self.enabled:
+            raise KeyError(key)
+        with self._lock:
+            error_message = self._results.pop(key)
+            self._results[key] = error_message  # move to most recently used
+        return error_message
+
+    def put(self, key, error_message):
+        """Records the validation error message (None if valid) for key. """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._results.pop(key, None)
+            self._results[key] = error_message
+            while len(self._results) > self.max_entries:
+                self._results.pop(next(iter(self._results)))
+            self._dirty = True
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+            self._dirty = True
+        self.flush()
+
+    def flush(self):
+        """Persists the current set of results if they've changed since last persisted. """
+        if not self.persist or not self._dirty:
+            return
+        with self._lock:
+            content = json.dumps({'results': self._results})
+            self._dirty = False
+        try:
+            cache_dir = os.path.dirname(self.cache_file)
+            os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+            fd, temp_file = tempfile.mkstemp(dir=cache_dir, prefix='.elyra-metadata-validation-')
+            try:
+                with io.open(fd, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                os.replace(temp_file, self.cache_file)
+            except BaseException:
+                os.remove(temp_file)
+                raise
+        except OSError as err:
+            self.log.warning("Unable to persist metadata validation results to '{}': {}".
+                             format(self.cache_file, err))
+
+    def _load(self):
+        try:
+            with io.open(self.cache_file, 'r', encoding='utf-8') as f:
+                results = json.load(f)['results']
+            if isinstance(results, dict):
+                return results
+        except FileNotFoundError:
+            pass
+        except Exception as err:
+            self.log.warning("Ignoring unreadable metadata validation results file '{}': {}".
+                             format(self.cache_file, err))
+        return {}
+
+
 class SchemaManager(SingletonConfigurable):
     """Singleton used to store all schemas for all metadata types.
        Note: we currently don't refresh these entries.
@@ -383,6 +802,10 @@ class SchemaManager(SingletonConfigurable):
         super().__init__(**kwargs)
         # namespace_schemas is a dict of namespace keys to dict of schema_name keys of JSON schema
         self.namespace_schemas = SchemaManager.load_namespace_schemas()
+        # schema_validators is a dict of (namespace, schema_name) keys to compiled schema validators
+        self.schema_validators = {}
+        # schema_hashes is a dict of (namespace, schema_name) keys to the hash of the schema's content
+        self.schema_hashes = {}
 
     def is_valid_namespace(self, namespace):
         return namespace in self.namespace_schemas.keys()
@@ -411,6 +834,37 @@ class SchemaManager(SingletonConfigurable):
 
         return schema_json
 
+    def get_validator(self, namespace, schema_name):
+        """Returns the validator for the given schema.  Validators are compiled, including
+           checking the schema itself, on first use and reused until the schema is updated.
+        """
+        validator = self.schema_validators.get((namespace, schema_name))
+        if validator is None:
+            schema = self.get_schema(namespace, schema_name)
+            self.log.debug("SchemaManager: Compiling validator for schema '{}' in namespace '{}'".
+                           format(schema_name, namespace))
+            validator_class = validators.validator_for(schema)
+            validator_class.check_schema(schema)
+            validator = validator_class(schema, format_checker=draft7_format_checker)
+            self.schema_validators[(namespace, schema_name)] = validator
+        return validator
+
+    def get_schema_hash(self, namespace, schema_name):
+        """Returns a hash of the given schema's content. """
+        schema_hash = self.schema_hashes.get((namespace, schema_name))
+        if schema_hash is None:
+            schema = self.get_schema(namespace, schema_name)
+            content = json.dumps(schema, sort_keys=True, separators=(',', ':'))
+            schema_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
+            self.schema_hashes[(namespace, schema_name)] = schema_hash
+        return schema_hash
+
+    def get_namespace_hash(self, namespace):
+        """Returns a hash of the content of the namespace's schemas. """
+        schema_hashes = ['{}:{}'.format(schema_name, self.get_schema_hash(namespace, schema_name))
+                         for schema_name in sorted(self.get_namespace_schemas(namespace))]
+        return hashlib.sha256(','.join(schema_hashes).encode('utf-8')).hexdigest()
+
     def add_schema(self, namespace, schema_name, schema):
         """Adds (updates) schema to set of stored schemas. """
         if not self.is_valid_namespace(namespace):
@@ -418,11 +872,15 @@ class SchemaManager(SingletonConfigurable):
                              format(namespace, self.get_namespaces()))
         self.log.debug("SchemaManager: Adding schema '{}' to namespace '{}'".format(schema_name, namespace))
         self.namespace_schemas[namespace][schema_name] = schema
+        self.schema_validators.pop((namespace, schema_name), None)
+        self.schema_hashes.pop((namespace, schema_name), None)
 
     def clear_all(self):
         """Primarily used for testing, this method reloads schemas from initial values. """
         self.log.debug("SchemaManager: Reloading all schemas for all namespaces.")
         self.namespace_schemas = SchemaManager.load_namespace_schemas()
+        self.schema_validators = {}
+        self.schema_hashes = {}
 
     def remove_schema(self, namespace, schema_name):
         """Removes the schema entry associated with namespace & schema_name. """
@@ -431,6 +889,8 @@ class SchemaManager(SingletonConfigurable):
             raise ValueError("Namespace '{}' is not in the list of valid namespaces: '{}'".
                              format(namespace, self.get_namespaces()))
         self.namespace_schemas[namespace].pop(schema_name)
+        self.schema_validators.pop((namespace, schema_name), None)
+        self.schema_hashes.pop((namespace, schema_name), None)
 
     @classmethod
     def load_namespace_schemas(cls, schema_dir=None):
@@ -13,12 +13,18 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import glob
+import io
+import json
+import os
 import sys
+import tarfile
 
 from jsonschema import ValidationError
 
 from .metadata_app_utils import AppBase, CliOption, Flag, SchemaProperty, MetadataSchemaProperty
-from .metadata import Metadata, MetadataManager, SchemaManager
+from .metadata import FileMetadataCache, Metadata, MetadataManager, SchemaManager, ValidationResultCache
+from .sqlite_store import SqliteMetadataDatabase
 
 
 class NamespaceBase(AppBase):
@@ -59,7 +65,7 @@ class NamespaceList(NamespaceBase):
 
     def __init__(self, **kwargs):
         super(NamespaceList, self).__init__(**kwargs)
-        self.metadata_manager = MetadataManager(namespace=self.namespace)
+        self.metadata_manager = MetadataManager(namespace=self.namespace, config=self.config)
 
     def start(self):
         self.process_cli_options(self.options)  # process options
@@ -121,7 +127,7 @@ class NamespaceRemove(NamespaceBase):
 
     def __init__(self, **kwargs):
         super(NamespaceRemove, self).__init__(**kwargs)
-        self.metadata_manager = MetadataManager(namespace=self.namespace)
+        self.metadata_manager = MetadataManager(namespace=self.namespace, config=self.config)
 
     def start(self):
         super(NamespaceRemove, self).start()  # process options
@@ -155,7 +161,7 @@ class NamespaceInstall(NamespaceBase):
 
     def __init__(self, **kwargs):
         super(NamespaceInstall, self).__init__(**kwargs)
-        self.metadata_manager = MetadataManager(namespace=self.namespace)
+        self.metadata_manager = MetadataManager(namespace=self.namespace, config=self.config)
         # First, process the schema_name option so we can then load the appropriate schema
         # file to build the schema-based options.  If help is requested, give it to them.
         self.process_cli_option(self.schema_name_option, check_help=True)
@@ -216,6 +222,179 @@ class NamespaceInstall(NamespaceBase):
                                   .format(name, schema_name), display_help=True)
 
 
+class NamespaceImport(NamespaceBase):
+    """Handles the 'import' subcommand functionality for a specific namespace."""
+
+    source_option = CliOption("--source", name='source',
+                              description='The directory of instance files (<name>.json), JSON lines file (.jsonl) '
+                                          'or tarball (.tar, .tar.gz, .tgz) containing the instances to import',
+                              required=True)
+    replace_flag = Flag("--replace", name='replace',
+                        description='Replace existing instances', default_value=False)
+
+    # 'Import' options
+    options = [source_option, replace_flag]
+
+    def __init__(self, **kwargs):
+        super(NamespaceImport, self).__init__(**kwargs)
+        self.metadata_manager = MetadataManager(namespace=self.namespace, config=self.config)
+
+    def start(self):
+        super(NamespaceImport, self).start()  # process options
+
+        source = self.source_option.value
+        try:
+            instances = NamespaceImport.read_instances(source)
+        except (OSError, ValueError, tarfile.TarError) as err:
+            self.log_and_exit("Unable to read metadata instances from '{}': {}".format(source, err))
+        if not instances:
+            self.log_and_exit("No metadata instances were found in '{}'.".format(source))
+
+        # Validate everything up front so that nothing is imported unless everything can be.
+        metadata_store = self.metadata_manager.metadata_store
+        metadata_instances = {}
+        errors = []
+        for name, instance_json in instances:
+            error = None
+            schema_name = instance_json.get('schema_name') if isinstance(instance_json, dict) else None
+            if name in metadata_instances:
+                error = "Instance name is not unique."
+            elif not isinstance(instance_json, dict):
+                error = "Instance is not a JSON object."
+            elif schema_name not in self.schemas:
+                error = "Schema name '{}' not found in {} schemas.".format(schema_name, self.namespace)
+            else:
+                try:
+                    # As with file-based instances, the name comes from the source rather than the content.
+                    metadata = Metadata(name=name, **{key: value for key, value in instance_json.items()
+                                                      if key in ('display_name', 'schema_name', 'metadata')})
+                    metadata_store._check_instance(name, metadata)
+                    error = metadata_store.get_validation_error(name, schema_name, metadata.to_dict(trim=True))
+                except (AttributeError, TypeError, ValueError) as err:
+                    error = str(err)
+            if error:
+                errors.append("  {}: {}".format(name, error))
+            else:
+                metadata_instances[name] = metadata
+
+        if errors:
+            print("The following metadata instances are invalid:")
+            print("\n".join(errors))
+            self.log_and_exit("No metadata instances were imported into namespace '{}'.".format(self.namespace))
+
+        resources = self.metadata_manager.add_all(metadata_instances, replace=self.replace_flag.value)
+        skipped = [name for name, resource in resources.items() if resource is None]
+        print("Imported {} metadata instance(s) into namespace '{}'.".
+              format(len(resources) - len(skipped), self.namespace))
+        if skipped:
+            self.log_and_exit("The following instances already exist and were not imported (use --replace to "
+                              "overwrite): {}".format(", ".join(skipped)))
+
+    @staticmethod
+    def read_instances(source):
+        """Returns the list of (name, instance) tuples contained in source, which is either a directory
+           of instance files, a JSON lines file in which each instance includes its 'name', or a tarball
+           of instance files.  The names of instance files (<name>.json) provide the instance name.
+           The content of instance files is returned as is, even if it's not a JSON object.
+        """
+        instances = []
+        if os.path.isdir(source):
+            for instance_file in sorted(glob.glob(os.path.join(source, '*.json'))):
+                with io.open(instance_file, 'r', encoding='utf-8') as f:
+                    instances.append((os.path.splitext(os.path.basename(instance_file))[0], json.load(f)))
+        elif source.endswith('.jsonl'):
+            with io.open(source, 'r', encoding='utf-8') as f:
+                for line_number, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    instance_json = json.loads(line)
+                    if not isinstance(instance_json, dict) or not instance_json.get('name'):
+                        raise ValueError("Line {} does not contain an instance with a 'name'.".format(line_number))
+                    instances.append((instance_json.pop('name'), instance_json))
+        elif tarfile.is_tarfile(source):
+            with tarfile.open(source, 'r:*') as tar:
+                for member in sorted(tar.getmembers(), key=lambda m: m.name):
+                    if member.isfile() and member.name.endswith('.json'):
+                        instance_json = json.loads(tar.extractfile(member).read().decode('utf-8'))
+                        instances.append((os.path.splitext(os.path.basename(member.name))[0], instance_json))
+        else:
+            raise ValueError("Source must be a directory, JSON lines file (.jsonl) or tarball.")
+        return instances
+
+
+class NamespaceExport(NamespaceBase):
+    """Handles the 'export' subcommand functionality for a specific namespace."""
+
+    target_option = CliOption("--target", name='target',
+                              description='The directory, JSON lines file (.jsonl) or tarball (.tar, .tar.gz, .tgz) '
+                                          'to which the instances are exported',
+                              required=True)
+    include_invalid_flag = Flag("--include-invalid", name='include-invalid',
+                                description='Include invalid instances (default exports valid instances only)',
+                                default_value=False)
+    replace_flag = Flag("--replace", name='replace',
+                        description='Replace an existing target file or instance files', default_value=False)
+
+    # 'Export' options
+    options = [target_option, include_invalid_flag, replace_flag]
+
+    def __init__(self, **kwargs):
+        super(NamespaceExport, self).__init__(**kwargs)
+        self.metadata_manager = MetadataManager(namespace=self.namespace, config=self.config)
+
+    def start(self):
+        super(NamespaceExport, self).start()  # process options
+
+        target = self.target_option.value
+        try:
+            metadata_instances = self.metadata_manager.get_all_metadata_summary(
+                include_invalid=self.include_invalid_flag.value)
+        except KeyError:
+            metadata_instances = []
+        instances = [(metadata.name, metadata.to_dict(trim=True))
+                     for metadata in sorted(metadata_instances, key=lambda metadata: metadata.name)]
+
+        try:
+            NamespaceExport.write_instances(target, instances, replace=self.replace_flag.value)
+        except (OSError, tarfile.TarError) as err:
+            self.log_and_exit("Unable to export metadata instances to '{}': {}".format(target, err))
+        print("Exported {} metadata instance(s) from namespace '{}' to: {}".
+              format(len(instances), self.namespace, target))
+
+    @staticmethod
+    def write_instances(target, instances, replace=False):
+        """Writes the list of (name, instance) tuples to target in the format implied by its name.
+           See NamespaceImport.read_instances().
+        """
+        is_tarball = target.endswith(('.tar', '.tar.gz', '.tgz'))
+        if target.endswith('.jsonl') or is_tarball:
+            if os.path.exists(target) and not replace:
+                raise FileExistsError("Target '{}' already exists. Use --replace to overwrite.".format(target))
+            if is_tarball:
+                with tarfile.open(target, 'w' if target.endswith('.tar') else 'w:gz') as tar:
+                    for name, instance_json in instances:
+                        content = json.dumps(instance_json, indent=2).encode('utf-8')
+                        member = tarfile.TarInfo('{}.json'.format(name))
+                        member.size = len(content)
+                        tar.addfile(member, io.BytesIO(content))
+            else:
+                with io.open(target, 'w', encoding='utf-8') as f:
+                    for name, instance_json in instances:
+                        f.write(json.dumps(dict(name=name, **instance_json)) + '\n')
+            return
+
+        os.makedirs(target, exist_ok=True)
+        instance_files = [(os.path.join(target, '{}.json'.format(name)), instance_json)
+                          for name, instance_json in instances]
+        existing = [instance_file for instance_file, _ in instance_files if os.path.exists(instance_file)]
+        if existing and not replace:
+            raise FileExistsError("Instance files already exist in '{}': {}. Use --replace to overwrite.".
+                                  format(target, ", ".join(os.path.basename(f) for f in existing)))
+        for instance_file, instance_json in instance_files:
+            with io.open(instance_file, 'w', encoding='utf-8') as f:
+                f.write(json.dumps(instance_json, indent=2))
+
+
 class SubcommandBase(AppBase):
     """Handles building the appropriate subcommands based on existing namespaces."""
 
@@ -285,8 +464,30 @@ class Install(SubcommandBase):
         super(Install, self).__init__(**kwargs)
 
 
+class Import(SubcommandBase):
+    """Imports metadata instances into a given namespace."""
+
+    description = "Import metadata instances into a given namespace."
+    subcommand_desciption = "Import metadata instances into namespace '{namespace}'."
+    namespace_base_class = NamespaceImport
+
+    def __init__(self, **kwargs):
+        super(Import, self).__init__(**kwargs)
+
+
+class Export(SubcommandBase):
+    """Exports the metadata instances of a given namespace."""
+
+    description = "Export the metadata instances of a given namespace."
+    subcommand_desciption = "Export the metadata instances of namespace '{namespace}'."
+    namespace_base_class = NamespaceExport
+
+    def __init__(self, **kwargs):
+        super(Export, self).__init__(**kwargs)
+
+
 class MetadataApp(AppBase):
-    """Lists, installs and removes metadata for a given namespace."""
+    """Lists, installs, removes, imports and exports metadata for a given namespace."""
 
     name = "elyra-metadata"
     description = """Manage Elyra metadata."""
@@ -295,6 +496,8 @@ class MetadataApp(AppBase):
         'list': (List, List.description.splitlines()[0]),
         'install': (Install, Install.description.splitlines()[0]),
         'remove': (Remove, Remove.description.splitlines()[0]),
+        'import': (Import, Import.description.splitlines()[0]),
+        'export': (Export, Export.description.splitlines()[0]),
     }
 
     @classmethod
@@ -304,7 +507,11 @@ class MetadataApp(AppBase):
 
     def __init__(self, **kwargs):
         super(MetadataApp, self).__init__(**kwargs)
-        self.namespace_schemas = SchemaManager.load_namespace_schemas()
+        # Configure the singletons used by the metadata stores, as the server extension does
+        FileMetadataCache.instance(config=self.config)
+        ValidationResultCache.instance(config=self.config)
+        SqliteMetadataDatabase.instance(config=self.config)
+        self.namespace_schemas = SchemaManager.instance().namespace_schemas  # shared with the metadata stores
 
     def start(self):
         subcommand = self.get_subcommand()
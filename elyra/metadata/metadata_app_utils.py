@@ -15,8 +15,13 @@
 #
 import ast
 import logging
+import os
 import sys
 
+from jupyter_core.paths import jupyter_config_path
+from traitlets.config import Config
+from traitlets.config.loader import ConfigFileNotFound, JSONFileConfigLoader, PyFileConfigLoader
+
 """Utility functions and classes used for metadata applications and classes."""
 
 logging.basicConfig(level=logging.INFO, format='[%(levelname)1.1s %(asctime)s.%(msecs).03d] %(message)s')
@@ -151,12 +156,47 @@ class AppBase(object):
     description = None
     argv = []
     argv_mappings = {}  # Contains separation of argument name to value
+    config_file_names = ['jupyter_config', 'jupyter_notebook_config']  # As read by the notebook server
+    _config = None  # Loaded once, on first use, and shared by all applications
 
     def __init__(self, **kwargs):
         self.argv = kwargs['argv']
         self._get_argv_mappings()
         self.log = logging.getLogger()  # setup logger so that metadata service logging is displayed
 
+    @property
+    def config(self):
+        """The Jupyter configuration, read from the same files as the notebook server's, so that the
+           metadata services (e.g., MetadataManager.metadata_store_class) are configured alike.
+        """
+        if AppBase._config is None:
+            AppBase._config = AppBase.load_config()
+        return AppBase._config
+
+    @staticmethod
+    def load_config():
+        """Loads the configuration files named config_file_names from the current directory and the
+           Jupyter config path.  As with Jupyter applications, files of the directories listed first
+           take precedence, as do JSON files over Python files of the same directory.
+        """
+        config = Config()
+        config_dirs = jupyter_config_path()
+        if os.getcwd() not in config_dirs:
+            config_dirs.insert(0, os.getcwd())
+        for config_file_name in AppBase.config_file_names:
+            for config_dir in reversed(config_dirs):
+                for loader_class, extension in ((PyFileConfigLoader, '.py'), (JSONFileConfigLoader, '.json')):
+                    loader = loader_class(config_file_name + extension, path=config_dir)
+                    try:
+                        config.merge(loader.load_config())
+                    except ConfigFileNotFound:
+                        pass
+                    except Exception:
+                        logging.getLogger().warning("Unable to load config file '{}'".
+                                                    format(os.path.join(config_dir, config_file_name + extension)),
+                                                    exc_info=True)
+        return config
+
     def _get_argv_mappings(self):
         """Walk argv and build mapping from argument to value for later processing. """
         log_option = None
@@ -0,0 +1,386 @@
+#
+# Copyright 2018-2020 IBM Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import json
+import os
+import sqlite3
+import threading
+
+from contextlib import contextmanager
+from jsonschema import ValidationError
+from jupyter_core.paths import jupyter_data_dir
+from traitlets import Float, Unicode, default
+from traitlets.config import SingletonConfigurable
+
+from .metadata import Metadata, MetadataStore, FileMetadataStore
+
+
+class SqliteMetadataDatabase(SingletonConfigurable):
+    """Singleton that manages the connections to the database used by SqliteMetadataStore instances.
+       Each thread uses its own connection to the database, which is opened in WAL mode so readers
+       don't block writers (and vice versa).
+    """
+
+    SCHEMA_VERSION = 2
+
+    db_file = Unicode(config=True,
+                      help="""The file containing the metadata database.""")
+
+    @default('db_file')
+    def _db_file_default(self):
+        return os.path.join(jupyter_data_dir(), 'metadata.db')
+
+    timeout = Float(30.0, config=True,
+                    help="""The number of seconds to wait for another connection's transaction to
+                    complete before failing with a 'database is locked' error.""")
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = set()
+
+    def connection(self):
+        """Returns the calling thread's connection to the database, opening it if necessary. """
+        connections = getattr(self._local, 'connections', None)
+        if connections is None:
+            connections = self._local.connections = {}
+        connection = connections.get(self.db_file)
+        if connection is None:
+            connection = connections[self.db_file] = self._connect(self.db_file)
+        return connection
+
+    @contextmanager
+    def transaction(self):
+        """Context manager that yields the calling thread's connection within a write transaction,
+           which is committed on success and rolled back otherwise.
+        """
+        connection = self.connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield connection
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+
+    def close(self):
+        """Closes the calling thread's connections. """
+        for connection in getattr(self._local, 'connections', {}).values():
+            connection.close()
+        self._local.connections = {}
+
+    def _connect(self, db_file):
+        self.log.debug("Opening metadata database: {}".format(db_file))
+        os.makedirs(os.path.dirname(db_file), mode=0o700, exist_ok=True)
+        # Transactions are managed explicitly (see transaction()), hence isolation_level=None.
+        connection = sqlite3.connect(db_file, timeout=self.timeout, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        with self._init_lock:
+            if db_file not in self._initialized:
+                self._create_tables(connection)
+                self._initialized.add(db_file)
+        return connection
+
+    def _create_tables(self, connection):
+        version = connection.execute('PRAGMA user_version').fetchone()[0]
+        if version == SqliteMetadataDatabase.SCHEMA_VERSION:
+            return
+        if version > SqliteMetadataDatabase.SCHEMA_VERSION:
+            raise RuntimeError("Metadata database '{}' has version {} which is newer than the supported version {}.".
+                               format(self.db_file, version, SqliteMetadataDatabase.SCHEMA_VERSION))
+        connection.executescript('''
+            BEGIN IMMEDIATE;
+            CREATE TABLE IF NOT EXISTS metadata (
+                namespace TEXT NOT NULL,
+                name TEXT NOT NULL,
+                display_name TEXT NOT NULL,
+                schema_name TEXT NOT NULL,
+                metadata TEXT NOT NULL,
+                schema_hash TEXT,
+                error TEXT,
+                PRIMARY KEY (namespace, name)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS metadata_schema_name ON metadata (namespace, schema_name);
+            CREATE INDEX IF NOT EXISTS metadata_display_name ON metadata (namespace, display_name);
+            CREATE TABLE IF NOT EXISTS generations (
+                namespace TEXT NOT NULL PRIMARY KEY,
+                generation INTEGER NOT NULL
+            );
+            PRAGMA user_version = {};
+            COMMIT;
+        '''.format(SqliteMetadataDatabase.SCHEMA_VERSION))
+
+
+class _FactoryMetadataStore(FileMetadataStore):
+    """Read-only FileMetadataStore for the instances installed into the system and environment
+       metadata directories (e.g., the default runtime images), which is used to supplement the
+       instances stored in the database.
+    """
+
+    def _get_metadata_dirs(self):
+        return [metadata_dir for metadata_dir in super()._get_metadata_dirs() if metadata_dir != self.metadata_dir]
+
+
+class SqliteMetadataStore(MetadataStore):
+    """Stores metadata instances, along with the results of their validation, in a single SQLite
+       database (see SqliteMetadataDatabase) rather than one file per instance.  Instances installed
+       into the system or environment metadata directories are also returned unless an instance of
+       the same name is stored in the database.
+
+       To use, configure: --MetadataManager.metadata_store_class=elyra.metadata.SqliteMetadataStore
+    """
+
+    def __init__(self, namespace, **kwargs):
+        super(SqliteMetadataStore, self).__init__(namespace, **kwargs)
+        self.database = SqliteMetadataDatabase.instance()
+        self.factory_store = _FactoryMetadataStore(namespace)
+        self.log.debug("Namespace '{}' is using metadata database: {}".format(self.namespace, self.database.db_file))
+
+    @property
+    def get_metadata_location(self):
+        return self.database.db_file
+
+    def namespace_exists(self):
+        row = self.database.connection().execute('SELECT 1 FROM metadata WHERE namespace = ? LIMIT 1',
+                                                 (self.namespace,)).fetchone()
+        return row is not None or self.factory_store.namespace_exists()
+
+    def get_all_metadata_summary(self, include_invalid=False):
+        return self._load_metadata_resources(include_invalid=include_invalid)
+
+    def get_all(self):
+        return self._load_metadata_resources()
+
+    def read(self, name):
+        if not name:
+            raise ValueError('Name of metadata was not provided')
+        return self._load_metadata_resources(name=name)
+
+    def get_page(self, offset=0, limit=None, schema_name=None, display_name=None):
+        """Filters the instances using the database's indexed columns, so only the requested page
+           of instances is loaded.  See MetadataStore.get_page().
+        """
+        if not self.namespace_exists():
+            raise KeyError("Metadata namespace '{}' was not found!".format(self.namespace))
+
+        connection = self.database.connection()
+        validation_updates = []
+        try:
+            query = 'SELECT name, schema_name, schema_hash, error FROM metadata WHERE namespace = ?'
+            parameters = [self.namespace]
+            for column, prefix in (('schema_name', schema_name), ('display_name', display_name)):
+                if prefix:
+                    query += " AND {} LIKE ? ESCAPE '\\'".format(column)
+                    parameters.append(prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%')
+            rows = connection.execute(query, parameters).fetchall()
+
+            # Only instances whose schema has changed since they were last validated need to be loaded.
+            matches = {}
+            for row in rows:
+                name = row['name']
+                try:
+                    self._get_schema(row['schema_name'])  # returns a value or throws
+                    error_message = row['error']
+                    schema_hash = self.schema_mgr.get_schema_hash(self.namespace, row['schema_name'])
+                    if row['schema_hash'] != schema_hash:
+                        full_row = connection.execute('SELECT * FROM metadata WHERE namespace = ? AND name = ?',
+                                                      (self.namespace, name)).fetchone()
+                        metadata_json = dict(display_name=full_row['display_name'], schema_name=row['schema_name'],
+                                             metadata=json.loads(full_row['metadata']))
+                        error_message = self.get_validation_error(name, row['schema_name'], metadata_json)
+                        validation_updates.append((schema_hash, error_message, self.namespace, name))
+                except Exception:
+                    continue  # Ignore ValidationError and others, as when loading all resources
+                if error_message is None:
+                    matches[name] = None
+            names = set(row['name'] for row in rows)
+            if self.factory_store.namespace_exists():
+                for name, resource in self.factory_store._get_matching_resources(schema_name=schema_name,
+                                                                                 display_name=display_name):
+                    if name not in names:
+                        matches[name] = resource
+
+            page = self._slice(sorted(matches), offset, limit)
+            db_names = [name for name in page if matches[name] is None]
+            db_rows = {}
+            if db_names:
+                db_rows = {row['name']: row for row in connection.execute(
+                    'SELECT * FROM metadata WHERE namespace = ? AND name IN ({})'.
+                    format(', '.join('?' * len(db_names))), [self.namespace] + db_names)}
+            instances = [self._load_from_row(db_rows[name], validation_updates) if matches[name] is None
+                         else self.factory_store._load_from_resource(matches[name]) for name in page]
+        finally:
+            self._update_validation_results(validation_updates)
+            self.validation_cache.flush()
+        return instances, len(matches)
+
+    def get_version(self):
+        """Returns the namespace's generation, which every save or removal (by any process) changes,
+           along with the version of the factory instances.  See MetadataStore.get_version().
+        """
+        factory_version = self.factory_store.get_version()
+        if factory_version is None:
+            return None
+        row = self.database.connection().execute('SELECT generation FROM generations WHERE namespace = ?',
+                                                 (self.namespace,)).fetchone()
+        return (row['generation'] if row is not None else None), factory_version
+
+    def save(self, name, metadata, replace=True):
+        return self.save_all({name: metadata}, replace=replace)[name]
+
+    def save_all(self, instances, replace=True):
+        """Saves the instances within a single transaction.  See MetadataStore.save_all(). """
+        rows = []
+        for name, metadata in instances.items():
+            self._check_instance(name, metadata)
+
+            # Validate prior to storing anything so invalid instances never reach the database.
+            metadata_json = metadata.to_dict(trim=True)
+            schema_name = metadata_json.get('schema_name')
+            self._get_schema(schema_name)
+            try:
+                self.validate(name, schema_name, metadata_json)
+            except ValidationError:
+                continue
+            rows.append((self.namespace, name, metadata_json['display_name'], schema_name,
+                         json.dumps(metadata_json['metadata']),
+                         self.schema_mgr.get_schema_hash(self.namespace, schema_name)))
+
+        resources = {}
+        with self.database.transaction() as connection:
+            for row in rows:
+                name = row[1]
+                resource = self._get_resource(name)
+                if not replace:
+                    existing = connection.execute('SELECT 1 FROM metadata WHERE namespace = ? AND name = ?',
+                                                  (self.namespace, name)).fetchone()
+                    if existing is not None:
+                        self.log.error("Metadata resource '{}' already exists. Use the replace flag to overwrite.".
+                                       format(resource))
+                        continue
+                connection.execute('INSERT OR REPLACE INTO metadata (namespace, name, display_name, schema_name, '
+                                   'metadata, schema_hash, error) VALUES (?, ?, ?, ?, ?, ?, NULL)', row)
+                resources[name] = resource
+            if resources:
+                self._bump_generation(connection)
+        for resource in resources.values():
+            self.log.debug("Created metadata resource: {}".format(resource))
+        return {name: resources.get(name) for name in instances}
+
+    def remove(self, name):
+        self.log.info("Removing metadata resource '{}' from namespace '{}'.".format(name, self.namespace))
+        with self.database.transaction() as connection:
+            cursor = connection.execute('DELETE FROM metadata WHERE namespace = ? AND name = ?',
+                                        (self.namespace, name))
+            if cursor.rowcount > 0:
+                self._bump_generation(connection)
+        if cursor.rowcount == 0:
+            self.log.warning("Metadata resource '{}' in namespace '{}' was not found!".format(name, self.namespace))
+            return None
+        return self._get_resource(name)
+
+    def _get_resource(self, name):
+        return "{}:{}/{}".format(self.database.db_file, self.namespace, name)
+
+    def _bump_generation(self, connection):
+        # A namespace's first generation is random, so a re-created database doesn't repeat the versions
+        # of the one it replaced.
+        cursor = connection.execute('UPDATE generations SET generation = generation + 1 WHERE namespace = ?',
+                                    (self.namespace,))
+        if cursor.rowcount == 0:
+            connection.execute('INSERT INTO generations (namespace, generation) VALUES (?, random())',
+                               (self.namespace,))
+
+    def _load_metadata_resources(self, name=None, validate_metadata=True, include_invalid=False):
+        """Loads the instances from the database and returns the requested items.
+           If 'name' is provided, the single instance is returned, else all instances of the
+           namespace are returned in a list.
+        """
+        connection = self.database.connection()
+        validation_updates = []
+        try:
+            if name:
+                row = connection.execute('SELECT * FROM metadata WHERE namespace = ? AND name = ?',
+                                         (self.namespace, name)).fetchone()
+                if row is None:  # defer to the factory instances
+                    if not self.factory_store.namespace_exists():
+                        raise KeyError("Metadata '{}' in namespace '{}' was not found!".format(name, self.namespace))
+                    return self.factory_store._load_metadata_resources(name=name, validate_metadata=validate_metadata)
+                return self._load_from_row(row, validation_updates, validate_metadata=validate_metadata)
+
+            rows = connection.execute('SELECT * FROM metadata WHERE namespace = ? ORDER BY name',
+                                      (self.namespace,)).fetchall()
+            resources = []
+            for row in rows:
+                try:
+                    resources.append(self._load_from_row(row, validation_updates, validate_metadata=validate_metadata,
+                                                         include_invalid=include_invalid))
+                except Exception:
+                    pass  # Ignore ValidationError and others when loading all resources
+
+            if self.factory_store.namespace_exists():
+                names = set(row['name'] for row in rows)
+                resources.extend(metadata for metadata in
+                                 self.factory_store._load_metadata_resources(validate_metadata=validate_metadata,
+                                                                             include_invalid=include_invalid)
+                                 if metadata.name not in names)
+            elif not rows:
+                raise KeyError("Metadata namespace '{}' was not found!".format(self.namespace))
+            return resources
+        finally:
+            self._update_validation_results(validation_updates)
+
+    def _load_from_row(self, row, validation_updates, validate_metadata=True, include_invalid=False):
+        name = row['name']
+        schema_name = row['schema_name']
+        metadata_json = dict(display_name=row['display_name'], metadata=json.loads(row['metadata']),
+                             schema_name=schema_name)
+
+        reason = None
+        if validate_metadata:
+            self._get_schema(schema_name)  # returns a value or throws
+            # Only validate instances whose schema has changed since they were last validated.
+            schema_hash = self.schema_mgr.get_schema_hash(self.namespace, schema_name)
+            error_message = row['error']
+            if row['schema_hash'] != schema_hash:
+                error_message = self.get_validation_error(name, schema_name, metadata_json)
+                validation_updates.append((schema_hash, error_message, self.namespace, name))
+            if error_message is not None:
+                if include_invalid:
+                    reason = ValidationError.__name__
+                else:
+                    self._raise_validation_error(name, error_message)
+
+        metadata = Metadata(name=name,
+                            display_name=metadata_json['display_name'],
+                            schema_name=schema_name,
+                            resource=self._get_resource(name),
+                            metadata=metadata_json['metadata'],
+                            reason=reason)
+        return metadata
+
+    def _update_validation_results(self, validation_updates):
+        if not validation_updates:
+            return
+        try:
+            with self.database.transaction() as connection:
+                connection.executemany('UPDATE metadata SET schema_hash = ?, error = ? '
+                                       'WHERE namespace = ? AND name = ?', validation_updates)
+        except sqlite3.Error as err:
+            self.log.warning("Unable to record validation results in metadata database '{}': {}".
+                             format(self.database.db_file, err))
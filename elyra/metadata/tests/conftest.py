@@ -103,7 +103,7 @@ def fetch(request, *parts, **kwargs):
     if 'body' in kwargs and kwargs['body']:
         body = kwargs['body']
 
-    return request(method, path, data=body)
+    return request(method, path, data=body, params=kwargs.get('params'), headers=kwargs.get('headers'))
 # END - Remove once transition to jupyter_server occurs
 
 
@@ -16,11 +16,15 @@
 import os
 import shutil
 import sys
+import time
+
+from unittest import mock
 
 from traitlets.config import Config
 from notebook.tests.launchnotebook import NotebookTestBase
 
-from ..metadata import METADATA_TEST_NAMESPACE
+from ..metadata import FileMetadataStore, Metadata, MetadataManager, METADATA_TEST_NAMESPACE
+from ..sqlite_store import SqliteMetadataDatabase, SqliteMetadataStore
 from .test_utils import valid_metadata_json, invalid_metadata_json, another_metadata_json, create_json_file
 from .conftest import fetch  # FIXME - remove once jupyter_server is used
 
@@ -107,6 +111,59 @@ class MetadataHandlerTest(MetadataTestBase):
         assert 'another' in instances.keys()
         assert 'valid' in instances.keys()
 
+    def test_get_instances_page(self):
+        r = fetch(self.request, 'api', 'metadata', METADATA_TEST_NAMESPACE,
+                  params={'limit': 1, 'offset': 1, 'fields': 'name,metadata.uri_test,bogus'},
+                  base_url=self.base_url(), headers=self.auth_headers())
+        assert r.status_code == 200
+        assert r.headers['Elyra-Metadata-Total-Count'] == '2'
+        instances = r.json()[METADATA_TEST_NAMESPACE]
+        assert instances == {'valid': {'name': 'valid',
+                                       'metadata': {'uri_test': valid_metadata_json['metadata']['uri_test']}}}
+
+        r = fetch(self.request, 'api', 'metadata', METADATA_TEST_NAMESPACE, params={'display_name': 'another'},
+                  base_url=self.base_url(), headers=self.auth_headers())
+        assert r.status_code == 200
+        assert list(r.json()[METADATA_TEST_NAMESPACE].keys()) == ['another']
+
+        r = fetch(self.request, 'api', 'metadata', METADATA_TEST_NAMESPACE, params={'limit': 'bogus'},
+                  base_url=self.base_url(), headers=self.auth_headers())
+        assert r.status_code == 400
+
+    def test_get_instances_not_modified(self):
+        r = fetch(self.request, 'api', 'metadata', METADATA_TEST_NAMESPACE,
+                  base_url=self.base_url(), headers=self.auth_headers())
+        assert r.status_code == 200
+        etag = r.headers['Etag']
+
+        headers = dict(self.auth_headers(), **{'If-None-Match': etag})
+        r = fetch(self.request, 'api', 'metadata', METADATA_TEST_NAMESPACE,
+                  base_url=self.base_url(), headers=headers)
+        assert r.status_code == 304
+        assert r.text == ''
+
+        create_json_file(self.metadata_namespace_dir, 'valid.json', dict(valid_metadata_json, display_name='new'))
+        r = fetch(self.request, 'api', 'metadata', METADATA_TEST_NAMESPACE,
+                  base_url=self.base_url(), headers=headers)
+        assert r.status_code == 200
+        assert r.headers['Etag'] != etag
+
+    def test_get_instances_not_modified_unwatched(self):
+        # Without the watcher, unchanged files are recognized by their signatures, so instances aren't loaded
+        past = time.time() - 10
+        for f in os.listdir(self.metadata_namespace_dir):
+            os.utime(os.path.join(self.metadata_namespace_dir, f), (past, past))
+        os.utime(self.metadata_namespace_dir, (past, past))
+        r = fetch(self.request, 'api', 'metadata', METADATA_TEST_NAMESPACE,
+                  base_url=self.base_url(), headers=self.auth_headers())
+        assert r.status_code == 200
+
+        headers = dict(self.auth_headers(), **{'If-None-Match': r.headers['Etag']})
+        with mock.patch.object(FileMetadataStore, 'get_page', side_effect=AssertionError('Instances were loaded')):
+            r = fetch(self.request, 'api', 'metadata', METADATA_TEST_NAMESPACE,
+                      base_url=self.base_url(), headers=headers)
+        assert r.status_code == 304
+
     def test_get_empty_namespace_instances(self):
         # Delete the metadata dir contents and attempt listing metadata
         shutil.rmtree(self.metadata_namespace_dir)
@@ -127,6 +184,53 @@ class MetadataHandlerTest(MetadataTestBase):
         assert len(instances) == 0
 
 
+class SqliteMetadataHandlerTest(MetadataTestBase):
+    """Test Metadata REST API with the SQLite store"""
+    config = Config({'NotebookApp': {"nbserver_extensions": {"elyra": True}},
+                     'MetadataManager': {'metadata_store_class': 'elyra.metadata.SqliteMetadataStore'}})
+
+    @classmethod
+    def setup_class(cls):
+        SqliteMetadataDatabase.clear_instance()  # So the database is created in this server's data directory
+        super(SqliteMetadataHandlerTest, cls).setup_class()
+
+    @classmethod
+    def teardown_class(cls):
+        super(SqliteMetadataHandlerTest, cls).teardown_class()
+        SqliteMetadataDatabase.clear_instance()
+
+    def test_get_instances_not_modified(self):
+        metadata_manager = MetadataManager(namespace=METADATA_TEST_NAMESPACE, config=self.config)
+        metadata_manager.add('valid', Metadata(**valid_metadata_json))
+        r = fetch(self.request, 'api', 'metadata', METADATA_TEST_NAMESPACE,
+                  base_url=self.base_url(), headers=self.auth_headers())
+        assert r.status_code == 200
+        assert sorted(r.json()[METADATA_TEST_NAMESPACE].keys()) == ['valid']
+        etag = r.headers['Etag']
+
+        # The store's version tells the instances haven't changed, so they aren't loaded
+        headers = dict(self.auth_headers(), **{'If-None-Match': etag})
+        with mock.patch.object(SqliteMetadataStore, 'get_page', side_effect=AssertionError('Instances were loaded')):
+            r = fetch(self.request, 'api', 'metadata', METADATA_TEST_NAMESPACE,
+                      base_url=self.base_url(), headers=headers)
+            assert r.status_code == 304
+            r = fetch(self.request, 'api', 'metadata', METADATA_TEST_NAMESPACE, 'valid',
+                      base_url=self.base_url(), headers=self.auth_headers())
+            assert r.status_code == 200
+            headers = dict(self.auth_headers(), **{'If-None-Match': r.headers['Etag']})
+            r = fetch(self.request, 'api', 'metadata', METADATA_TEST_NAMESPACE, 'valid',
+                      base_url=self.base_url(), headers=headers)
+            assert r.status_code == 304
+
+        metadata_manager.add('another', Metadata(**another_metadata_json))
+        headers = dict(self.auth_headers(), **{'If-None-Match': etag})
+        r = fetch(self.request, 'api', 'metadata', METADATA_TEST_NAMESPACE,
+                  base_url=self.base_url(), headers=headers)
+        assert r.status_code == 200
+        assert r.headers['Etag'] != etag
+        assert sorted(r.json()[METADATA_TEST_NAMESPACE].keys()) == ['another', 'valid']
+
+
 class SchemaHandlerTest(MetadataTestBase):
     """Test Schema REST API"""
     config = Config({'NotebookApp': {"nbserver_extensions": {"elyra": True}}})
@@ -171,6 +275,21 @@ class SchemaHandlerTest(MetadataTestBase):
         # Ensure all schema for code-snippets can be found
         self._get_namespace_schema(METADATA_TEST_NAMESPACE, 'metadata-test')
 
+    def test_get_schemas_not_modified(self):
+        for parts in [('schema', METADATA_TEST_NAMESPACE), ('schema', METADATA_TEST_NAMESPACE, 'metadata-test'),
+                      ('namespace',)]:
+            r = fetch(self.request, 'api', *parts, base_url=self.base_url(), headers=self.auth_headers())
+            assert r.status_code == 200
+            etag = r.headers['Etag']
+
+            headers = dict(self.auth_headers(), **{'If-None-Match': etag})
+            r = fetch(self.request, 'api', *parts, base_url=self.base_url(), headers=headers)
+            assert r.status_code == 304
+            assert r.headers['Etag'] == etag
+
+        r = fetch(self.request, 'api', 'schema', 'runtimes', base_url=self.base_url(), headers=headers)
+        assert r.status_code == 200
+
     def _get_namespace_schemas(self, namespace, expected):
         r = fetch(self.request, 'api', 'schema', namespace,
                   base_url=self.base_url(), headers=self.auth_headers())
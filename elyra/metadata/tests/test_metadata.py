@@ -17,10 +17,13 @@ import copy
 import json
 import os
 import shutil
+import time
 import pytest
 
 from jsonschema import validate, ValidationError, draft7_format_checker
-from elyra.metadata import Metadata, MetadataManager, SchemaManager, METADATA_TEST_NAMESPACE
+from elyra.metadata import FileMetadataCache, FileMetadataStore, Metadata, MetadataManager, SchemaManager, \
+    ValidationResultCache, METADATA_TEST_NAMESPACE
+from elyra.metadata import metadata as metadata_module
 from .test_utils import valid_metadata_json, invalid_metadata_json, create_json_file, get_schema
 
 
@@ -227,6 +230,30 @@ def test_filestore_list_all_none(filestore, metadata_tests_dir):
     assert len(metadata_list) == 0
 
 
+def test_filestore_get_page(filestore, metadata_tests_dir):
+    for i in range(3):
+        create_json_file(metadata_tests_dir, 'valid-{}.json'.format(i), valid_metadata_json)
+
+    instances, total = filestore.get_page()
+    assert [metadata.name for metadata in instances] == ['another', 'valid', 'valid-0', 'valid-1', 'valid-2']
+    assert total == 5
+
+    instances, total = filestore.get_page(offset=1, limit=2)
+    assert [metadata.name for metadata in instances] == ['valid', 'valid-0']
+    assert total == 5
+
+    instances, total = filestore.get_page(offset=4, limit=2, display_name='VALID')
+    assert [metadata.name for metadata in instances] == []
+    assert total == 4
+
+    instances, total = filestore.get_page(display_name='another', schema_name='metadata-t')
+    assert [metadata.name for metadata in instances] == ['another']
+    assert total == 1
+
+    with pytest.raises(ValueError):
+        filestore.get_page(offset=-1)
+
+
 def test_filestore_read_valid_by_name(filestore):
     metadata_name = 'valid'
     some_metadata = filestore.read(metadata_name)
@@ -245,6 +272,196 @@ def test_filestore_read_missing_by_name(filestore):
         filestore.read(metadata_name)
 
 
+def test_filestore_precedence(filestore, system_jupyter_path):
+    # Add an instance of the same name to a lower precedence directory, along with a system-only instance
+    system_metadata_dir = os.path.join(str(system_jupyter_path), 'metadata', METADATA_TEST_NAMESPACE)
+    shadowed_json = copy.deepcopy(valid_metadata_json)
+    shadowed_json['display_name'] = 'shadowed metadata instance'
+    create_json_file(system_metadata_dir, 'valid.json', shadowed_json)
+    create_json_file(system_metadata_dir, 'system.json', valid_metadata_json)
+
+    some_metadata = filestore.read('valid')
+    assert some_metadata.display_name == 'valid metadata instance'
+    assert system_metadata_dir not in some_metadata.resource
+
+    some_metadata = filestore.read('system')
+    assert some_metadata.resource == os.path.join(system_metadata_dir, 'system.json')
+
+    metadata_list = filestore.get_all()
+    assert sorted([metadata.name for metadata in metadata_list]) == ['another', 'system', 'valid']
+    assert 'shadowed metadata instance' not in [metadata.display_name for metadata in metadata_list]
+
+    # Names must not be able to reach outside of the namespace
+    with pytest.raises(KeyError):
+        filestore.read(os.path.join('..', METADATA_TEST_NAMESPACE, 'valid'))
+
+
+def test_filestore_cache_reuse(filestore, metadata_tests_dir, monkeypatch):
+    # Age the resources beyond the racy window so they can be cached
+    past = time.time() - 10
+    for f in os.listdir(metadata_tests_dir):
+        os.utime(os.path.join(metadata_tests_dir, f), (past, past))
+    os.utime(metadata_tests_dir, (past, past))
+
+    assert len(filestore.get_all()) == 2
+
+    loads = []
+    orig_load = json.load
+    monkeypatch.setattr(json, 'load', lambda *args, **kwargs: loads.append(args) or orig_load(*args, **kwargs))
+    assert len(filestore.get_all()) == 2
+    assert filestore.read('valid').name == 'valid'
+    assert len(loads) == 0
+
+    # Ensure instances handed out don't share state with the cache
+    some_metadata = filestore.read('valid')
+    some_metadata.metadata['required_test'] = 'modified'
+    assert filestore.read('valid').metadata['required_test'] == 'required_value'
+
+
+def test_filestore_cache_invalidation(filestore, metadata_tests_dir):
+    past = time.time() - 10
+    for f in os.listdir(metadata_tests_dir):
+        os.utime(os.path.join(metadata_tests_dir, f), (past, past))
+    os.utime(metadata_tests_dir, (past, past))
+    assert len(filestore.get_all()) == 2
+
+    # Modify an existing resource outside of the store, then add another
+    modified_json = copy.deepcopy(valid_metadata_json)
+    modified_json['display_name'] = 'modified metadata instance'
+    create_json_file(metadata_tests_dir, 'valid.json', modified_json)
+    create_json_file(metadata_tests_dir, 'valid2.json', valid_metadata_json)
+
+    assert filestore.read('valid').display_name == 'modified metadata instance'
+    assert len(filestore.get_all()) == 3
+
+    os.remove(os.path.join(metadata_tests_dir, 'valid2.json'))
+    assert len(filestore.get_all()) == 2
+    with pytest.raises(KeyError):
+        filestore.read('valid2')
+
+
+def test_filestore_version(filestore, metadata_tests_dir):
+    # Recently modified resources could change again without changing their signature
+    assert filestore.get_version() is None
+
+    def age():
+        past = time.time() - 10
+        for f in os.listdir(metadata_tests_dir):
+            os.utime(os.path.join(metadata_tests_dir, f), (past, past))
+        os.utime(metadata_tests_dir, (past, past))
+
+    age()
+    version = filestore.get_version()
+    assert version is not None
+    assert filestore.get_version() == version
+
+    # Modified, added and removed resources change the version
+    versions = [version]
+    modified_json = copy.deepcopy(valid_metadata_json)
+    modified_json['display_name'] = 'modified metadata instance'
+    for change in [lambda: create_json_file(metadata_tests_dir, 'valid.json', modified_json),
+                   lambda: create_json_file(metadata_tests_dir, 'valid2.json', valid_metadata_json),
+                   lambda: os.remove(os.path.join(metadata_tests_dir, 'valid2.json'))]:
+        change()
+        age()
+        versions.append(filestore.get_version())
+    assert len(set(versions)) == len(versions)
+
+
+def test_filestore_cache_disabled(filestore, metadata_tests_dir):
+    cache = FileMetadataCache.instance()
+    cache.enabled = False
+    try:
+        past = time.time() - 10
+        os.utime(os.path.join(metadata_tests_dir, 'valid.json'), (past, past))
+        assert filestore.read('valid').name == 'valid'
+        assert os.path.join(metadata_tests_dir, 'valid.json') not in cache._resources
+    finally:
+        cache.enabled = True
+
+
+def test_filestore_validation_results(setup_namespace, monkeypatch):
+    ValidationResultCache.clear_instance()
+    filestore = FileMetadataStore(namespace=METADATA_TEST_NAMESPACE)
+    validations = []
+    orig_best_match = metadata_module.best_match
+    monkeypatch.setattr(metadata_module, 'best_match',
+                        lambda errors: validations.append(1) or orig_best_match(errors))
+
+    metadata_list = filestore.get_all_metadata_summary(include_invalid=True)
+    assert len(metadata_list) == 3
+    assert len(validations) == 3
+
+    # Unchanged instances, valid or not, aren't validated again - even across restarts
+    assert len(filestore.get_all()) == 2
+    with pytest.raises(ValidationError) as ve:
+        filestore.read('invalid')
+    assert "'//localhost:8081/' is not a 'uri'" in str(ve.value)
+    ValidationResultCache.clear_instance()
+    filestore = FileMetadataStore(namespace=METADATA_TEST_NAMESPACE)
+    assert filestore.read('valid').name == 'valid'
+    assert len(validations) == 3
+
+    # ... but changes to the schema invalidate previous results
+    schema_manager = SchemaManager.instance()
+    modified_schema = copy.deepcopy(schema_manager.get_schema(METADATA_TEST_NAMESPACE, "metadata-test"))
+    modified_schema['properties']['metadata']['properties']['bar'] = {"type": "string", "minLength": 5}
+    schema_manager.add_schema(METADATA_TEST_NAMESPACE, "metadata-test", modified_schema)
+    try:
+        assert filestore.read('valid').name == 'valid'
+        assert len(validations) == 4
+    finally:
+        schema_manager.clear_all()
+
+
+def test_filestore_validation_results_disabled(setup_namespace, monkeypatch):
+    ValidationResultCache.clear_instance()
+    ValidationResultCache.instance().enabled = False
+    filestore = FileMetadataStore(namespace=METADATA_TEST_NAMESPACE)
+    validations = []
+    orig_best_match = metadata_module.best_match
+    monkeypatch.setattr(metadata_module, 'best_match',
+                        lambda errors: validations.append(1) or orig_best_match(errors))
+    try:
+        filestore.read('valid')
+        filestore.read('valid')
+        assert len(validations) == 2
+    finally:
+        ValidationResultCache.clear_instance()
+
+
+def test_filestore_save_invalid(filestore, metadata_tests_dir):
+    # Invalid instances are rejected without touching the file system, leaving existing instances intact.
+    with open(os.path.join(metadata_tests_dir, 'valid.json'), 'r', encoding='utf-8') as f:
+        original_content = f.read()
+    assert filestore.save('valid', Metadata(**invalid_metadata_json)) is None
+    with open(os.path.join(metadata_tests_dir, 'valid.json'), 'r', encoding='utf-8') as f:
+        assert f.read() == original_content
+    assert filestore.save('invalid_save', Metadata(**invalid_metadata_json)) is None
+    assert sorted(os.listdir(metadata_tests_dir)) == ['another.json', 'invalid.json', 'valid.json']
+
+
+def test_filestore_save_atomic(filestore, metadata_tests_dir, monkeypatch):
+    metadata = Metadata(**valid_metadata_json)
+    metadata.display_name = 'replaced'
+
+    def failing_replace(src, dst):
+        raise OSError("simulated failure")
+
+    # A failure prior to the rename leaves the previous content and no temporary files
+    with monkeypatch.context() as m:
+        m.setattr(metadata_module.os, 'replace', failing_replace)
+        with pytest.raises(OSError):
+            filestore.save('valid', metadata)
+    assert filestore.read('valid').display_name == 'valid metadata instance'
+    assert sorted(os.listdir(metadata_tests_dir)) == ['another.json', 'invalid.json', 'valid.json']
+
+    resource = filestore.save('valid', metadata)
+    assert resource == os.path.join(str(metadata_tests_dir), 'valid.json')
+    assert filestore.read('valid').display_name == 'replaced'
+    assert sorted(os.listdir(metadata_tests_dir)) == ['another.json', 'invalid.json', 'valid.json']
+
+
 # ########################## SchemaManager Tests ###########################
 def test_schema_manager_all(schema_manager):
     schema_manager.clear_all()
@@ -281,3 +498,30 @@ def test_schema_manager_all(schema_manager):
     test_schema = schema_manager.get_schema(METADATA_TEST_NAMESPACE, "metadata-test")
     assert test_schema is not None
     assert test_schema == test_schema_json
+
+
+def test_schema_manager_validators(schema_manager):
+    schema_manager.clear_all()
+
+    validator = schema_manager.get_validator(METADATA_TEST_NAMESPACE, "metadata-test")
+    assert schema_manager.get_validator(METADATA_TEST_NAMESPACE, "metadata-test") is validator
+    assert validator.is_valid(valid_metadata_json)
+    assert not validator.is_valid(invalid_metadata_json)
+
+    # Updating the schema must produce a validator that reflects the update
+    modified_schema = copy.deepcopy(schema_manager.get_schema(METADATA_TEST_NAMESPACE, "metadata-test"))
+    modified_schema['properties']['metadata']['properties']['bar'] = {"type": "string", "minLength": 5}
+    schema_manager.add_schema(METADATA_TEST_NAMESPACE, "metadata-test", modified_schema)
+    bar_validator = schema_manager.get_validator(METADATA_TEST_NAMESPACE, "metadata-test")
+    assert bar_validator is not validator
+    bar_metadata_json = copy.deepcopy(valid_metadata_json)
+    bar_metadata_json['metadata']['bar'] = 'bar'
+    assert validator.is_valid(bar_metadata_json)
+    assert not bar_validator.is_valid(bar_metadata_json)
+
+    schema_manager.remove_schema(METADATA_TEST_NAMESPACE, "metadata-test")
+    with pytest.raises(KeyError):
+        schema_manager.get_validator(METADATA_TEST_NAMESPACE, "metadata-test")
+
+    schema_manager.clear_all()
+    assert schema_manager.get_validator(METADATA_TEST_NAMESPACE, "metadata-test").is_valid(bar_metadata_json)
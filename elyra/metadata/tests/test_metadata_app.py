@@ -19,6 +19,10 @@ import json
 import os
 import pytest
 import shutil
+import sqlite3
+import subprocess
+import sys
+import tarfile
 from tempfile import mkdtemp
 from elyra.metadata import Metadata, MetadataManager, METADATA_TEST_NAMESPACE
 from .test_utils import PropertyTester, create_json_file, valid_metadata_json, \
@@ -40,10 +44,20 @@ def mock_runtime_dir():
         os.environ.pop("JUPYTER_DATA_DIR")
 
 
+def test_no_server_imports():
+    # The CLI should not pay for importing the server extension's dependencies
+    modules = ['notebook', 'tornado', 'kfp', 'kubernetes', 'minio', 'elyra.pipeline']
+    script = "import sys, elyra.metadata.metadata_app; print(' '.join(m for m in {} if m in sys.modules))".\
+        format(modules)
+    output = subprocess.check_output([sys.executable, '-c', script], universal_newlines=True)
+    assert output.strip() == ''
+
+
 def test_no_opts(script_runner):
     ret = script_runner.run('elyra-metadata')
     assert ret.success is False
-    assert ret.stdout.startswith("No subcommand specified. Must specify one of: ['list', 'install', 'remove']")
+    assert ret.stdout.startswith("No subcommand specified. "
+                                 "Must specify one of: ['list', 'install', 'remove', 'import', 'export']")
     assert ret.stderr == ''
 
 
@@ -51,7 +65,8 @@ def test_bad_subcommand(script_runner):
     ret = script_runner.run('elyra-metadata', 'bogus-subcommand')
     assert ret.success is False
     assert ret.stdout.startswith("Subcommand 'bogus-subcommand' is invalid.")
-    assert "No subcommand specified. Must specify one of: ['list', 'install', 'remove']" in ret.stdout
+    assert "No subcommand specified. Must specify one of: ['list', 'install', 'remove', 'import', 'export']" \
+        in ret.stdout
     assert ret.stderr == ''
 
 
@@ -301,6 +316,161 @@ def test_remove_instance(script_runner, mock_runtime_dir):
     assert instances[1].name.endswith('2')
 
 
+@pytest.fixture()
+def instances_dir(tmp_path):
+    instances_dir = str(tmp_path / 'instances')
+    os.makedirs(instances_dir)
+    create_json_file(instances_dir, 'valid.json', valid_metadata_json)
+    create_json_file(instances_dir, 'another.json', another_metadata_json)
+    return instances_dir
+
+
+def test_import_help(script_runner):
+    ret = script_runner.run('elyra-metadata', 'import', METADATA_TEST_NAMESPACE, '--help')
+    assert ret.success is False
+    assert ret.stdout.startswith("\nImport metadata instances into namespace '{}'.".format(METADATA_TEST_NAMESPACE))
+    assert "--source=<string>" in ret.stdout
+
+
+def test_import_directory(script_runner, mock_runtime_dir, instances_dir):
+    ret = script_runner.run('elyra-metadata', 'import', METADATA_TEST_NAMESPACE, '--source=' + instances_dir)
+    assert ret.success
+    assert "Imported 2 metadata instance(s) into namespace '{}'.".format(METADATA_TEST_NAMESPACE) in ret.stdout
+
+    instances = MetadataManager(namespace=METADATA_TEST_NAMESPACE).get_all()
+    assert sorted(instance.name for instance in instances) == ['another', 'valid']
+
+    # Existing instances are only replaced with --replace
+    ret = script_runner.run('elyra-metadata', 'import', METADATA_TEST_NAMESPACE, '--source=' + instances_dir)
+    assert ret.success is False
+    assert "Imported 0 metadata instance(s)" in ret.stdout
+    assert "already exist and were not imported (use --replace to overwrite): another, valid" in ret.stdout
+
+    ret = script_runner.run('elyra-metadata', 'import', METADATA_TEST_NAMESPACE, '--source=' + instances_dir,
+                            '--replace')
+    assert ret.success
+    assert "Imported 2 metadata instance(s)" in ret.stdout
+
+
+def test_import_invalid(script_runner, mock_runtime_dir, instances_dir):
+    create_json_file(instances_dir, 'invalid.json', invalid_metadata_json)
+    create_json_file(instances_dir, 'bad-schema.json', dict(valid_metadata_json, schema_name='bogus'))
+    create_json_file(instances_dir, 'array.json', [valid_metadata_json])
+    create_json_file(instances_dir, 'scalar.json', 42)
+
+    ret = script_runner.run('elyra-metadata', 'import', METADATA_TEST_NAMESPACE, '--source=' + instances_dir)
+    assert ret.success is False
+    assert "bad-schema: Schema name 'bogus' not found in {} schemas.".format(METADATA_TEST_NAMESPACE) in ret.stdout
+    assert "invalid: Schema validation failed for metadata 'invalid'" not in ret.stdout
+    assert "invalid: '//localhost:8081/' is not a 'uri'" in ret.stdout
+    assert "array: Instance is not a JSON object." in ret.stdout
+    assert "scalar: Instance is not a JSON object." in ret.stdout
+    assert "Traceback" not in ret.stdout + ret.stderr
+    assert "No metadata instances were imported into namespace '{}'.".format(METADATA_TEST_NAMESPACE) in ret.stdout
+    assert not os.path.exists(os.path.join(mock_runtime_dir, 'metadata', METADATA_TEST_NAMESPACE))
+
+    ret = script_runner.run('elyra-metadata', 'import', METADATA_TEST_NAMESPACE, '--source=/no/such/source')
+    assert ret.success is False
+    assert "Unable to read metadata instances from '/no/such/source'" in ret.stdout
+
+
+def test_import_jsonl(script_runner, mock_runtime_dir, tmp_path):
+    source = str(tmp_path / 'instances.jsonl')
+    with open(source, 'w') as f:
+        for i in range(5):
+            f.write(json.dumps(dict(valid_metadata_json, name='valid-{}'.format(i))) + '\n')
+
+    ret = script_runner.run('elyra-metadata', 'import', METADATA_TEST_NAMESPACE, '--source=' + source)
+    assert ret.success
+    assert "Imported 5 metadata instance(s)" in ret.stdout
+    assert len(MetadataManager(namespace=METADATA_TEST_NAMESPACE).get_all()) == 5
+
+    with open(source, 'a') as f:
+        f.write(json.dumps(valid_metadata_json) + '\n')
+    ret = script_runner.run('elyra-metadata', 'import', METADATA_TEST_NAMESPACE, '--source=' + source)
+    assert ret.success is False
+    assert "Line 6 does not contain an instance with a 'name'." in ret.stdout
+
+
+def test_import_tarball(script_runner, mock_runtime_dir, instances_dir, tmp_path):
+    source = str(tmp_path / 'instances.tar.gz')
+    with tarfile.open(source, 'w:gz') as tar:
+        tar.add(instances_dir, arcname='instances')
+
+    ret = script_runner.run('elyra-metadata', 'import', METADATA_TEST_NAMESPACE, '--source=' + source)
+    assert ret.success
+    assert "Imported 2 metadata instance(s)" in ret.stdout
+    assert MetadataManager(namespace=METADATA_TEST_NAMESPACE).get('another').display_name == \
+        another_metadata_json['display_name']
+
+    create_json_file(instances_dir, 'array.json', [valid_metadata_json])
+    with tarfile.open(source, 'w:gz') as tar:
+        tar.add(instances_dir, arcname='instances')
+    ret = script_runner.run('elyra-metadata', 'import', METADATA_TEST_NAMESPACE, '--source=' + source, '--replace')
+    assert ret.success is False
+    assert "array: Instance is not a JSON object." in ret.stdout
+
+
+@pytest.mark.parametrize('target_name', ['exported', 'exported.jsonl', 'exported.tar.gz'])
+def test_export_import(script_runner, mock_runtime_dir, tmp_path, target_name):
+    metadata_manager = MetadataManager(namespace=METADATA_TEST_NAMESPACE)
+    metadata_manager.add('valid', Metadata(**valid_metadata_json))
+    metadata_manager.add('another', Metadata(**another_metadata_json))
+    create_json_file(os.path.join(mock_runtime_dir, 'metadata', METADATA_TEST_NAMESPACE), 'invalid.json',
+                     invalid_metadata_json)
+
+    target = str(tmp_path / target_name)
+    ret = script_runner.run('elyra-metadata', 'export', METADATA_TEST_NAMESPACE, '--target=' + target)
+    assert ret.success
+    assert "Exported 2 metadata instance(s) from namespace '{}' to: {}".\
+        format(METADATA_TEST_NAMESPACE, target) in ret.stdout
+
+    ret = script_runner.run('elyra-metadata', 'export', METADATA_TEST_NAMESPACE, '--target=' + target)
+    assert ret.success is False
+    assert "Use --replace to overwrite." in ret.stdout
+    ret = script_runner.run('elyra-metadata', 'export', METADATA_TEST_NAMESPACE, '--target=' + target, '--replace')
+    assert ret.success
+
+    ret = script_runner.run('elyra-metadata', 'export', METADATA_TEST_NAMESPACE,
+                            '--target=' + str(tmp_path / ('all-' + target_name)), '--include-invalid')
+    assert ret.success
+    assert "Exported 3 metadata instance(s)" in ret.stdout
+
+    # Import the exported instances into an empty namespace
+    shutil.rmtree(os.path.join(mock_runtime_dir, 'metadata', METADATA_TEST_NAMESPACE))
+    ret = script_runner.run('elyra-metadata', 'import', METADATA_TEST_NAMESPACE, '--source=' + target)
+    assert ret.success
+    assert "Imported 2 metadata instance(s)" in ret.stdout
+    instances = metadata_manager.get_all()
+    assert sorted(instance.name for instance in instances) == ['another', 'valid']
+    assert metadata_manager.get('valid').to_dict(trim=True) == Metadata(**valid_metadata_json).to_dict(trim=True)
+
+
+def test_configured_store(script_runner, mock_runtime_dir, instances_dir, tmp_path, monkeypatch):
+    # The configuration files read by the server also configure elyra-metadata, so both use the same store
+    db_file = str(tmp_path / 'metadata.db')
+    config_dir = tmp_path / 'config'
+    config_dir.mkdir()
+    (config_dir / 'jupyter_notebook_config.json').write_text(json.dumps(dict(
+        MetadataManager=dict(metadata_store_class='elyra.metadata.SqliteMetadataStore'),
+        SqliteMetadataDatabase=dict(db_file=db_file))))
+    monkeypatch.setenv('JUPYTER_CONFIG_DIR', str(config_dir))
+
+    ret = script_runner.run('elyra-metadata', 'import', METADATA_TEST_NAMESPACE, '--source=' + instances_dir)
+    assert ret.success
+    assert not os.path.exists(os.path.join(mock_runtime_dir, 'metadata', METADATA_TEST_NAMESPACE))
+    with sqlite3.connect(db_file) as connection:
+        assert [row[0] for row in connection.execute('SELECT name FROM metadata ORDER BY name')] == \
+            ['another', 'valid']
+
+    ret = script_runner.run('elyra-metadata', 'remove', METADATA_TEST_NAMESPACE, '--name=another')
+    assert ret.success
+    ret = script_runner.run('elyra-metadata', 'list', METADATA_TEST_NAMESPACE)
+    assert ret.success
+    assert '{}:{}/valid'.format(db_file, METADATA_TEST_NAMESPACE) in ret.stdout
+    assert '/another' not in ret.stdout
+
+
 # Begin property tests...
 
 def test_required(script_runner, mock_runtime_dir):
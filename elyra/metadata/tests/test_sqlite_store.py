@@ -0,0 +1,254 @@
+#
+# Copyright 2018-2020 IBM Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import json
+import os
+import threading
+import pytest
+
+from jsonschema import ValidationError
+from traitlets.config import Config
+from elyra.metadata import Metadata, MetadataManager, SqliteMetadataDatabase, SqliteMetadataStore, \
+    ValidationResultCache, METADATA_TEST_NAMESPACE
+from elyra.metadata import metadata as metadata_module
+from .test_utils import valid_metadata_json, invalid_metadata_json, another_metadata_json, create_json_file
+
+
+os.environ["METADATA_TESTING"] = "1"  # Enable metadata-tests namespace
+
+
+@pytest.fixture
+def sqlite_store(environ):
+    SqliteMetadataDatabase.clear_instance()
+    ValidationResultCache.clear_instance()
+    store = SqliteMetadataStore(namespace=METADATA_TEST_NAMESPACE)
+    store.save('valid', Metadata(**valid_metadata_json))
+    store.save('another', Metadata(**another_metadata_json))
+    # Invalid instances can't be saved, so add one directly
+    with store.database.transaction() as connection:
+        connection.execute("INSERT INTO metadata (namespace, name, display_name, schema_name, metadata) "
+                           "VALUES (?, 'invalid', ?, ?, ?)",
+                           (METADATA_TEST_NAMESPACE, invalid_metadata_json['display_name'],
+                            invalid_metadata_json['schema_name'], json.dumps(invalid_metadata_json['metadata'])))
+    yield store
+    store.database.close()
+    SqliteMetadataDatabase.clear_instance()
+
+
+@pytest.fixture
+def factory_metadata_dir(system_jupyter_path):
+    factory_dir = os.path.join(str(system_jupyter_path), 'metadata', METADATA_TEST_NAMESPACE)
+    os.makedirs(factory_dir)
+    return factory_dir
+
+
+def test_manager_store_class(environ):
+    metadata_manager = MetadataManager(namespace=METADATA_TEST_NAMESPACE)
+    assert metadata_manager.metadata_store.__class__.__name__ == 'FileMetadataStore'
+
+    config = Config({'MetadataManager': {'metadata_store_class': 'elyra.metadata.SqliteMetadataStore'}})
+    metadata_manager = MetadataManager(namespace=METADATA_TEST_NAMESPACE, config=config)
+    assert isinstance(metadata_manager.metadata_store, SqliteMetadataStore)
+
+
+def test_sqlite_store_database(sqlite_store, data_dir):
+    assert sqlite_store.get_metadata_location == os.path.join(str(data_dir), 'metadata.db')
+    assert os.path.exists(sqlite_store.get_metadata_location)
+    assert sqlite_store.database.connection().execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    # No files are created in the namespace's metadata directory
+    assert not os.path.exists(os.path.join(str(data_dir), 'metadata', METADATA_TEST_NAMESPACE))
+
+
+def test_sqlite_store_read(sqlite_store):
+    assert sqlite_store.namespace_exists()
+
+    metadata = sqlite_store.read('valid')
+    assert metadata.name == 'valid'
+    assert metadata.display_name == valid_metadata_json['display_name']
+    assert metadata.metadata == valid_metadata_json['metadata']
+    assert metadata.resource == sqlite_store.get_metadata_location + ':metadata-tests/valid'
+
+    with pytest.raises(ValidationError):
+        sqlite_store.read('invalid')
+
+    with pytest.raises(KeyError):
+        sqlite_store.read('missing')
+
+    with pytest.raises(ValueError):
+        sqlite_store.read(None)
+
+
+def test_sqlite_store_get_all(sqlite_store):
+    metadata_list = sqlite_store.get_all()
+    assert sorted(metadata.name for metadata in metadata_list) == ['another', 'valid']
+
+    metadata_list = sqlite_store.get_all_metadata_summary(include_invalid=True)
+    assert len(metadata_list) == 3
+    assert [metadata.reason for metadata in metadata_list if metadata.name == 'invalid'] == ['ValidationError']
+
+
+def test_sqlite_store_get_page(sqlite_store, factory_metadata_dir):
+    create_json_file(factory_metadata_dir, 'factory.json', dict(valid_metadata_json, display_name='factory_instance'))
+    for i in range(3):
+        sqlite_store.save('valid-{}'.format(i), Metadata(**valid_metadata_json))
+
+    instances, total = sqlite_store.get_page()
+    assert [metadata.name for metadata in instances] == ['another', 'factory', 'valid', 'valid-0', 'valid-1',
+                                                         'valid-2']
+    assert total == 6
+
+    instances, total = sqlite_store.get_page(offset=1, limit=2)
+    assert [metadata.name for metadata in instances] == ['factory', 'valid']
+    assert instances[0].display_name == 'factory_instance'
+    assert total == 6
+
+    instances, total = sqlite_store.get_page(offset=1, limit=2, display_name='VALID')
+    assert [metadata.name for metadata in instances] == ['valid-0', 'valid-1']
+    assert total == 4
+
+    # LIKE wildcards in the prefix are taken literally
+    instances, total = sqlite_store.get_page(display_name='factory_')
+    assert [metadata.name for metadata in instances] == ['factory']
+    instances, total = sqlite_store.get_page(display_name='_')
+    assert total == 0
+
+
+def test_sqlite_store_missing_namespace(environ):
+    SqliteMetadataDatabase.clear_instance()
+    store = SqliteMetadataStore(namespace=METADATA_TEST_NAMESPACE)
+    assert not store.namespace_exists()
+    with pytest.raises(KeyError):
+        store.get_all()
+    SqliteMetadataDatabase.clear_instance()
+
+
+def test_sqlite_store_save(sqlite_store):
+    metadata = Metadata(**valid_metadata_json)
+    metadata.display_name = 'replaced'
+    assert sqlite_store.save('valid', metadata, replace=False) is None
+    assert sqlite_store.read('valid').display_name == valid_metadata_json['display_name']
+
+    resource = sqlite_store.save('valid', metadata)
+    assert resource == sqlite_store.get_metadata_location + ':metadata-tests/valid'
+    assert sqlite_store.read('valid').display_name == 'replaced'
+
+    # Invalid instances are rejected prior to reaching the database
+    assert sqlite_store.save('bad', Metadata(**invalid_metadata_json)) is None
+    with pytest.raises(KeyError):
+        sqlite_store.read('bad')
+
+    with pytest.raises(ValueError):
+        sqlite_store.save('Bad_Name', metadata)
+    with pytest.raises(TypeError):
+        sqlite_store.save('name', dict(valid_metadata_json))
+
+
+def test_sqlite_store_save_rollback(sqlite_store):
+    with pytest.raises(RuntimeError):
+        with sqlite_store.database.transaction() as connection:
+            connection.execute("DELETE FROM metadata WHERE namespace = ?", (METADATA_TEST_NAMESPACE,))
+            raise RuntimeError("fail")
+    assert len(sqlite_store.get_all()) == 2
+
+
+def test_sqlite_store_concurrent_saves(sqlite_store):
+    errors = []
+
+    def save(index):
+        try:
+            store = SqliteMetadataStore(namespace=METADATA_TEST_NAMESPACE)
+            for i in range(10):
+                store.save('instance-{}-{}'.format(index, i), Metadata(**valid_metadata_json))
+            store.database.close()
+        except Exception as ex:
+            errors.append(ex)
+
+    threads = [threading.Thread(target=save, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert len(sqlite_store.get_all()) == 42
+
+
+def test_sqlite_store_remove(sqlite_store):
+    assert sqlite_store.remove('valid') == sqlite_store.get_metadata_location + ':metadata-tests/valid'
+    with pytest.raises(KeyError):
+        sqlite_store.read('valid')
+    assert sqlite_store.remove('valid') is None
+
+
+def test_sqlite_store_version(sqlite_store, system_jupyter_path):
+    version = sqlite_store.get_version()
+    assert version is not None
+    assert sqlite_store.get_version() == version
+
+    # Every change to the namespace's instances changes its version, unlike failed saves and removals
+    sqlite_store.save('valid', Metadata(**valid_metadata_json))
+    assert sqlite_store.get_version() != version
+    version = sqlite_store.get_version()
+    assert sqlite_store.save('valid', Metadata(**valid_metadata_json), replace=False) is None
+    assert sqlite_store.remove('missing') is None
+    assert sqlite_store.get_version() == version
+    SqliteMetadataStore(namespace=METADATA_TEST_NAMESPACE).remove('another')
+    assert sqlite_store.get_version() != version
+
+    # Factory instances are read from files, whose recent changes can't be detected by their stat() signatures
+    create_json_file(os.path.join(str(system_jupyter_path), 'metadata', METADATA_TEST_NAMESPACE), 'factory.json',
+                     valid_metadata_json)
+    assert sqlite_store.get_version() is None
+
+
+def test_sqlite_store_factory_instances(sqlite_store, factory_metadata_dir, metadata_tests_dir):
+    factory_json = dict(valid_metadata_json, display_name='factory instance')
+    create_json_file(factory_metadata_dir, 'factory.json', factory_json)
+    create_json_file(factory_metadata_dir, 'valid.json', factory_json)
+    # Files in the user's metadata directory are not used
+    create_json_file(metadata_tests_dir, 'user.json', valid_metadata_json)
+
+    assert sqlite_store.read('factory').display_name == 'factory instance'
+    assert sqlite_store.read('valid').display_name == valid_metadata_json['display_name']  # stored instance wins
+    with pytest.raises(KeyError):
+        sqlite_store.read('user')
+    assert sorted(metadata.name for metadata in sqlite_store.get_all()) == ['another', 'factory', 'valid']
+
+    # Factory instances are returned even if no instances are stored
+    sqlite_store.remove('valid')
+    sqlite_store.remove('another')
+    assert sqlite_store.read('valid').display_name == 'factory instance'
+
+
+def test_sqlite_store_validation_results(sqlite_store, monkeypatch):
+    validations = []
+    orig_best_match = metadata_module.best_match
+    monkeypatch.setattr(metadata_module, 'best_match',
+                        lambda errors: validations.append(1) or orig_best_match(errors))
+
+    # Saved instances were validated when saved, so only the directly inserted instance is validated
+    assert len(sqlite_store.get_all_metadata_summary(include_invalid=True)) == 3
+    assert len(validations) == 1
+    row = sqlite_store.database.connection().execute("SELECT * FROM metadata WHERE name = 'invalid'").fetchone()
+    assert row['schema_hash'] is not None
+    assert "'//localhost:8081/' is not a 'uri'" in row['error']
+
+    # Validation results are stored with the instances so they survive restarts
+    ValidationResultCache.clear_instance()
+    store = SqliteMetadataStore(namespace=METADATA_TEST_NAMESPACE)
+    with pytest.raises(ValidationError) as ve:
+        store.read('invalid')
+    assert "'//localhost:8081/' is not a 'uri'" in str(ve.value)
+    assert len(store.get_all()) == 2
+    assert len(validations) == 1
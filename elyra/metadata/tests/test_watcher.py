@@ -0,0 +1,116 @@
+#
+# Copyright 2018-2020 IBM Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import copy
+import os
+import time
+import pytest
+
+from elyra.metadata import FileMetadataStore, MetadataWatcher, METADATA_TEST_NAMESPACE
+from .test_utils import valid_metadata_json, create_json_file
+
+
+os.environ["METADATA_TESTING"] = "1"  # Enable metadata-tests namespace
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+@pytest.fixture(params=[True, False], ids=['inotify', 'polling'])
+def watcher(request, setup_namespace):
+    MetadataWatcher.clear_instance()
+    metadata_watcher = MetadataWatcher.instance(enabled=True, use_inotify=request.param, poll_interval=0.1)
+    metadata_watcher.start()
+    if request.param and not metadata_watcher.using_inotify:
+        metadata_watcher.stop()
+        pytest.skip("inotify is not available")
+    yield metadata_watcher
+    metadata_watcher.stop()
+    MetadataWatcher.clear_instance()
+
+
+def test_watcher_disabled(setup_namespace):
+    MetadataWatcher.clear_instance()
+    metadata_watcher = MetadataWatcher.instance()
+    metadata_watcher.start()
+    assert metadata_watcher.is_running is False
+    MetadataWatcher.clear_instance()
+
+
+def test_watcher_events(watcher, metadata_tests_dir):
+    notifications = []
+    watcher.add_listener(lambda namespace, generation: notifications.append((namespace, generation)))
+    assert watcher.get_generation(METADATA_TEST_NAMESPACE) == 0
+    assert watcher.get_events(METADATA_TEST_NAMESPACE, 0) == (0, [])
+
+    create_json_file(metadata_tests_dir, 'created.json', valid_metadata_json)
+    assert wait_for(lambda: watcher.get_generation(METADATA_TEST_NAMESPACE) == 1)
+    assert notifications == [(METADATA_TEST_NAMESPACE, 1)]
+    generation, events = watcher.get_events(METADATA_TEST_NAMESPACE, 0)
+    assert generation == 1
+    assert events == [dict(generation=1, action='created', name='created')]
+
+    modified_json = copy.deepcopy(valid_metadata_json)
+    modified_json['display_name'] = 'modified metadata instance'
+    create_json_file(metadata_tests_dir, 'created.json', modified_json)
+    assert wait_for(lambda: watcher.get_generation(METADATA_TEST_NAMESPACE) == 2)
+
+    os.remove(os.path.join(metadata_tests_dir, 'created.json'))
+    assert wait_for(lambda: watcher.get_generation(METADATA_TEST_NAMESPACE) == 3)
+
+    generation, events = watcher.get_events(METADATA_TEST_NAMESPACE, 1)
+    assert generation == 3
+    assert events == [dict(generation=2, action='modified', name='created'),
+                      dict(generation=3, action='deleted', name='created')]
+
+    # Generations beyond the current generation indicate a reset
+    assert watcher.get_events(METADATA_TEST_NAMESPACE, 42) == (3, None)
+
+
+def test_watcher_trimmed_events(watcher, metadata_tests_dir):
+    watcher.max_events = 1
+    watcher._events.clear()
+    for i in range(2):
+        create_json_file(metadata_tests_dir, 'created{}.json'.format(i), valid_metadata_json)
+        assert wait_for(lambda: watcher.get_generation(METADATA_TEST_NAMESPACE) == i + 1)
+
+    assert watcher.get_events(METADATA_TEST_NAMESPACE, 1)[1] == [dict(generation=2, action='created',
+                                                                      name='created1')]
+    # The events following generation 0 are no longer available
+    assert watcher.get_events(METADATA_TEST_NAMESPACE, 0) == (2, None)
+
+
+def test_watcher_cache_updates(watcher, metadata_tests_dir):
+    # Age the resources so they're cached, then ensure changes are reflected
+    past = time.time() - 10
+    os.utime(os.path.join(metadata_tests_dir, 'valid.json'), (past, past))
+    filestore = FileMetadataStore(namespace=METADATA_TEST_NAMESPACE)
+    assert filestore.read('valid').display_name == 'valid metadata instance'
+
+    modified_json = copy.deepcopy(valid_metadata_json)
+    modified_json['display_name'] = 'modified metadata instance'
+    create_json_file(metadata_tests_dir, 'valid.json', modified_json)
+    assert wait_for(lambda: watcher.get_generation(METADATA_TEST_NAMESPACE) == 1)
+    assert filestore.read('valid').display_name == 'modified metadata instance'
+
+    os.remove(os.path.join(metadata_tests_dir, 'valid.json'))
+    assert wait_for(lambda: watcher.get_generation(METADATA_TEST_NAMESPACE) == 2)
+    assert len(filestore.get_all()) == 1
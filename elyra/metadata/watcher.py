@@ -0,0 +1,288 @@
+#
+# Copyright 2018-2020 IBM Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import collections
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import sys
+import threading
+import uuid
+
+from jupyter_core.paths import jupyter_path
+from traitlets import Bool, Float, Integer
+from traitlets.config import SingletonConfigurable
+
+from .metadata import FileMetadataCache, SchemaManager
+
+
+class MetadataWatcher(SingletonConfigurable):
+    """Singleton that watches the file-based metadata directories of every namespace and keeps the
+       FileMetadataCache up to date as resources are created, modified or removed.  While running,
+       cached metadata is served without checking the file system for changes.
+
+       Each change bumps the namespace's generation and is recorded as an event, which can be
+       retrieved via get_events() or pushed to listeners registered via add_listener().
+       On Linux, inotify is used to detect changes as they occur.  Elsewhere, or should inotify be
+       unavailable, the directories are polled every 'poll_interval' seconds.
+    """
+
+    # inotify event masks (see inotify(7))
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | \
+        IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+
+    enabled = Bool(False, config=True,
+                   help="""Watch the metadata directories for changes rather than checking for
+                   changes on each access.""")
+
+    use_inotify = Bool(True, config=True,
+                       help="""Use inotify, when available, to detect changes as they occur.
+                       When disabled, the metadata directories are polled.""")
+
+    poll_interval = Float(2.0, config=True,
+                          help="""The interval, in seconds, at which the metadata directories are
+                          polled for changes when inotify is not in use.  When inotify is in use,
+                          this is the interval at which directories that didn't previously exist are
+                          checked for.""")
+
+    max_events = Integer(1000, config=True,
+                         help="""The maximum number of change events retained per namespace.""")
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = FileMetadataCache.instance()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._listeners = []
+        self._inotify_fd = None
+        self._unwatched_dirs = []
+        self._wakeup_fds = None
+        # identifies the current run, since changes made while not running go unnoticed
+        self.run_id = None
+        # namespace -> current generation (bumped with each set of changes)
+        self._generations = {}
+        # namespace -> deque of (generation, action, name) tuples
+        self._events = {}
+        # namespace -> dict of name -> (resource, signature)
+        self._snapshots = {}
+
+    @property
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def using_inotify(self):
+        return self._inotify_fd is not None
+
+    def start(self):
+        """Starts watching the metadata directories.  Does nothing if the watcher is disabled
+           or already running.
+        """
+        if not self.enabled or self.is_running:
+            return
+
+        if self.use_inotify:
+            self._inotify_fd = MetadataWatcher._inotify_init()
+            if self._inotify_fd is not None:
+                self._wakeup_fds = os.pipe()
+                os.set_blocking(self._wakeup_fds[0], False)
+        self.log.info("Watching metadata directories for changes using {}.".
+                      format('inotify' if self.using_inotify else 'polling'))
+
+        self._stop_event.clear()
+        self.run_id = uuid.uuid4().hex
+        self._scan()  # establish the initial snapshots prior to returning
+        self._thread = threading.Thread(target=self._run, name='MetadataWatcher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops watching the metadata directories. """
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        if self._wakeup_fds is not None:
+            os.write(self._wakeup_fds[1], b'x')
+        self._thread.join()
+        self._thread = None
+        if self._inotify_fd is not None:
+            os.close(self._inotify_fd)
+            self._inotify_fd = None
+            for fd in self._wakeup_fds:
+                os.close(fd)
+            self._wakeup_fds = None
+            self._unwatched_dirs = []
+        self.cache.set_watched_directories([])
+
+    def add_listener(self, listener):
+        """Registers a callable that is invoked, from the watcher's thread, with the namespace and
+           its new generation each time changes are detected in that namespace.
+        """
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def get_generation(self, namespace):
+        """Returns the current generation of the given namespace. """
+        with self._lock:
+            return self._generations.get(namespace, 0)
+
+    def get_events(self, namespace, since):
+        """Returns a tuple of the namespace's current generation and the list of events, as
+           dictionaries, that occurred after generation 'since'.  If the events since that
+           generation are no longer available, None is returned in place of the list, in which
+           case the caller should assume everything has changed.
+        """
+        with self._lock:
+            generation = self._generations.get(namespace, 0)
+            events = self._events.get(namespace, ())
+            if since > generation or (since < generation and (not events or events[0][0] > since + 1)):
+                return generation, None
+            return generation, [dict(generation=g, action=action, name=name)
+                                for g, action, name in events if g > since]
+
+    def _run(self):
+        while self._wait_for_changes():
+            self._scan()
+
+    def _wait_for_changes(self):
+        """Waits until changes may have occurred, returning False if the watcher was stopped. """
+        while not self._stop_event.is_set():
+            if self._inotify_fd is None:
+                self._stop_event.wait(self.poll_interval)
+                break
+
+            readable, _, _ = select.select([self._inotify_fd, self._wakeup_fds[0]], [], [], self.poll_interval)
+            if self._inotify_fd in readable:
+                self._stop_event.wait(0.05)  # allow related events to arrive so they're handled together
+                self._drain(self._inotify_fd)
+                break
+            # Directories that didn't exist can't be watched, so check if any have since been created.
+            if any(os.path.isdir(directory) for directory in self._unwatched_dirs):
+                break
+        return not self._stop_event.is_set()
+
+    def _scan(self):
+        namespace_dirs = {namespace: jupyter_path(os.path.join('metadata', namespace))
+                          for namespace in SchemaManager.instance().get_namespaces()}
+        watched_dirs = [metadata_dir for metadata_dirs in namespace_dirs.values() for metadata_dir in metadata_dirs]
+        if self._inotify_fd is not None:
+            # Watch before scanning so nothing is missed.  Include the parent directories so new
+            # namespace directories are noticed.
+            parent_dirs = sorted(set(os.path.dirname(metadata_dir) for metadata_dir in watched_dirs))
+            self._unwatched_dirs = [directory for directory in parent_dirs + watched_dirs
+                                    if not self._add_inotify_watch(directory)]
+        for namespace, metadata_dirs in namespace_dirs.items():
+            self._update_namespace(namespace, metadata_dirs)
+        self.cache.set_watched_directories(watched_dirs)
+
+    def _update_namespace(self, namespace, metadata_dirs):
+        snapshot = {}
+        for metadata_dir in metadata_dirs:
+            try:
+                entries = list(os.scandir(metadata_dir))
+            except OSError:
+                continue
+            for entry in entries:
+                name, ext = os.path.splitext(entry.name)
+                if ext != '.json' or name in snapshot:
+                    continue
+                try:
+                    signature = FileMetadataCache.get_signature(entry.stat())
+                except OSError:
+                    continue
+                snapshot[name] = (entry.path, signature)
+
+        previous = self._snapshots.get(namespace)
+        self._snapshots[namespace] = snapshot
+        if previous is None:  # initial scan
+            return
+
+        changes = []
+        for name, (resource, signature) in snapshot.items():
+            if name not in previous:
+                changes.append(('created', name, resource))
+            elif previous[name] != (resource, signature):
+                changes.append(('modified', name, resource))
+                self.cache.invalidate(previous[name][0])
+        for name, (resource, _) in previous.items():
+            if name not in snapshot:
+                changes.append(('deleted', name, resource))
+        if not changes:
+            return
+
+        for _, _, resource in changes:
+            self.cache.invalidate(resource)
+        with self._lock:
+            generation = self._generations.get(namespace, 0) + 1
+            self._generations[namespace] = generation
+            events = self._events.setdefault(namespace, collections.deque(maxlen=self.max_events))
+            events.extend((generation, action, name) for action, name, _ in changes)
+            listeners = list(self._listeners)
+        self.log.debug("MetadataWatcher: Namespace '{}' is now at generation {} after changes: {}".
+                       format(namespace, generation, [(action, name) for action, name, _ in changes]))
+        for listener in listeners:
+            try:
+                listener(namespace, generation)
+            except Exception:
+                self.log.error("MetadataWatcher: Error notifying listener of changes to namespace '{}'".
+                               format(namespace), exc_info=True)
+
+    def _add_inotify_watch(self, directory):
+        """Adds (or refreshes) the inotify watch on directory, returning True if it's watched. """
+        if not os.path.isdir(directory):
+            return False
+        wd = MetadataWatcher._libc.inotify_add_watch(self._inotify_fd, os.fsencode(directory),
+                                                     MetadataWatcher.IN_WATCH_MASK)
+        return wd >= 0
+
+    @staticmethod
+    def _drain(fd):
+        try:
+            while os.read(fd, 65536):
+                pass
+        except OSError as err:
+            if err.errno != errno.EAGAIN:
+                raise
+
+    _libc = None
+
+    @staticmethod
+    def _inotify_init():
+        """Returns a non-blocking inotify file descriptor or None if inotify is unavailable. """
+        if not sys.platform.startswith('linux'):
+            return None
+        try:
+            if MetadataWatcher._libc is None:
+                MetadataWatcher._libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+            fd = MetadataWatcher._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError):
+            return None
+        return fd if fd >= 0 else None
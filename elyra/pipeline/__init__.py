@@ -15,10 +15,18 @@
 #
 
 from .handlers import PipelineExportHandler
+from .jobs import PipelineJob, PipelineJobManager, report_progress
 from .parser import PipelineParser
 from .pipeline import Operation, Pipeline
-from .processor import PipelineProcessorRegistry, PipelineProcessorManager, PipelineProcessor
-from .processor_kfp import KfpPipelineProcessor
+from .processor import PipelineProcessorRegistry, PipelineProcessorManager, PipelineProcessor, PipelineProcessorContext
 
+# Processors, like KfpPipelineProcessor, are loaded via the 'elyra.pipeline.processors' entry points
+# when first needed, so their dependencies (kfp, kubernetes, minio) aren't imported with the package.
+# KfpPipelineProcessor remains importable from here, and is imported when first accessed.
 
 
+def __getattr__(name):
+    if name == 'KfpPipelineProcessor':
+        from .processor_kfp import KfpPipelineProcessor
+        return KfpPipelineProcessor
+    raise AttributeError("module '{}' has no attribute '{}'".format(__name__, name))
@@ -0,0 +1,145 @@
+#
+# Copyright 2018-2020 IBM Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import collections
+import threading
+import traceback
+import uuid
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from traitlets import Integer
+from traitlets.config import SingletonConfigurable
+
+from .processor import PipelineProcessorContext, PipelineProcessorManager
+
+# The job running on the current thread, whose progress is updated by report_progress()
+_current = threading.local()
+
+
+def report_progress(phase, completed=None, total=None):
+    """Records that the pipeline job running on the calling thread has entered phase (one of
+       PipelineJob.PHASES), of which completed of total items are done.  Does nothing if the calling
+       thread isn't running a job (e.g., when a pipeline is exported).
+    """
+    job = getattr(_current, 'job', None)
+    if job is not None:
+        job.update(phase=phase, progress=dict(completed=completed, total=total) if total is not None else None)
+
+
+class PipelineJob(object):
+    """Tracks the submission of a pipeline by the PipelineJobManager. """
+
+    PHASES = ('archive', 'upload', 'compile', 'submit')
+
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+
+    def __init__(self, pipeline):
+        self.id = uuid.uuid4().hex
+        self.name = pipeline.title
+        self.runtime = pipeline.runtime
+        self.status = PipelineJob.STATUS_PENDING
+        self.phase = None
+        self.progress = None
+        self.url = None
+        self.error = None
+        self.timings = None
+        self.created = self.updated = datetime.now()
+        self._lock = threading.Lock()
+
+    @property
+    def is_finished(self):
+        return self.status in (PipelineJob.STATUS_COMPLETED, PipelineJob.STATUS_FAILED)
+
+    def update(self, **kwargs):
+        with self._lock:
+            for key, value in kwargs.items():
+                setattr(self, key, value)
+            self.updated = datetime.now()
+
+    def to_dict(self):
+        with self._lock:
+            d = dict(job_id=self.id, name=self.name, runtime=self.runtime, status=self.status, phase=self.phase,
+                     progress=self.progress, created=self.created.strftime('%Y-%m-%d %H:%M:%S'),
+                     updated=self.updated.strftime('%Y-%m-%d %H:%M:%S'))
+            if self.url:
+                d['url'] = self.url
+            if self.timings:
+                d['timings'] = {phase: round(seconds, 3) for phase, seconds in self.timings.items()}
+            if self.error:
+                d.update(self.error)
+        return d
+
+
+class PipelineJobManager(SingletonConfigurable):
+    """Singleton that submits pipelines on a pool of worker threads, so submissions don't block
+       the server, and tracks their progress as PipelineJobs.
+    """
+
+    max_workers = Integer(2, config=True,
+                          help="""The maximum number of pipelines submitted concurrently.""")
+
+    max_jobs = Integer(100, config=True,
+                       help="""The maximum number of finished jobs retained.  The oldest are
+                       discarded first.""")
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='PipelineJobManager')
+        self._lock = threading.Lock()
+        self._jobs = collections.OrderedDict()
+
+    def submit(self, pipeline):
+        """Queues pipeline for submission and returns the corresponding PipelineJob. """
+        job = PipelineJob(pipeline)
+        with self._lock:
+            self._jobs[job.id] = job
+            finished = [job_id for job_id, other in self._jobs.items() if other.is_finished]
+            for job_id in finished[:max(0, len(finished) - self.max_jobs)]:
+                del self._jobs[job_id]
+        self._executor.submit(self._run, job, pipeline)
+        return job
+
+    def get_job(self, job_id):
+        """Returns the PipelineJob corresponding to job_id or None if there is no such job. """
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, job, pipeline):
+        self.log.debug("Running pipeline job '{}' for pipeline '{}'...".format(job.id, job.name))
+        job.update(status=PipelineJob.STATUS_RUNNING)
+        _current.job = job
+        context = PipelineProcessorContext(pipeline, parent=self)
+        try:
+            run_url = PipelineProcessorManager.process(pipeline, context)
+        except Exception as err:
+            self.log.error("Pipeline job '{}' for pipeline '{}' failed.".format(job.id, job.name), exc_info=True)
+            # Errors are described like those of the HttpErrorMixin
+            job.update(status=PipelineJob.STATUS_FAILED, timings=context.timings,
+                       error=dict(reason='Pipeline submission failed',
+                                  message=str(err.args[0]) if err.args else repr(err),
+                                  timestamp=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                                  traceback=traceback.format_exc()))
+        else:
+            self.log.info("Pipeline job '{}' for pipeline '{}' completed.".format(job.id, job.name))
+            job.update(status=PipelineJob.STATUS_COMPLETED, progress=None, url=run_url, timings=context.timings)
+        finally:
+            _current.job = None
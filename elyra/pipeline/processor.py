@@ -13,62 +13,145 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import collections
 import entrypoints
+import inspect
+import threading
+import time
+
 from abc import abstractmethod
+from contextlib import contextmanager
 from traitlets.config import SingletonConfigurable, LoggingConfigurable
 
+from ..metadata import MetadataManager
 
-class PipelineProcessorRegistry(SingletonConfigurable):
-    __processors = {}
 
-    def __init__(self):
-        # Register all known processors based on entrypoint configuration
-        for processor in entrypoints.get_group_all('elyra.pipeline.processors'):
-            try:
-                # instantiate an actual instance of the processor
-                processor_instance = processor.load()()  # Load an instance
-                processor_type = processor_instance.type
-                self.log.info('Registering processor "{}" with type -> {}'.format(processor, processor_type))
-                self.__processors[processor_type] = processor_instance
-            except Exception:
-                # log and ignore initialization errors
-                self.log.error('Error registering processor "{}"'.format(processor))
+class PipelineProcessorRegistry(SingletonConfigurable):
+    """Process-wide registry of pipeline processors, by runtime type.  Processors are registered
+       under the 'elyra.pipeline.processors' entry point group, which is read when the registry
+       is created, but a processor is only loaded (importing its dependencies) and instantiated
+       when its type is first requested.  Processors are named after their type in the group.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._processors = {}
+        self._lock = threading.Lock()
+        # Record all known processors based on entrypoint configuration
+        self._entry_points = collections.OrderedDict((entry_point.name, entry_point) for entry_point in
+                                                     entrypoints.get_group_all('elyra.pipeline.processors'))
 
     def add_processor(self, processor):
         self.log.debug('Registering processor {}'.format(processor.type))
-        self.__processors[processor.type] = processor
+        with self._lock:
+            self._processors[processor.type] = processor
 
     def get_processor(self, processor_type):
-        if processor_type in self.__processors.keys():
-            return self.__processors[processor_type]
-        else:
-            return None
+        processor = self._processors.get(processor_type)
+        if processor is None:
+            with self._lock:
+                processor = self._processors.get(processor_type) or self._load_processor(processor_type)
+        return processor
+
+    def _load_processor(self, processor_type):
+        # A processor whose entry point isn't named after its type is found by loading the others
+        names = [processor_type] if processor_type in self._entry_points else list(self._entry_points.keys())
+        for name in names:
+            entry_point = self._entry_points.pop(name)
+            try:
+                # instantiate an actual instance of the processor
+                processor_instance = entry_point.load()(parent=self)  # Load an instance
+                self.log.info('Registering processor "{}" with type -> {}'.format(entry_point,
+                                                                                  processor_instance.type))
+                self._processors[processor_instance.type] = processor_instance
+            except Exception:
+                # log and ignore initialization errors
+                self.log.error('Error registering processor "{}"'.format(entry_point), exc_info=True)
+        return self._processors.get(processor_type)
 
 
 class PipelineProcessorManager(SingletonConfigurable):
     @staticmethod
-    def process(pipeline):
-        registry = PipelineProcessorRegistry()
+    def process(pipeline, context=None):
+        processor = PipelineProcessorManager._get_processor(pipeline)
+        context = context or PipelineProcessorContext(pipeline, parent=processor)
+        try:
+            if PipelineProcessorManager._accepts_context(processor.process):
+                return processor.process(pipeline, context)
+            return processor.process(pipeline)
+        finally:
+            context.log_timings()
 
-        processor_type = pipeline.runtime
-        processor = registry.get_processor(processor_type)
+    @staticmethod
+    def export(pipeline, pipeline_export_format, pipeline_export_path, overwrite, context=None):
+        processor = PipelineProcessorManager._get_processor(pipeline)
+        context = context or PipelineProcessorContext(pipeline, parent=processor)
+        try:
+            if PipelineProcessorManager._accepts_context(processor.export):
+                return processor.export(pipeline, pipeline_export_format, pipeline_export_path, overwrite, context)
+            return processor.export(pipeline, pipeline_export_format, pipeline_export_path, overwrite)
+        finally:
+            context.log_timings()
+
+    @staticmethod
+    def _get_processor(pipeline):
+        processor = PipelineProcessorRegistry.instance().get_processor(pipeline.runtime)
 
         if not processor:
-            raise RuntimeError('Could not find pipeline processor for [{}]'.format(pipeline.platform))
+            raise RuntimeError('Could not find pipeline processor for [{}]'.format(pipeline.runtime))
 
-        return processor.process(pipeline)
+        return processor
 
     @staticmethod
-    def export(pipeline, pipeline_export_format, pipeline_export_path, overwrite):
-        registry = PipelineProcessorRegistry()
+    def _accepts_context(method):
+        # Processors written before contexts were introduced take no context argument
+        parameters = inspect.signature(method).parameters
+        return 'context' in parameters or \
+            any(parameter.kind == inspect.Parameter.VAR_KEYWORD for parameter in parameters.values())
+
+
+class PipelineProcessorContext(LoggingConfigurable):
+    """The state of one submission (or export) of a pipeline, which is passed to its processor so
+       that nothing the submission needs is resolved more than once: the runtime configuration,
+       the clients of object storage and of the runtime, which processors set once created, and
+       the time taken by each phase of the submission.
+    """
+
+    def __init__(self, pipeline, runtime_configuration=None, **kwargs):
+        super().__init__(**kwargs)
+        self.pipeline = pipeline
+        self._runtime_configuration = runtime_configuration
+        self.cos_client = None
+        self.runtime_client = None
+        self.timings = collections.OrderedDict()
 
-        processor_type = pipeline.runtime
-        processor = registry.get_processor(processor_type)
-
-        if not processor:
-            raise RuntimeError('Could not find pipeline processor for [{}]'.format(pipeline.platform))
-
-        return processor.export(pipeline, pipeline_export_format, pipeline_export_path, overwrite)
+    @property
+    def runtime_configuration(self):
+        """The pipeline's runtime configuration, which is retrieved on first use"""
+        if self._runtime_configuration is None:
+            name = self.pipeline.runtime_config
+            with self.timer('runtime_configuration'):
+                try:
+                    self._runtime_configuration = \
+                        MetadataManager(namespace=MetadataManager.NAMESPACE_RUNTIMES, parent=self).get(name)
+                except BaseException as err:
+                    self.log.error('Error retrieving runtime configuration for {}'.format(name), exc_info=True)
+                    raise RuntimeError('Error retrieving runtime configuration for {}'.format(name), err)
+        return self._runtime_configuration
+
+    @contextmanager
+    def timer(self, phase):
+        """Context manager that adds the time spent in its block to the timing of phase"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[phase] = self.timings.get(phase, 0) + time.perf_counter() - start
+
+    def log_timings(self):
+        if self.timings:
+            self.log.debug("Timings of pipeline '{}': {}".format(self.pipeline.title, ', '.join(
+                '{} {:.3f}s'.format(phase, seconds) for phase, seconds in self.timings.items())))
 
 
 class PipelineProcessor(LoggingConfigurable):  # ABC
@@ -79,9 +162,11 @@ class PipelineProcessor(LoggingConfigurable):  # ABC
         raise NotImplementedError()
 
     @abstractmethod
-    def process(self, pipeline):
+    def process(self, pipeline, context=None):
+        """Submits pipeline to the runtime, using and recording what it resolves in context, a
+           PipelineProcessorContext, and returns the URL of the run"""
         raise NotImplementedError()
 
     @abstractmethod
-    def export(self, pipeline, pipeline_export_format, pipeline_export_path, overwrite):
+    def export(self, pipeline, pipeline_export_format, pipeline_export_path, overwrite, context=None):
         raise NotImplementedError()
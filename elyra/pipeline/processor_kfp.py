@@ -14,47 +14,125 @@
 # limitations under the License.
 #
 
+import collections
+import functools
+import hashlib
+import json
 import kfp
 import os
+import pkg_resources
 import tempfile
+import threading
 import autopep8
+import yaml
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
-from elyra.metadata import MetadataManager
-from elyra.pipeline import PipelineProcessor
-from elyra.util.archive import create_temp_archive
+from elyra._version import __version__
+from elyra.pipeline import PipelineProcessor, PipelineProcessorContext
+from elyra.pipeline.jobs import report_progress
+from elyra.util.archive import COMPRESSIONS, COMPRESSION_PARALLEL_GZIP, get_archive_hash, stream_archive
 from elyra.util.cos import CosClient
+from kfp_server_api.rest import ApiException
 from kubernetes.client.models import V1EnvVar
 from notebook.pipeline import NotebookOp
 from urllib3.exceptions import MaxRetryError
 from jinja2 import Environment, PackageLoader
+from traitlets import Bool, Enum, Integer, Unicode
+
+
+@functools.lru_cache(maxsize=None)
+def _get_kfp_notebook_version():
+    """Returns the installed version of kfp-notebook, which provides the NotebookOp"""
+    try:
+        return pkg_resources.get_distribution('kfp-notebook').version
+    except pkg_resources.DistributionNotFound:
+        return None
 
 
 class KfpPipelineProcessor(PipelineProcessor):
     _type = 'kfp'
 
+    max_upload_workers = Integer(8, config=True,
+                                 help="""The maximum number of operations whose dependencies are
+                                 archived and uploaded to object storage concurrently.""")
+
+    upload_part_size = Integer(16 * 1024 * 1024, config=True,
+                               help="""The size, in bytes, of the parts in which dependency archives
+                               larger than it are uploaded to object storage.  Must be at least 5 MiB.""")
+
+    upload_part_workers = Integer(4, config=True,
+                                  help="""The maximum number of parts of a dependency archive uploaded
+                                  to object storage concurrently.""")
+
+    verify_upload_etags = Bool(False, config=True,
+                               help="""Whether the ETags object storage returns for uploaded dependency
+                               archives are verified to be their MD5 checksums.  Object storage verifies
+                               the checksums it's sent either way, and doesn't return MD5 ETags when using
+                               server-side encryption with KMS keys (SSE-KMS).""")
+
+    archive_compression = Enum(COMPRESSIONS, COMPRESSION_PARALLEL_GZIP, config=True,
+                               help="""How dependency archives are compressed: by a single thread
+                               ('gzip'), by all cores, storing already compressed files as is
+                               ('parallel-gzip'), or not at all ('store').""")
+
+    dependency_archive_dir = Unicode('elyra-dependency-archives', config=True,
+                                     help="""The object storage directory in which dependency archives
+                                     are kept by content hash, so unchanged archives are only uploaded
+                                     once.""")
+
+    compiled_workflow_cache_size = Integer(64, config=True,
+                                           help="""The maximum number of compiled workflows cached, by the
+                                           hash of the pipeline they were compiled from, so unchanged
+                                           pipelines are not compiled again.  0 disables caching.""")
+
+    compiled_workflow_cache_dir = Unicode(None, allow_none=True, config=True,
+                                          help="""The directory in which compiled workflows are also cached,
+                                          so they outlive the server.  Workflows include the object storage
+                                          credentials, so the directory should be private.""")
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._kfp_clients = {}  # api endpoint -> kfp.Client
+        self._kfp_clients_lock = threading.Lock()
+        self._experiment_ids = {}  # (api endpoint, experiment name) -> experiment id
+        self._experiment_ids_lock = threading.Lock()
+        self._experiment_locks = {}  # (api endpoint, experiment name) -> lock held while looking it up or creating it
+        self._pipeline_versions = {}  # (api endpoint, pipeline name, workflow hash) -> pipeline version id
+        self._pipeline_versions_lock = threading.Lock()
+        self._pipeline_locks = {}  # (api endpoint, pipeline name) -> lock held while finding or uploading it
+        self._compiled_workflows = collections.OrderedDict()  # pipeline hash -> workflow (yaml)
+        self._compiled_workflows_lock = threading.Lock()
+
     @property
     def type(self):
         return self._type
 
-    def process(self, pipeline):
+    def process(self, pipeline, context=None):
+        context = context or PipelineProcessorContext(pipeline, parent=self)
         timestamp = datetime.now().strftime("%m%d%H%M%S")
-        pipeline_name = (pipeline.title if pipeline.title else 'pipeline') + '-' + timestamp
+        pipeline_title = pipeline.title if pipeline.title else 'pipeline'
+        pipeline_name = pipeline_title + '-' + timestamp
 
-        runtime_configuration = self._get_runtime_configuration(pipeline.runtime_config)
-        api_endpoint = runtime_configuration.metadata['api_endpoint']
+        api_endpoint = context.runtime_configuration.metadata['api_endpoint']
 
         with tempfile.TemporaryDirectory() as temp_dir:
-            pipeline_path = temp_dir + '/' + pipeline_name + '.tar.gz'
+            pipeline_path = temp_dir + '/' + pipeline_name + '.yaml'
 
             self.log.info("Pipeline : %s", pipeline_name)
             self.log.debug("Creating temp directory %s", temp_dir)
 
-            # Compile the new pipeline
+            # upload operation dependencies to object store
+            with context.timer('upload'):
+                self._upload_dependencies(pipeline, context, pipeline_name)
+            self.log.info("Pipeline dependencies have been uploaded to object store")
+
+            # Compile the new pipeline, unless a compilation of the same pipeline is cached
+            report_progress('compile')
             try:
-                pipeline_function = lambda: self._cc_pipeline(pipeline, pipeline_name)  # nopep8
-                kfp.compiler.Compiler().compile(pipeline_function, pipeline_path)
+                with context.timer('compile'):
+                    self._compile_pipeline(pipeline, pipeline_title, context, pipeline_path)
             except Exception as ex:
                 raise RuntimeError('Error compiling pipeline {} at {}'.
                                    format(pipeline_name, pipeline_path), str(ex))
@@ -62,41 +140,175 @@ class KfpPipelineProcessor(PipelineProcessor):
             self.log.info("Kubeflow Pipeline successfully compiled.")
             self.log.debug("Kubeflow Pipeline was created in %s", pipeline_path)
 
-            # Upload the compiled pipeline and create an experiment and run
-            client = kfp.Client(host=api_endpoint)
-            try:
-                kfp_pipeline = client.upload_pipeline(pipeline_path, pipeline_name)
-            except MaxRetryError:
-                raise RuntimeError('Error connecting to pipeline server {}'.format(api_endpoint))
-
-            self.log.info("Kubeflow Pipeline successfully uploaded to : %s", api_endpoint)
-
-            run = client.run_pipeline(experiment_id=client.create_experiment(pipeline_name).id,
-                                      job_name=timestamp,
-                                      pipeline_id=kfp_pipeline.id)
+            # Upload the compiled pipeline, unless unchanged, and create an experiment and run
+            report_progress('submit')
+            with context.timer('submit'):
+                run = self._run_pipeline(context, api_endpoint, pipeline_path, pipeline_title,
+                                         job_name=timestamp, params=dict(cos_directory=pipeline_name))
 
             self.log.info("Starting Kubeflow Pipeline Run...")
             return "{}/#/runs/details/{}".format(api_endpoint, run.id)
 
         return None
 
-    def export(self, pipeline, pipeline_export_format, pipeline_export_path, overwrite):
+    def _run_pipeline(self, context, api_endpoint, pipeline_path, pipeline_title, job_name, params=None):
+        """Runs the compiled pipeline, as a version of the pipeline named pipeline_title that is
+           only uploaded if no version of identical workflow exists, in the experiment of the same
+           name.  Returns the run."""
+        if context.runtime_client is None:
+            context.runtime_client = self._get_kfp_client(api_endpoint)
+        client = context.runtime_client
+        workflow_hash = self._get_workflow_hash(pipeline_path)
+        try:
+            version_id = self._get_pipeline_version_id(client, api_endpoint, pipeline_path, pipeline_title,
+                                                       workflow_hash)
+        except MaxRetryError:
+            raise RuntimeError('Error connecting to pipeline server {}'.format(api_endpoint))
+
+        experiment_id = self._get_experiment_id(client, api_endpoint, pipeline_title)
+        try:
+            return client.run_pipeline(experiment_id=experiment_id, job_name=job_name, params=params or {},
+                                       version_id=version_id)
+        except ApiException as ex:
+            if ex.status != 404:
+                raise
+            # The experiment or pipeline version may have been deleted since their ids were cached
+            self.log.debug("Error running pipeline '{}', retrying with its experiment and version looked up.".
+                           format(pipeline_title), exc_info=True)
+            with self._experiment_ids_lock:
+                self._experiment_ids.pop((api_endpoint, pipeline_title), None)
+            with self._pipeline_versions_lock:
+                self._pipeline_versions.pop((api_endpoint, pipeline_title, workflow_hash), None)
+            version_id = self._get_pipeline_version_id(client, api_endpoint, pipeline_path, pipeline_title,
+                                                       workflow_hash)
+            experiment_id = self._get_experiment_id(client, api_endpoint, pipeline_title)
+            return client.run_pipeline(experiment_id=experiment_id, job_name=job_name, params=params or {},
+                                       version_id=version_id)
+
+    @staticmethod
+    def _get_workflow_hash(pipeline_path):
+        """Returns the hash of the workflow compiled into pipeline_path, which is independent of
+           when it was compiled."""
+        with open(pipeline_path) as f:
+            workflow = yaml.safe_load(f)
+        workflow['metadata'].get('annotations', {}).pop('pipelines.kubeflow.org/pipeline_compilation_time', None)
+        return hashlib.sha256(json.dumps(workflow, sort_keys=True).encode()).hexdigest()
+
+    def _get_pipeline_version_id(self, client, api_endpoint, pipeline_path, pipeline_title, workflow_hash):
+        """Returns the id of the version of the pipeline named pipeline_title whose workflow hashes
+           to workflow_hash.  Versions are named after their hash and looked up on the server when
+           not cached, so the pipeline (when new) or the version is only uploaded if missing.
+           Submissions of the same pipeline wait for each other's lookup, so it's uploaded once,
+           while the cache lock is only held to read and update the cache."""
+        key = (api_endpoint, pipeline_title, workflow_hash)
+        with self._pipeline_versions_lock:
+            version_id = self._pipeline_versions.get(key)
+            pipeline_lock = self._pipeline_locks.setdefault((api_endpoint, pipeline_title), threading.Lock())
+        if version_id is None:
+            with pipeline_lock:
+                with self._pipeline_versions_lock:
+                    version_id = self._pipeline_versions.get(key)
+                if version_id is None:
+                    version_id = self._find_or_upload_pipeline_version(client, pipeline_path, pipeline_title,
+                                                                       '{}-{}'.format(pipeline_title,
+                                                                                      workflow_hash[:16]))
+                    with self._pipeline_versions_lock:
+                        self._pipeline_versions[key] = version_id
+        return version_id
+
+    def _find_or_upload_pipeline_version(self, client, pipeline_path, pipeline_title, version_name):
+        pipelines = self._list_pipelines(client, pipeline_title)
+        if pipelines:
+            pipeline_id = pipelines[0].id
+            versions = self._list_pipeline_versions(client, pipeline_id, version_name)
+            if versions:
+                self.log.info("Kubeflow Pipeline '%s' is unchanged, reusing version '%s'.",
+                              pipeline_title, version_name)
+                return versions[0].id
+        else:
+            # The default version of a new pipeline is named after the pipeline, so the workflow is
+            # also uploaded as a version named after its hash, which later submissions will find
+            pipeline_id = client.upload_pipeline(pipeline_path, pipeline_title).id
+            self.log.info("Kubeflow Pipeline '%s' successfully uploaded.", pipeline_title)
+
+        version = self._upload_pipeline_version(client, pipeline_path, pipeline_id, version_name)
+        self.log.info("Kubeflow Pipeline '%s' version '%s' successfully uploaded.", pipeline_title, version_name)
+        return version.id
+
+    # kfp.Client (as of kfp 0.5) has no public methods to find pipelines by name, or to list and
+    # upload pipeline versions, so these use the generated KFP API clients it wraps, its private
+    # _pipelines_api and _upload_api.  They are only used here.
+
+    @staticmethod
+    def _list_pipelines(client, name):
+        """Returns the pipelines named name"""
+        return client._pipelines_api.list_pipelines(filter=KfpPipelineProcessor._get_name_filter(name)).pipelines
+
+    @staticmethod
+    def _list_pipeline_versions(client, pipeline_id, name):
+        """Returns the versions named name of the pipeline of id pipeline_id"""
+        return client._pipelines_api.list_pipeline_versions(resource_key_type='PIPELINE', resource_key_id=pipeline_id,
+                                                            filter=KfpPipelineProcessor._get_name_filter(name)).versions
+
+    @staticmethod
+    def _upload_pipeline_version(client, pipeline_path, pipeline_id, name):
+        """Uploads the compiled pipeline at pipeline_path as a version named name of the pipeline of
+           id pipeline_id, and returns the version"""
+        return client._upload_api.upload_pipeline_version(pipeline_path, name=name, pipelineid=pipeline_id)
+
+    @staticmethod
+    def _get_name_filter(name):
+        """Returns the (JSON-serialized) filter of the KFP API listing resources named name"""
+        return json.dumps(dict(predicates=[dict(key='name', op='EQUALS', string_value=name)]))
+
+    def _get_kfp_client(self, api_endpoint):
+        """Returns the kfp.Client of api_endpoint, which is created on first use and shared by
+           submissions (it's thread-safe), so its connections and configuration are reused."""
+        with self._kfp_clients_lock:
+            client = self._kfp_clients.get(api_endpoint)
+            if client is None:
+                client = self._kfp_clients[api_endpoint] = kfp.Client(host=api_endpoint)
+        return client
+
+    def _get_experiment_id(self, client, api_endpoint, experiment_name):
+        """Returns the id of the experiment named experiment_name, which is created if it doesn't
+           exist, and cached.  Submissions to the same experiment wait for each other's lookup, so
+           it's created once, while the cache lock is only held to read and update the cache."""
+        key = (api_endpoint, experiment_name)
+        with self._experiment_ids_lock:
+            experiment_id = self._experiment_ids.get(key)
+            experiment_lock = self._experiment_locks.setdefault(key, threading.Lock())
+        if experiment_id is None:
+            with experiment_lock:
+                with self._experiment_ids_lock:
+                    experiment_id = self._experiment_ids.get(key)
+                if experiment_id is None:
+                    # create_experiment() returns the existing experiment of that name, if any
+                    experiment_id = client.create_experiment(experiment_name).id
+                    with self._experiment_ids_lock:
+                        self._experiment_ids[key] = experiment_id
+        return experiment_id
+
+    def export(self, pipeline, pipeline_export_format, pipeline_export_path, overwrite, context=None):
         if pipeline_export_format not in ["yaml", "py"]:
             raise ValueError("Pipeline export format {} not recognized.".format(pipeline_export_format))
 
+        context = context or PipelineProcessorContext(pipeline, parent=self)
         pipeline_name = (pipeline.title if pipeline.title else 'pipeline')
 
-        runtime_configuration = self._get_runtime_configuration(pipeline.runtime_config)
-        api_endpoint = runtime_configuration.metadata['api_endpoint']
+        api_endpoint = context.runtime_configuration.metadata['api_endpoint']
 
         if os.path.exists(pipeline_export_path) and not overwrite:
             raise ValueError("File " + pipeline_export_path + " already exists.")
 
+        with context.timer('upload'):
+            self._upload_dependencies(pipeline, context, pipeline_name)
+
         self.log.info('Creating pipeline definition as a .' + pipeline_export_format + ' file')
         if pipeline_export_format != "py":
             try:
-                pipeline_function = lambda: self._cc_pipeline(pipeline, pipeline_name)  # nopep8
-                kfp.compiler.Compiler().compile(pipeline_function, pipeline_export_path)
+                with context.timer('compile'):
+                    self._compile_pipeline(pipeline, pipeline_name, context, pipeline_export_path)
             except Exception as ex:
                 raise RuntimeError('Error compiling pipeline {} for export at {}'.
                                    format(pipeline_name, pipeline_export_path), str(ex))
@@ -107,7 +319,8 @@ class KfpPipelineProcessor(PipelineProcessor):
 
             template = template_env.get_template('kfp_template.jinja2')
 
-            defined_pipeline = self._cc_pipeline(pipeline, pipeline_name)
+            with context.timer('compile'):
+                defined_pipeline = self._cc_pipeline(pipeline, pipeline_name, context)
 
             python_output = template.render(operations_list=defined_pipeline,
                                             pipeline_name=pipeline_name,
@@ -120,14 +333,106 @@ class KfpPipelineProcessor(PipelineProcessor):
 
         return pipeline_export_path
 
-    def _cc_pipeline(self, pipeline, pipeline_name):
+    def _compile_pipeline(self, pipeline, pipeline_title, context, pipeline_path):
+        """Compiles pipeline into the workflow at pipeline_path.  The object storage directory its
+           dependencies are in is the workflow's 'cos_directory' parameter, pipeline_title by default.
+           Compiled workflows are cached by the hash of what they are compiled from."""
+        pipeline_hash = self._get_pipeline_hash(pipeline, pipeline_title, context.runtime_configuration)
+        workflow = self._get_cached_workflow(pipeline_hash)
+        if workflow is None:
+            def pipeline_function(cos_directory=pipeline_title):
+                return self._cc_pipeline(pipeline, pipeline_title, context, cos_directory=cos_directory)
+
+            with tempfile.TemporaryDirectory() as temp_dir:
+                workflow_path = os.path.join(temp_dir, 'pipeline.yaml')
+                kfp.compiler.Compiler().compile(pipeline_function, workflow_path)
+                with open(workflow_path) as f:
+                    workflow = f.read()
+            self._cache_workflow(pipeline_hash, workflow)
+        else:
+            self.log.info("Using the cached compilation of pipeline '%s'.", pipeline_title)
 
-        runtime_configuration = self._get_runtime_configuration(pipeline.runtime_config)
+        if pipeline_path.endswith('.yaml') or pipeline_path.endswith('.yml'):
+            with open(pipeline_path, 'w') as f:
+                f.write(workflow)
+        else:
+            # Packaged as .tar.gz or .zip
+            kfp.compiler.Compiler._write_workflow(yaml.safe_load(workflow), pipeline_path)
+
+    def _get_pipeline_hash(self, pipeline, pipeline_title, runtime_configuration):
+        """Returns the hash of everything the workflow of pipeline is compiled from: its operations
+           (in order), the object storage they use and the versions of the compiler.  Dependencies
+           are referenced by archive name, so changes to their content don't change the workflow."""
+        content = dict(title=pipeline_title,
+                       operations=[dict(id=operation.id, title=operation.title, artifact=operation.artifact,
+                                        image=operation.image, vars=operation.vars, inputs=operation.inputs,
+                                        outputs=operation.outputs, dependencies=operation.dependencies)
+                                   for operation in pipeline.operations.values()],
+                       object_storage={key: runtime_configuration.metadata.get(key) for key in
+                                       ['cos_endpoint', 'cos_username', 'cos_password', 'cos_bucket']},
+                       versions=dict(elyra=__version__, kfp=kfp.__version__, kfp_notebook=_get_kfp_notebook_version()))
+        return hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+    def _get_cached_workflow(self, pipeline_hash):
+        """Returns the cached workflow compiled from pipeline_hash, if any, from memory or else from
+           the 'compiled_workflow_cache_dir'."""
+        if self.compiled_workflow_cache_size <= 0:
+            return None
+        with self._compiled_workflows_lock:
+            workflow = self._compiled_workflows.get(pipeline_hash)
+            if workflow is not None:
+                self._compiled_workflows.move_to_end(pipeline_hash)
+                return workflow
+        if self.compiled_workflow_cache_dir:
+            workflow_path = os.path.join(self.compiled_workflow_cache_dir, pipeline_hash + '.yaml')
+            try:
+                with open(workflow_path) as f:
+                    workflow = f.read()
+                os.utime(workflow_path)  # Recently used files are pruned last
+            except OSError:
+                return None
+            self._cache_workflow(pipeline_hash, workflow, write=False)
+        return workflow
+
+    def _cache_workflow(self, pipeline_hash, workflow, write=True):
+        """Caches workflow (compiled from pipeline_hash) in memory and, if write, in the
+           'compiled_workflow_cache_dir', discarding the least recently used workflows beyond
+           'compiled_workflow_cache_size'."""
+        if self.compiled_workflow_cache_size <= 0:
+            return
+        with self._compiled_workflows_lock:
+            self._compiled_workflows[pipeline_hash] = workflow
+            self._compiled_workflows.move_to_end(pipeline_hash)
+            while len(self._compiled_workflows) > self.compiled_workflow_cache_size:
+                self._compiled_workflows.popitem(last=False)
+        if write and self.compiled_workflow_cache_dir:
+            try:
+                os.makedirs(self.compiled_workflow_cache_dir, mode=0o700, exist_ok=True)
+                # Written to a private temporary file that's renamed, so concurrent readers never see part of it
+                fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=self.compiled_workflow_cache_dir)
+                with os.fdopen(fd, 'w') as f:
+                    f.write(workflow)
+                os.replace(temp_path, os.path.join(self.compiled_workflow_cache_dir, pipeline_hash + '.yaml'))
+
+                with os.scandir(self.compiled_workflow_cache_dir) as entries:
+                    cached = sorted((entry for entry in entries if entry.name.endswith('.yaml')),
+                                    key=lambda entry: entry.stat().st_mtime)
+                for entry in cached[:max(0, len(cached) - self.compiled_workflow_cache_size)]:
+                    os.remove(entry.path)
+            except OSError:
+                self.log.warning("Error caching compiled workflow in '{}'.".format(self.compiled_workflow_cache_dir),
+                                 exc_info=True)
+
+    def _cc_pipeline(self, pipeline, pipeline_name, context, cos_directory=None):
+        """Creates the NotebookOps of pipeline, which reference its dependencies in the object storage
+           directory cos_directory (by default pipeline_name, which they were uploaded to)."""
+        runtime_configuration = context.runtime_configuration
 
         cos_endpoint = runtime_configuration.metadata['cos_endpoint']
         cos_username = runtime_configuration.metadata['cos_username']
         cos_password = runtime_configuration.metadata['cos_password']
-        cos_directory = pipeline_name
+        if cos_directory is None:
+            cos_directory = pipeline_name
         bucket_name = runtime_configuration.metadata['cos_bucket']
 
         # Create dictionary that maps component Id to its ContainerOp instance
@@ -194,19 +499,6 @@ class KfpPipelineProcessor(PipelineProcessor):
 
             self.log.info("NotebookOp Created for Component %s \n", operation.id)
 
-            # upload operation dependencies to object store
-            try:
-                dependency_archive_path = self._generate_dependency_archive(operation)
-                cos_client = CosClient(config=runtime_configuration)
-                cos_client.upload_file_to_dir(dir=cos_directory,
-                                              file_name=operation_artifact_archive,
-                                              file_path=dependency_archive_path)
-            except BaseException:
-                self.log.error("Error uploading artifacts to object storage.", exc_info=True)
-                raise
-
-            self.log.info("Pipeline dependencies have been uploaded to object store")
-
         # Process dependencies after all the operations have been created
         for pipeline_operation in pipeline.operations.values():
             op = notebook_ops[pipeline_operation.id]
@@ -216,6 +508,76 @@ class KfpPipelineProcessor(PipelineProcessor):
 
         return notebook_ops
 
+    def _upload_dependencies(self, pipeline, context, cos_directory):
+        """Archives and uploads the dependencies of each operation to object storage, with up to
+           'max_upload_workers' operations processed concurrently.  Archives are uploaded to the
+           'dependency_archive_dir' under their content hash, unless already present, and copied
+           from there into cos_directory.  Returns once every upload has finished, raising a
+           RuntimeError describing each operation that failed.
+        """
+        operations = list(pipeline.operations.values())
+        if not operations:
+            return
+
+        # The client is shared by the workers (and submissions), so the bucket is only checked for once.
+        if context.cos_client is None:
+            try:
+                context.cos_client = CosClient.get_instance(config=context.runtime_configuration,
+                                                            pool_size=max(10, self.max_upload_workers *
+                                                                          self.upload_part_workers))
+            except BaseException:
+                self.log.error("Error uploading artifacts to object storage.", exc_info=True)
+                raise
+        cos_client = context.cos_client
+
+        def upload(operation):
+            archive_contents = self._get_dependency_archive_contents(operation)
+            archive_hash, archive_size = get_archive_hash(**archive_contents)
+            # Archives are reproducible, so they're named by content hash to identify unchanged dependencies
+            stored_archive_name = os.path.join(self.dependency_archive_dir, archive_hash + '.tar.gz')
+            uploaded = not cos_client.file_exists(stored_archive_name)
+            if uploaded:
+                # The archive is streamed into object storage, rather than written to a temporary file
+                try:
+                    with stream_archive(expected_hash=archive_hash, **archive_contents) as archive:
+                        cos_client.upload_stream(stored_archive_name, archive, archive_size,
+                                                 part_size=self.upload_part_size,
+                                                 part_workers=self.upload_part_workers,
+                                                 verify_etags=self.verify_upload_etags)
+                except BaseException:
+                    # Don't leave an archive that doesn't match its name, should it have been stored
+                    try:
+                        cos_client.remove_file(stored_archive_name)
+                    except Exception:
+                        pass
+                    raise
+            cos_client.copy_file(stored_archive_name,
+                                 os.path.join(cos_directory, self._get_dependency_archive_name(operation)))
+            return uploaded
+
+        report_progress('archive', 0, len(operations))
+        errors = []
+        uploads = 0
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_upload_workers, len(operations))),
+                                thread_name_prefix='KfpDependencyUpload') as executor:
+            futures = {executor.submit(upload, operation): operation for operation in operations}
+            for completed, future in enumerate(as_completed(futures), 1):
+                operation = futures[future]
+                try:
+                    uploads += future.result()
+                except Exception as ex:
+                    self.log.error("Error uploading artifacts of operation '{}' to object storage.".
+                                   format(operation.title), exc_info=True)
+                    errors.append("{} ({}): {}".format(operation.title, operation.id, ex))
+                report_progress('upload', completed, len(operations))
+
+        if errors:
+            raise RuntimeError("Error uploading artifacts of {} of {} operations to object storage:\n{}".
+                               format(len(errors), len(operations), "\n".join(errors)))
+
+        self.log.debug("Uploaded {} of {} dependency archives, the others were unchanged.".
+                       format(uploads, len(operations)))
+
     def _artifact_list_to_str(self, pipeline_array):
         if not pipeline_array:
             return "None"
@@ -230,29 +592,13 @@ class KfpPipelineProcessor(PipelineProcessor):
     def _get_dependency_source_dir(self, operation):
         return os.path.join(os.getcwd(), os.path.dirname(operation.artifact))
 
-    def _generate_dependency_archive(self, operation):
-        archive_artifact_name = self._get_dependency_archive_name(operation)
-        archive_source_dir = self._get_dependency_source_dir(operation)
-
+    def _get_dependency_archive_contents(self, operation):
+        """Returns the source_dir, files, recursive and compression arguments with which the
+           operation's dependency archive is created (see elyra.util.archive.write_archive())"""
         files = [os.path.basename(operation.artifact)]
         files.extend(operation.file_dependencies)
 
-        archive_artifact = create_temp_archive(archive_name=archive_artifact_name,
-                                               source_dir=archive_source_dir,
-                                               files=files,
-                                               recursive=operation.recursive_dependencies)
-
-        return archive_artifact
-
-    def _get_runtime_configuration(self, name):
-        """
-        Retrieve associated runtime configuration based on processor type
-        :return: metadata in json format
-        """
-        try:
-            runtime_configuration = MetadataManager(namespace=MetadataManager.NAMESPACE_RUNTIMES).get(name)
-            return runtime_configuration
-        except BaseException as err:
-            self.log.error('Error retrieving runtime configuration for {}'.format(name),
-                           exc_info=True)
-            raise RuntimeError('Error retrieving runtime configuration for {}', err)
+        return dict(source_dir=self._get_dependency_source_dir(operation),
+                    files=files,
+                    recursive=operation.recursive_dependencies,
+                    compression=self.archive_compression)
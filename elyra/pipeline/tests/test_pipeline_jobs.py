@@ -0,0 +1,110 @@
+#
+# Copyright 2018-2020 IBM Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import json
+import os
+import threading
+import pytest
+
+from elyra.pipeline import PipelineJob, PipelineJobManager, PipelineParser, report_progress
+from elyra.pipeline import jobs as jobs_module
+
+
+@pytest.fixture
+def job_manager():
+    PipelineJobManager.clear_instance()
+    job_manager = PipelineJobManager.instance()
+    yield job_manager
+    job_manager.shutdown()
+    PipelineJobManager.clear_instance()
+
+
+@pytest.fixture
+def pipeline():
+    with open(os.path.join(os.path.dirname(__file__), 'pipeline_valid.json')) as f:
+        return PipelineParser.parse(json.load(f))
+
+
+def _wait_for(job):
+    for _ in range(500):
+        if job.is_finished:
+            return
+        threading.Event().wait(0.01)
+    raise AssertionError("Job '{}' did not finish.".format(job.id))
+
+
+def test_job_completed(job_manager, pipeline, monkeypatch):
+    proceed = threading.Event()
+
+    def process(pipeline, context):
+        report_progress('archive', 0, 2)
+        proceed.wait(5)
+        report_progress('submit')
+        with context.timer('submit'):
+            pass
+        return 'http://localhost:31380/pipeline/#/runs/details/1234'
+
+    monkeypatch.setattr(jobs_module.PipelineProcessorManager, 'process', process)
+    job = job_manager.submit(pipeline)
+    assert job_manager.get_job(job.id) is job
+    assert job.to_dict()['status'] in (PipelineJob.STATUS_PENDING, PipelineJob.STATUS_RUNNING)
+
+    for _ in range(500):
+        if job.phase == 'archive':
+            break
+        threading.Event().wait(0.01)
+    job_dict = job.to_dict()
+    assert job_dict['status'] == PipelineJob.STATUS_RUNNING
+    assert job_dict['phase'] == 'archive'
+    assert job_dict['progress'] == dict(completed=0, total=2)
+    assert 'url' not in job_dict
+
+    proceed.set()
+    _wait_for(job)
+    job_dict = job.to_dict()
+    assert job_dict['status'] == PipelineJob.STATUS_COMPLETED
+    assert job_dict['phase'] == 'submit'
+    assert job_dict['url'] == 'http://localhost:31380/pipeline/#/runs/details/1234'
+    assert list(job_dict['timings'].keys()) == ['submit']
+
+    assert job_manager.get_job('bogus') is None
+
+
+def test_job_failed(job_manager, pipeline, monkeypatch):
+    def process(pipeline, context):
+        raise RuntimeError('Error connecting to pipeline server')
+
+    monkeypatch.setattr(jobs_module.PipelineProcessorManager, 'process', process)
+    job = job_manager.submit(pipeline)
+    _wait_for(job)
+    job_dict = job.to_dict()
+    assert job_dict['status'] == PipelineJob.STATUS_FAILED
+    assert job_dict['message'] == 'Error connecting to pipeline server'
+    assert 'RuntimeError' in job_dict['traceback']
+
+
+def test_finished_jobs_discarded(job_manager, pipeline, monkeypatch):
+    monkeypatch.setattr(jobs_module.PipelineProcessorManager, 'process', lambda pipeline, context: None)
+    job_manager.max_jobs = 2
+    jobs = []
+    for _ in range(4):
+        jobs.append(job_manager.submit(pipeline))
+        _wait_for(jobs[-1])
+    job_manager.submit(pipeline)
+    assert [job_manager.get_job(job.id) is not None for job in jobs] == [False, False, True, True]
+
+
+def test_report_progress_without_job():
+    report_progress('compile')  # does nothing outside of a job
@@ -0,0 +1,439 @@
+#
+# Copyright 2018-2020 IBM Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import io
+import itertools
+import json
+import os
+import tarfile
+import threading
+import pytest
+import yaml
+
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qs, urlparse
+from kfp_server_api.rest import ApiException
+
+from elyra.pipeline import Operation, Pipeline, PipelineProcessorContext
+from elyra.pipeline import processor_kfp
+from elyra.util.archive import get_archive_hash
+
+
+@pytest.fixture
+def processor():
+    return processor_kfp.KfpPipelineProcessor()
+
+
+@pytest.fixture
+def pipeline():
+    pipeline = Pipeline(id='{{uuid}}', title='{{title}}', runtime='kfp', runtime_config='{{runtime_config}}',
+                        file_type=None, export=False)
+    for i in range(6):
+        operation = Operation(id='op-{}'.format(i), type='execution-node', title='notebook-{}'.format(i),
+                              artifact='notebook-{}.ipynb'.format(i), image='{{image}}')
+        pipeline.operations[operation.id] = operation
+    return pipeline
+
+
+class MockCosClient(object):
+    instances = []
+
+    def __init__(self, config=None):
+        self.objects = {}
+        self.uploads = []
+        MockCosClient.instances.append(self)
+
+    @classmethod
+    def get_instance(cls, config=None, pool_size=10):
+        return cls.instances[0] if cls.instances else cls(config=config)
+
+    def file_exists(self, file_name):
+        return file_name in self.objects
+
+    def upload_stream(self, file_name, data, length, part_size=None, part_workers=None, verify_etags=False):
+        if file_name in MockCosClient.unreachable:
+            raise ConnectionError('Connection refused')
+        self.objects[file_name] = data.read(length)
+        self.uploads.append((file_name, threading.current_thread().name))
+
+    def copy_file(self, source_file_name, file_name):
+        self.objects[file_name] = self.objects[source_file_name]
+
+    def remove_file(self, file_name):
+        self.objects.pop(file_name, None)
+
+
+@pytest.fixture
+def context(pipeline):
+    # The runtime configuration is only passed to the (mock) object storage client
+    return PipelineProcessorContext(pipeline, runtime_configuration=object())
+
+
+@pytest.fixture
+def cos_client(processor, pipeline, monkeypatch, tmp_path):
+    # The operations' notebooks are archived from the current directory
+    monkeypatch.chdir(tmp_path)
+    for operation in pipeline.operations.values():
+        (tmp_path / operation.artifact).write_text(operation.title)
+    MockCosClient.instances = []
+    MockCosClient.unreachable = []
+    monkeypatch.setattr(processor_kfp, 'CosClient', MockCosClient)
+    return MockCosClient
+
+
+def stored_archive_name(processor, operation):
+    archive_hash, _ = get_archive_hash(**processor._get_dependency_archive_contents(operation))
+    return 'elyra-dependency-archives/' + archive_hash + '.tar.gz'
+
+
+def test_upload_dependencies(processor, pipeline, context, cos_client):
+    cos_client.unreachable = [stored_archive_name(processor, pipeline.operations[op_id]) for op_id in ['op-3', 'op-5']]
+    with pytest.raises(RuntimeError) as e:
+        processor._upload_dependencies(pipeline, context, 'pipeline-dir')
+    assert "Error uploading artifacts of 2 of 6 operations to object storage" in str(e.value)
+    assert "notebook-3 (op-3): Connection refused" in str(e.value)
+    assert "notebook-5 (op-5): Connection refused" in str(e.value)
+
+    # A single client is shared by the workers, each of which archived and uploaded its operation's dependencies
+    assert len(cos_client.instances) == 1
+    client = cos_client.instances[0]
+    assert len(client.uploads) == 4
+    assert all(file_name.startswith('elyra-dependency-archives/') for file_name, _ in client.uploads)
+    assert all(thread_name.startswith('KfpDependencyUpload') for _, thread_name in client.uploads)
+    assert sorted(file_name for file_name in client.objects if file_name.startswith('pipeline-dir/')) == \
+        ['pipeline-dir/notebook-0-op-0.tar.gz', 'pipeline-dir/notebook-1-op-1.tar.gz',
+         'pipeline-dir/notebook-2-op-2.tar.gz', 'pipeline-dir/notebook-4-op-4.tar.gz']
+
+    # The archives were streamed into object storage
+    with tarfile.open(fileobj=io.BytesIO(client.objects['pipeline-dir/notebook-1-op-1.tar.gz'])) as tar:
+        assert tar.getnames() == ['', 'notebook-1.ipynb']
+        assert tar.extractfile('notebook-1.ipynb').read() == b'notebook-1'
+
+
+def test_upload_dependencies_sequential(processor, pipeline, context, cos_client):
+    processor.max_upload_workers = 1
+    processor._upload_dependencies(pipeline, context, 'pipeline-dir')
+    assert len(cos_client.instances[0].uploads) == 6
+
+
+def test_upload_changed_dependencies(processor, pipeline, context, cos_client, tmp_path):
+    processor._upload_dependencies(pipeline, context, 'pipeline-dir-1')
+    client = cos_client.instances[0]
+    assert len(client.uploads) == 6
+
+    # Only the archive of the changed notebook is uploaded again, by the same client
+    (tmp_path / 'notebook-2.ipynb').write_text('changed')
+    processor._upload_dependencies(pipeline, context, 'pipeline-dir-2')
+    assert len(cos_client.instances) == 1
+    assert len(client.uploads) == 7
+    assert len([file_name for file_name in client.objects if file_name.startswith('pipeline-dir-2/')]) == 6
+    assert client.objects['pipeline-dir-2/notebook-2-op-2.tar.gz'] != \
+        client.objects['pipeline-dir-1/notebook-2-op-2.tar.gz']
+    assert client.objects['pipeline-dir-2/notebook-1-op-1.tar.gz'] == \
+        client.objects['pipeline-dir-1/notebook-1-op-1.tar.gz']
+
+
+class FakeKfpApi(BaseHTTPRequestHandler):
+    """A fake of the KFP API server, that records the requests it receives and the connections
+       they were received on. """
+    protocol_version = 'HTTP/1.1'  # Connections are kept alive
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        api = self.server.api
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        api['requests'].append(('GET', url.path))
+        api['connections'].add(self.client_address)
+        names = [predicate['string_value'] for predicate in json.loads(query.get('filter', '{"predicates": []}'))
+                 ['predicates'] if predicate['key'] == 'name']
+        if url.path == '/apis/v1beta1/experiments':
+            self.respond(200, dict(experiments=list(api['experiments'].values())))
+        elif url.path.startswith('/apis/v1beta1/experiments/') and url.path[26:] in api['experiments']:
+            self.respond(200, api['experiments'][url.path[26:]])
+        elif url.path == '/apis/v1beta1/pipelines':
+            self.respond(200, dict(pipelines=[pipeline for pipeline in api['pipelines'].values()
+                                              if pipeline['name'] in names]))
+        elif url.path == '/apis/v1beta1/pipeline_versions':
+            self.respond(200, dict(versions=[version for version in api['versions'].values()
+                                             if version['pipeline_id'] == query['resource_key.id'] and
+                                             version['name'] in names]))
+        else:
+            self.respond(404, dict(error='Not found', code=5))
+
+    def do_POST(self):
+        api = self.server.api
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        api['requests'].append(('POST', url.path))
+        api['connections'].add(self.client_address)
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        if url.path == '/apis/v1beta1/experiments':
+            experiment_id = 'experiment-{}'.format(next(api['ids']))
+            api['experiments'][experiment_id] = dict(id=experiment_id, name=json.loads(body)['name'])
+            self.respond(200, api['experiments'][experiment_id])
+        elif url.path == '/apis/v1beta1/pipelines/upload':
+            pipeline = dict(id='pipeline-{}'.format(next(api['ids'])), name=query['name'])
+            api['pipelines'][pipeline['id']] = pipeline
+            pipeline['default_version'] = self.create_version(pipeline['id'], pipeline['name'])
+            self.respond(200, pipeline)
+        elif url.path == '/apis/v1beta1/pipelines/upload_version':
+            self.respond(200, self.create_version(query['pipelineid'], query['name']))
+        elif url.path == '/apis/v1beta1/runs' and 'run_status' in api:
+            self.respond(api['run_status'], dict(error='Internal error', code=13))
+        elif url.path == '/apis/v1beta1/runs':
+            run = json.loads(body)
+            references = {reference['key']['type']: reference['key']['id'] for reference in run['resource_references']}
+            if references['EXPERIMENT'] not in api['experiments'] or \
+                    references['PIPELINE_VERSION'] not in api['versions']:
+                self.respond(404, dict(error='Resource not found', code=5))
+            else:
+                api['runs'].append((references['EXPERIMENT'], references['PIPELINE_VERSION'],
+                                    {param['name']: param['value'] for param in run['pipeline_spec']['parameters']}))
+                self.respond(200, dict(run=dict(id='run-{}'.format(len(api['runs'])), name=run['name'])))
+        else:
+            self.respond(404, dict(error='Not found', code=5))
+
+    def create_version(self, pipeline_id, name):
+        version = dict(id='version-{}'.format(next(self.server.api['ids'])), name=name, pipeline_id=pipeline_id)
+        self.server.api['versions'][version['id']] = version
+        return version
+
+    def respond(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class FakeKfpApiServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+@pytest.fixture
+def kfp_api():
+    server = FakeKfpApiServer(('127.0.0.1', 0), FakeKfpApi)
+    server.api = dict(requests=[], connections=set(), experiments={}, pipelines={}, versions={}, runs=[],
+                      ids=itertools.count())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def run_pipeline(processor, pipeline, kfp_api, tmp_path, job_name, image='{{image}}'):
+    # A compiled workflow, of which only the compilation time changes between submissions
+    workflow = dict(apiVersion='argoproj.io/v1alpha1', kind='Workflow',
+                    metadata=dict(annotations={'pipelines.kubeflow.org/pipeline_compilation_time': job_name}),
+                    spec=dict(templates=[dict(name='notebook', container=dict(image=image))]))
+    pipeline_path = tmp_path / (job_name + '.yaml')
+    pipeline_path.write_text(yaml.safe_dump(workflow))
+    return processor._run_pipeline(PipelineProcessorContext(pipeline, runtime_configuration=object()),
+                                   'http://127.0.0.1:{}'.format(kfp_api.server_port), str(pipeline_path),
+                                   pipeline.title, job_name, params=dict(cos_directory=job_name))
+
+
+def test_run_pipeline_reuses_client_and_experiment(processor, pipeline, kfp_api, tmp_path):
+    assert run_pipeline(processor, pipeline, kfp_api, tmp_path, 'job-1').id == 'run-1'
+    requests = list(kfp_api.api['requests'])
+    # The experiment was looked up by name (and created, as it didn't exist)
+    assert ('POST', '/apis/v1beta1/experiments') in requests
+
+    assert run_pipeline(processor, pipeline, kfp_api, tmp_path, 'job-2').id == 'run-2'
+    # Subsequent runs of the unchanged pipeline are only created, over the same connection(s)
+    assert kfp_api.api['requests'][len(requests):] == [('POST', '/apis/v1beta1/runs')]
+    assert len(processor._kfp_clients) == 1
+    assert list(kfp_api.api['experiments'].values()) == [dict(id='experiment-3', name=pipeline.title)]
+    assert [run[0] for run in kfp_api.api['runs']] == ['experiment-3', 'experiment-3']
+    assert len(kfp_api.api['connections']) == 1
+
+
+def test_run_pipeline_concurrently(processor, pipeline, kfp_api, tmp_path):
+    # Concurrent first submissions of a pipeline create its experiment, and upload it, once
+    errors = []
+
+    def submit(index):
+        try:
+            run_pipeline(processor, pipeline, kfp_api, tmp_path, 'job-{}'.format(index))
+        except Exception as ex:
+            errors.append(ex)
+
+    threads = [threading.Thread(target=submit, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert kfp_api.api['requests'].count(('POST', '/apis/v1beta1/experiments')) == 1
+    assert kfp_api.api['requests'].count(('POST', '/apis/v1beta1/pipelines/upload')) == 1
+    assert len(set(run[:2] for run in kfp_api.api['runs'])) == 1
+    assert len(kfp_api.api['runs']) == 4
+
+
+def test_run_pipeline_versions(processor, pipeline, kfp_api, tmp_path):
+    run_pipeline(processor, pipeline, kfp_api, tmp_path, 'job-1')
+    run_pipeline(processor, pipeline, kfp_api, tmp_path, 'job-2')
+    # The pipeline was uploaded once, its runs using its version named after its hash (rather
+    # than its default version) and their own directories
+    assert [(pipeline['id'], pipeline['name']) for pipeline in kfp_api.api['pipelines'].values()] == \
+        [('pipeline-0', pipeline.title)]
+    assert [version['id'] for version in kfp_api.api['versions'].values()] == ['version-1', 'version-2']
+    assert kfp_api.api['versions']['version-2']['name'].startswith(pipeline.title + '-')
+    assert kfp_api.api['runs'] == [('experiment-3', 'version-2', dict(cos_directory='job-1')),
+                                   ('experiment-3', 'version-2', dict(cos_directory='job-2'))]
+
+    # Versions are found on the server when they aren't cached (e.g., once the server restarted)
+    processor._pipeline_versions.clear()
+    requests = len(kfp_api.api['requests'])
+    run_pipeline(processor, pipeline, kfp_api, tmp_path, 'job-3')
+    assert ('POST', '/apis/v1beta1/pipelines/upload_version') not in kfp_api.api['requests'][requests:]
+    assert kfp_api.api['runs'][-1][1] == 'version-2'
+
+    # A changed pipeline is uploaded as a new version of the pipeline, once
+    run_pipeline(processor, pipeline, kfp_api, tmp_path, 'job-4', image='{{changed-image}}')
+    run_pipeline(processor, pipeline, kfp_api, tmp_path, 'job-5', image='{{changed-image}}')
+    assert len(kfp_api.api['pipelines']) == 1
+    assert [version['id'] for version in kfp_api.api['versions'].values()] == ['version-1', 'version-2', 'version-4']
+    assert [run[1] for run in kfp_api.api['runs']][3:] == ['version-4', 'version-4']
+
+    processor._pipeline_versions.clear()
+    requests = len(kfp_api.api['requests'])
+    run_pipeline(processor, pipeline, kfp_api, tmp_path, 'job-6', image='{{changed-image}}')
+    assert ('POST', '/apis/v1beta1/pipelines/upload_version') not in kfp_api.api['requests'][requests:]
+    assert kfp_api.api['runs'][-1][1] == 'version-4'
+
+
+def test_run_pipeline_existing_experiment(processor, pipeline, kfp_api, tmp_path):
+    kfp_api.api['experiments']['experiment-9'] = dict(id='experiment-9', name=pipeline.title)
+    run_pipeline(processor, pipeline, kfp_api, tmp_path, 'job-1')
+    assert ('POST', '/apis/v1beta1/experiments') not in kfp_api.api['requests']
+    assert kfp_api.api['runs'][0][0] == 'experiment-9'
+
+
+def test_run_pipeline_deleted_resources(processor, pipeline, kfp_api, tmp_path):
+    run_pipeline(processor, pipeline, kfp_api, tmp_path, 'job-1')
+    del kfp_api.api['experiments']['experiment-3']
+    del kfp_api.api['versions']['version-2']
+
+    # The cached ids are dropped, the experiment created again and the pipeline uploaded as a new version
+    run_pipeline(processor, pipeline, kfp_api, tmp_path, 'job-2')
+    assert [run[:2] for run in kfp_api.api['runs']] == [('experiment-3', 'version-2'), ('experiment-5', 'version-4')]
+    assert list(kfp_api.api['experiments'].values()) == [dict(id='experiment-5', name=pipeline.title)]
+
+
+def test_run_pipeline_error(processor, pipeline, kfp_api, tmp_path):
+    run_pipeline(processor, pipeline, kfp_api, tmp_path, 'job-1')
+    kfp_api.api['run_status'] = 500
+
+    # Errors other than missing resources aren't retried, nor drop the cached ids
+    requests = len(kfp_api.api['requests'])
+    with pytest.raises(ApiException) as e:
+        run_pipeline(processor, pipeline, kfp_api, tmp_path, 'job-2')
+    assert e.value.status == 500
+    assert kfp_api.api['requests'][requests:] == [('POST', '/apis/v1beta1/runs')]
+    assert len(processor._experiment_ids) == 1
+    assert len(processor._pipeline_versions) == 1
+
+
+def notebook_op(name, notebook, cos_endpoint, cos_bucket, cos_directory, cos_pull_archive, pipeline_outputs,
+                pipeline_inputs, image):
+    # Stands in for kfp-notebook's NotebookOp, which similarly passes its arguments to the container
+    return processor_kfp.kfp.dsl.ContainerOp(name=name, image=image, command=['sh', '-c'],
+                                             arguments=['--cos-directory "{}" --notebook "{}"'.
+                                                        format(cos_directory, notebook)])
+
+
+class RuntimeConfiguration(object):
+    metadata = dict(api_endpoint='http://kfp', cos_endpoint='http://minio', cos_username='user',
+                    cos_password='password', cos_bucket='bucket')
+
+
+@pytest.fixture
+def compilations(processor, monkeypatch):
+    monkeypatch.setattr(processor_kfp, 'NotebookOp', notebook_op)
+    compilations = []
+    compile = processor_kfp.kfp.compiler.Compiler.compile
+    monkeypatch.setattr(processor_kfp.kfp.compiler.Compiler, 'compile',
+                        lambda self, *args, **kwargs: compilations.append(args) or compile(self, *args, **kwargs))
+    return compilations
+
+
+def compile_pipeline(processor, pipeline, tmp_path, name='pipeline.yaml'):
+    context = PipelineProcessorContext(pipeline, runtime_configuration=RuntimeConfiguration())
+    processor._compile_pipeline(pipeline, pipeline.title, context, str(tmp_path / name))
+    return (tmp_path / name).read_bytes()
+
+
+def test_compile_pipeline_cached(processor, pipeline, compilations, tmp_path):
+    workflow = compile_pipeline(processor, pipeline, tmp_path)
+    assert len(compilations) == 1
+    # The object storage directory is a parameter of the workflow
+    assert b'{{inputs.parameters.cos_directory}}' in workflow
+    assert yaml.safe_load(workflow)['spec']['arguments']['parameters'] == \
+        [dict(name='cos_directory', value=pipeline.title)]
+
+    # Unchanged pipelines are not compiled again, in any format
+    assert compile_pipeline(processor, pipeline, tmp_path, 'pipeline-2.yaml') == workflow
+    compile_pipeline(processor, pipeline, tmp_path, 'pipeline.tar.gz')
+    with tarfile.open(tmp_path / 'pipeline.tar.gz') as tar:
+        assert yaml.safe_load(tar.extractfile('pipeline.yaml')) == yaml.safe_load(workflow)
+    assert len(compilations) == 1
+
+    # Changed pipelines are
+    pipeline.operations['op-2'].vars.append('VAR=value')
+    assert compile_pipeline(processor, pipeline, tmp_path) != workflow
+    assert len(compilations) == 2
+
+
+def test_compile_pipeline_cache_size(processor, pipeline, compilations, tmp_path):
+    processor.compiled_workflow_cache_size = 1
+    compile_pipeline(processor, pipeline, tmp_path)
+    pipeline.operations['op-2'].vars.append('VAR=value')
+    compile_pipeline(processor, pipeline, tmp_path)
+    pipeline.operations['op-2'].vars.pop()
+    compile_pipeline(processor, pipeline, tmp_path)
+    assert len(compilations) == 3
+
+    processor.compiled_workflow_cache_size = 0
+    compile_pipeline(processor, pipeline, tmp_path)
+    assert len(compilations) == 4
+
+
+def test_compile_pipeline_cache_dir(pipeline, compilations, monkeypatch, tmp_path):
+    cache_dir = tmp_path / 'cache'
+    processor = processor_kfp.KfpPipelineProcessor(compiled_workflow_cache_dir=str(cache_dir),
+                                                   compiled_workflow_cache_size=2)
+    workflow = compile_pipeline(processor, pipeline, tmp_path)
+    assert [path.suffix for path in cache_dir.iterdir()] == ['.yaml']
+    assert oct(cache_dir.stat().st_mode & 0o777) == oct(0o700)
+    assert oct(next(cache_dir.iterdir()).stat().st_mode & 0o777) == oct(0o600)
+
+    # The workflows cached by other processors (e.g., before the server restarted) are used
+    other = processor_kfp.KfpPipelineProcessor(compiled_workflow_cache_dir=str(cache_dir),
+                                               compiled_workflow_cache_size=2)
+    assert compile_pipeline(other, pipeline, tmp_path) == workflow
+    assert len(compilations) == 1
+
+    # The least recently used are discarded
+    for image in ['{{image-1}}', '{{image-2}}']:
+        pipeline.operations['op-0']._image = image
+        compile_pipeline(processor, pipeline, tmp_path)
+    assert len(os.listdir(str(cache_dir))) == 2
@@ -0,0 +1,142 @@
+#
+# Copyright 2018-2020 IBM Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import pytest
+import subprocess
+import sys
+
+from elyra.pipeline import Pipeline, PipelineProcessor, PipelineProcessorContext, PipelineProcessorManager, \
+    PipelineProcessorRegistry
+from elyra.pipeline import processor as processor_module
+
+
+class MockProcessor(PipelineProcessor):
+    _type = None
+
+    @property
+    def type(self):
+        return self._type
+
+    def process(self, pipeline, context):
+        assert context.pipeline is pipeline
+        return 'processed by {}'.format(self.type)
+
+    def export(self, pipeline, pipeline_export_format, pipeline_export_path, overwrite, context):
+        return pipeline_export_path
+
+
+class MockEntryPoint(object):
+    def __init__(self, name, processor_type=None, error=None):
+        self.name = name
+        self.loads = 0
+        self.processor_class = type('MockProcessor', (MockProcessor,), dict(_type=processor_type or name))
+        self.error = error
+
+    def load(self):
+        self.loads += 1
+        if self.error:
+            raise self.error
+        return self.processor_class
+
+
+@pytest.fixture
+def entry_points(monkeypatch):
+    entry_points = [MockEntryPoint('kfp'), MockEntryPoint('local'), MockEntryPoint('airflow-processor', 'airflow'),
+                    MockEntryPoint('broken', error=ImportError('No module named broken'))]
+    monkeypatch.setattr(processor_module.entrypoints, 'get_group_all', lambda group: entry_points)
+    PipelineProcessorRegistry.clear_instance()
+    yield {entry_point.name: entry_point for entry_point in entry_points}
+    PipelineProcessorRegistry.clear_instance()
+
+
+def _pipeline(runtime):
+    return Pipeline(id='{{uuid}}', title='{{title}}', runtime=runtime, runtime_config='{{runtime_config}}',
+                    file_type=None, export=False)
+
+
+def test_processors_load_when_requested(entry_points):
+    registry = PipelineProcessorRegistry.instance()
+    assert all(entry_point.loads == 0 for entry_point in entry_points.values())
+
+    processor = registry.get_processor('kfp')
+    assert processor.type == 'kfp'
+    assert processor.parent is registry
+    assert registry.get_processor('kfp') is processor
+    assert [name for name, entry_point in entry_points.items() if entry_point.loads] == ['kfp']
+
+
+def test_processor_named_differently(entry_points):
+    registry = PipelineProcessorRegistry.instance()
+    assert registry.get_processor('airflow').type == 'airflow'
+    assert registry.get_processor('local').type == 'local'
+    assert registry.get_processor('broken') is None
+    assert registry.get_processor('unknown') is None
+    assert all(entry_point.loads == 1 for entry_point in entry_points.values())
+
+
+def test_manager_uses_registry_instance(entry_points):
+    assert PipelineProcessorManager.process(_pipeline('local')) == 'processed by local'
+    assert PipelineProcessorManager.process(_pipeline('local')) == 'processed by local'
+    assert entry_points['local'].loads == 1
+    assert entry_points['kfp'].loads == 0
+
+    with pytest.raises(RuntimeError) as e:
+        PipelineProcessorManager.export(_pipeline('unknown'), 'yaml', '/tmp/pipeline.yaml', False)
+    assert 'Could not find pipeline processor for [unknown]' in str(e.value)
+
+
+def test_manager_supports_processors_without_context(monkeypatch):
+    class LegacyProcessor(PipelineProcessor):
+        type = 'legacy'
+
+        def process(self, pipeline):
+            return 'processed by legacy'
+
+        def export(self, pipeline, pipeline_export_format, pipeline_export_path, overwrite):
+            return pipeline_export_path
+
+    processor = LegacyProcessor()
+    monkeypatch.setattr(PipelineProcessorManager, '_get_processor', staticmethod(lambda pipeline: processor))
+    assert PipelineProcessorManager.process(_pipeline('legacy')) == 'processed by legacy'
+    assert PipelineProcessorManager.export(_pipeline('legacy'), 'yaml', '/tmp/pipeline.yaml', False) == \
+        '/tmp/pipeline.yaml'
+
+
+def test_context_resolves_runtime_configuration_once(monkeypatch):
+    lookups = []
+
+    class MockMetadataManager(object):
+        NAMESPACE_RUNTIMES = 'runtimes'
+
+        def __init__(self, namespace, parent=None):
+            self.namespace = namespace
+
+        def get(self, name):
+            lookups.append((self.namespace, name))
+            return dict(name=name)
+
+    monkeypatch.setattr(processor_module, 'MetadataManager', MockMetadataManager)
+    context = PipelineProcessorContext(_pipeline('kfp'))
+    assert context.runtime_configuration == dict(name='{{runtime_config}}')
+    assert context.runtime_configuration == dict(name='{{runtime_config}}')
+    assert lookups == [('runtimes', '{{runtime_config}}')]
+    assert list(context.timings.keys()) == ['runtime_configuration']
+
+
+def test_kfp_processor_imported_when_accessed():
+    script = "import sys, elyra.pipeline; print('kfp' in sys.modules); " \
+             "from elyra.pipeline import KfpPipelineProcessor; print(KfpPipelineProcessor.__module__)"
+    output = subprocess.check_output([sys.executable, '-c', script], universal_newlines=True)
+    assert output.split() == ['False', 'elyra.pipeline.processor_kfp']
@@ -16,7 +16,9 @@
 import json
 
 from notebook.base.handlers import APIHandler
-from ..pipeline import PipelineParser, PipelineProcessorManager
+from notebook.utils import url_path_join
+from tornado import web
+from ..pipeline import PipelineJobManager, PipelineParser, PipelineProcessorManager
 from ..util.http import HttpErrorMixin
 
 
@@ -41,13 +43,15 @@ class SchedulerHandler(HttpErrorMixin, APIHandler):
             PipelineProcessorManager.export(pipeline)
             json_msg = json.dumps({"status": "ok",
                                    "message": "Pipeline successfully exported"})
+            self.set_status(200)
         else:
-            run_url = PipelineProcessorManager.process(pipeline)
-            json_msg = json.dumps({"status": "ok",
-                                   "message": "Pipeline successfully submitted",
-                                   "url": run_url})
+            # Submission takes a while, so it's done in the background.  Its progress is available
+            # from the SchedulerJobHandler.
+            job = PipelineJobManager.instance().submit(pipeline)
+            json_msg = json.dumps(dict(job.to_dict(), message="Pipeline submission started"))
+            self.set_header('Location', url_path_join(self.base_url, 'api', 'scheduler', job.id))
+            self.set_status(202)
 
-        self.set_status(200)
         self.write(json_msg)
         self.flush()
 
@@ -56,3 +60,16 @@ class SchedulerHandler(HttpErrorMixin, APIHandler):
             return "None"
         else:
             return ','.join(pipeline_array)
+
+
+class SchedulerJobHandler(HttpErrorMixin, APIHandler):
+    """Handler reporting the progress of a pipeline submitted via the SchedulerHandler. """
+
+    @web.authenticated
+    def get(self, job_id):
+        job = PipelineJobManager.instance().get_job(job_id)
+        if job is None:
+            raise web.HTTPError(404, "Pipeline job '{}' was not found!".format(job_id))
+
+        self.set_header("Content-Type", 'application/json')
+        self.finish(job.to_dict())
@@ -14,4 +14,4 @@
 # limitations under the License.
 #
 
-from .archive import create_temp_archive
+from .archive import create_temp_archive, get_archive_hash, get_file_hash, stream_archive, write_archive
@@ -14,72 +14,394 @@
 # limitations under the License.
 #
 
+import collections
+import gzip
+import hashlib
 import os
+import re
+import struct
 import tarfile
 import tempfile
+import threading
+import zlib
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+# The modification time recorded for archived files, so archives of the same files are identical
+ARCHIVE_MTIME = 315532800  # 1980-01-01, also the earliest time representable in zip files
+
+# Compression of archives, all of which produce gzip compressed archives:
+#  - gzip: compressed by a single thread
+#  - parallel-gzip: compressed in blocks by multiple threads, like pigz, storing already compressed files
+#  - store: not compressed, for archives of already compressed files
+COMPRESSION_GZIP = 'gzip'
+COMPRESSION_PARALLEL_GZIP = 'parallel-gzip'
+COMPRESSION_STORE = 'store'
+COMPRESSIONS = [COMPRESSION_GZIP, COMPRESSION_PARALLEL_GZIP, COMPRESSION_STORE]
+
+# Directories that are never archived, in addition to hidden directories
+EXCLUDED_DIRECTORIES = {'__pycache__', 'node_modules'}
+
+# Files that are already compressed, which parallel-gzip compression stores as is
+STORED_EXTENSIONS = {'.7z', '.avi', '.bz2', '.gif', '.gz', '.jar', '.jpeg', '.jpg', '.mov', '.mp3', '.mp4', '.npz',
+                     '.parquet', '.png', '.rar', '.tgz', '.webp', '.whl', '.xz', '.zip', '.zst'}
 
 
 def create_project_temp_dir():
     temp_dir = tempfile.gettempdir()
     project_temp_dir = os.path.join(temp_dir, 'elyra')
-    if not os.path.exists(project_temp_dir):
-        os.mkdir(project_temp_dir)
+    os.makedirs(project_temp_dir, exist_ok=True)  # may be called concurrently
     return project_temp_dir
 
 
-def create_temp_archive(archive_name, source_dir, files=None, recursive=False):
+def create_temp_archive(archive_name, source_dir, files=None, recursive=False, compression=COMPRESSION_GZIP):
     """
-    Create archive file with specified list of files
+    Create archive file with specified list of files.  The archive is reproducible: archiving
+    the same files again produces an identical archive (see get_file_hash()), regardless of
+    the files' timestamps or ownership.
     :param archive_name: the name of the archive to be created
     :param source_dir: the root folder containing source files
     :param files: list of files, or masks, used to select contents of the archive
     :param recursive: flag to include sub directories recursively
+    :param compression: how the archive is compressed, one of COMPRESSIONS
     :return: full path of the created archive
     """
-
-    def tar_filter(tarinfo):
-        """Filter files from the generated archive"""
-        if tarinfo.type == tarfile.DIRTYPE:
-            # ignore hidden directories (e.g. ipynb checkpoints and/or trash contents)
-            if any(dir.startswith('.') for dir in tarinfo.name.split('/')):
-                return None
-            # always return the base directory (empty string) otherwise tar will be empty
-            elif not tarinfo.name:
-                return tarinfo
-            # only include subdirectories if enabled in common properties
-            elif recursive:
-                return tarinfo
-            else:
-                return None
-
-        if '*' in files:
-            return tarinfo
-
-        for dependency in files:
-            if dependency:
-                if dependency.startswith('*'):
-                    # handle check for extension wildcard
-                    if tarinfo.name.endswith(dependency.replace('*.', '.')):
-                        return tarinfo
-                elif tarinfo.name == dependency:
-                    # handle check for specific file
-                    return tarinfo
-                elif recursive:
-                    # handle recursive
-                    return tarinfo
-
-        return None
-
-    if files is None:
-        files = ['*']
-
     temp_dir = create_project_temp_dir()
     archive = os.path.join(temp_dir, archive_name)
 
-    with tarfile.open(archive, "w:gz") as tar:
-        tar.add(source_dir, arcname="", filter=tar_filter)
+    with open(archive, 'wb') as f:
+        write_archive(f, source_dir, files=files, recursive=recursive, compression=compression)
 
     if not archive:
         raise RuntimeError('Internal error creating archive: {}'.format(archive_name))
 
     return archive
+
+
+def write_archive(fileobj, source_dir, files=None, recursive=False, compression=COMPRESSION_GZIP):
+    """
+    Write a reproducible gzip compressed archive with specified list of files.  Files are
+    selected by glob patterns (see _DependencyMatcher); hidden directories and those in
+    EXCLUDED_DIRECTORIES are never archived.
+    :param fileobj: the writable file object to which the archive is written
+    :param source_dir: the root folder containing source files
+    :param files: list of files, or masks, used to select contents of the archive
+    :param recursive: flag to include sub directories recursively
+    :param compression: how the archive is compressed, one of COMPRESSIONS
+    :return:
+    """
+
+    def add(tar, path, arcname):
+        """Adds path to the archive like TarFile.add(), but adds directory entries in sorted
+           order and without the timestamps and ownership of the files"""
+        tarinfo = tar.gettarinfo(path, arcname)
+        tarinfo.mtime = ARCHIVE_MTIME
+        tarinfo.uid = tarinfo.gid = 0
+        tarinfo.uname = tarinfo.gname = ''
+        if tarinfo.isreg():
+            store = compression == COMPRESSION_PARALLEL_GZIP and \
+                os.path.splitext(path)[1].lower() in STORED_EXTENSIONS
+            if store:
+                compressor.set_level(0)
+            with open(path, 'rb') as f:
+                tar.addfile(tarinfo, f)
+            if store:
+                compressor.set_level(compressor.compresslevel)
+        else:
+            tar.addfile(tarinfo)
+            if tarinfo.isdir():
+                # Entries are filtered before they're stat'ed, and excluded directories aren't walked
+                for entry in sorted(os.scandir(path), key=lambda entry: entry.name):
+                    entry_arcname = os.path.join(arcname, entry.name)
+                    if entry.is_dir(follow_symlinks=False):
+                        # only include subdirectories if enabled in common properties
+                        if recursive and matcher.match_directory(entry_arcname):
+                            add(tar, entry.path, entry_arcname)
+                    elif matcher.match_file(entry_arcname):
+                        add(tar, entry.path, entry_arcname)
+
+    if files is None:
+        files = ['*']
+    matcher = _DependencyMatcher(files, recursive)
+
+    # The gzip header's file name and modification time are left empty
+    if compression == COMPRESSION_PARALLEL_GZIP:
+        compressor = _ParallelGzipWriter(fileobj)
+    elif compression in (COMPRESSION_GZIP, COMPRESSION_STORE):
+        compressor = gzip.GzipFile(filename='', mode='wb', fileobj=fileobj, mtime=0,
+                                   compresslevel=9 if compression == COMPRESSION_GZIP else 0)
+    else:
+        raise ValueError("Compression '{}' is not one of {}.".format(compression, COMPRESSIONS))
+
+    with compressor, tarfile.open(fileobj=compressor, mode='w', format=tarfile.PAX_FORMAT) as tar:
+        add(tar, source_dir, '')
+
+
+def get_archive_hash(source_dir, files=None, recursive=False, compression=COMPRESSION_GZIP):
+    """
+    Returns the sha256 hash and size of the archive of the specified list of files, without
+    writing the archive
+    :param source_dir: the root folder containing source files
+    :param files: list of files, or masks, used to select contents of the archive
+    :param recursive: flag to include sub directories recursively
+    :param compression: how the archive is compressed, one of COMPRESSIONS
+    :return: the hexadecimal digest and the size in bytes of the archive
+    """
+    writer = _HashingWriter()
+    write_archive(writer, source_dir, files=files, recursive=recursive, compression=compression)
+    return writer.hash.hexdigest(), writer.size
+
+
+@contextmanager
+def stream_archive(source_dir, files=None, recursive=False, compression=COMPRESSION_GZIP, expected_hash=None):
+    """
+    Context manager that archives the specified list of files on a separate thread, providing
+    the archive as a readable file object.  The archive is passed through a pipe, so it's never
+    written to disk and only a pipe buffer of it is held in memory.  The file object must be
+    read to its end.
+    :param source_dir: the root folder containing source files
+    :param files: list of files, or masks, used to select contents of the archive
+    :param recursive: flag to include sub directories recursively
+    :param compression: how the archive is compressed, one of COMPRESSIONS
+    :param expected_hash: the sha256 hash the archive must have (see get_archive_hash()), which
+           is verified once the archive has been read
+    :return: the readable file object
+    """
+    read_fd, write_fd = os.pipe()
+    writer = _HashingWriter(write_fd)
+    errors = []
+
+    def write():
+        try:
+            with writer:
+                write_archive(writer, source_dir, files=files, recursive=recursive, compression=compression)
+        except BaseException as ex:  # including a BrokenPipeError if the reader stopped reading
+            errors.append(ex)
+
+    thread = threading.Thread(target=write, name='ArchiveWriter', daemon=True)
+    thread.start()
+    try:
+        with open(read_fd, 'rb') as reader:
+            yield reader
+    finally:
+        # Closing the reader unblocks the writer should the archive not have been read to its end
+        thread.join()
+
+    if errors:
+        raise RuntimeError('Error archiving {}: {}'.format(source_dir, errors[0])) from errors[0]
+    if expected_hash and writer.hash.hexdigest() != expected_hash:
+        raise RuntimeError('Files in {} changed while being archived.'.format(source_dir))
+
+
+class _HashingWriter(object):
+    """File object that hashes and counts what's written to it, passing it on to fd if given"""
+
+    def __init__(self, fd=None):
+        self.hash = hashlib.sha256()
+        self.size = 0
+        self._file = open(fd, 'wb') if fd is not None else None
+
+    def write(self, data):
+        self.hash.update(data)
+        self.size += len(data)
+        if self._file:
+            self._file.write(data)
+        return len(data)
+
+    def flush(self):
+        if self._file:
+            self._file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        if self._file:
+            self._file.close()
+
+
+def get_file_hash(file_path):
+    """
+    Returns the sha256 hash of the contents of a file
+    :param file_path: the file to hash
+    :return: the hexadecimal digest
+    """
+    file_hash = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+class _DependencyMatcher(object):
+    """Matches the paths, relative to the source directory, of the files and directories selected
+       by a list of glob patterns.  Patterns are compiled once into a regular expression each for
+       files and directories:
+        - patterns without a '/' (e.g. '*.py') match files by name, in any directory
+        - other patterns (e.g. 'data/*.csv') match paths from the source directory, with '**'
+          matching any number of directories
+        - when recursive, the contents of directories matching a pattern are selected
+       Directories are only walked if they may contain selected files."""
+
+    def __init__(self, files, recursive):
+        patterns = [pattern[2:] if pattern.startswith('./') else pattern for pattern in files if pattern]
+        patterns = [pattern.strip('/') for pattern in patterns if pattern.strip('/')]
+        file_patterns = []
+        directory_patterns = []
+        for pattern in patterns:
+            if '/' not in pattern:
+                file_patterns.append('(?:.*/)?' + _translate_glob(pattern))
+                directory_patterns.append('.*')
+                continue
+            file_patterns.append(_translate_glob(pattern))
+            # The directories leading to the pattern's matches, or all directories from a '**' on
+            segments = pattern.split('/')
+            for count in range(1, len(segments)):
+                if segments[count - 1] == '**':
+                    prefix = '/'.join(segments[:count - 1])
+                    directory_patterns.append(_translate_glob(prefix) + '/.*' if prefix else '.*')
+                    break
+                directory_patterns.append(_translate_glob('/'.join(segments[:count])))
+            if recursive:
+                directory_patterns.append(_translate_glob(pattern) + '(?:/.*)?')
+
+        contents = '(?:/.*)?' if recursive else ''
+        self._file_regex = re.compile('(?:{}){}\\Z'.format('|'.join(file_patterns) or '(?!)', contents), re.DOTALL)
+        self._directory_regex = re.compile('(?:{})\\Z'.format('|'.join(directory_patterns) or '(?!)'), re.DOTALL)
+
+    def match_file(self, path):
+        return self._file_regex.match(path) is not None
+
+    def match_directory(self, path):
+        # ignore hidden directories (e.g. ipynb checkpoints and/or trash contents)
+        name = os.path.basename(path)
+        if name.startswith('.') or name in EXCLUDED_DIRECTORIES:
+            return False
+        return self._directory_regex.match(path) is not None
+
+
+def _translate_glob(pattern):
+    """Returns the regular expression for a glob pattern, in which '*' and '?' don't match '/'
+       and '**/' matches any number of directories"""
+    regex = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if pattern.startswith('**/', i):
+            regex.append('(?:.*/)?')
+            i += 3
+            continue
+        if pattern.startswith('**', i):
+            regex.append('.*')
+            i += 2
+            continue
+        if c == '*':
+            regex.append('[^/]*')
+        elif c == '?':
+            regex.append('[^/]')
+        elif c == '[':
+            # A ']' directly following '[' or '[!' is part of the set, as in fnmatch
+            end = i + 2 if pattern.startswith('[!', i) else i + 1
+            end = pattern.find(']', end + 1)
+            if end == -1:
+                regex.append('\\[')
+            else:
+                chars = pattern[i + 1:end].replace('\\', '\\\\')
+                if chars.startswith('!'):
+                    chars = '^' + chars[1:]
+                elif chars.startswith('^'):
+                    chars = '\\' + chars
+                regex.append('[' + chars + ']')
+                i = end + 1
+                continue
+        else:
+            regex.append(re.escape(c))
+        i += 1
+    return ''.join(regex)
+
+
+def _compress_block(data, level, dictionary):
+    """Returns data compressed as raw deflate blocks, ending on a byte boundary (like pigz) so
+       the compressed blocks of consecutive data can be concatenated"""
+    if dictionary:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS, zlib.DEF_MEM_LEVEL,
+                                      zlib.Z_DEFAULT_STRATEGY, dictionary)
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+
+class _ParallelGzipWriter(object):
+    """File object that gzip compresses what's written to it in blocks, each compressed by one of
+       a pool of threads (zlib releases the GIL), and writes the compressed blocks, in order, to
+       fileobj.  Like pigz, the last 32 KiB of each block are the dictionary of the next, so the
+       output is deterministic and a single gzip member.  The compression level can be changed
+       between blocks, e.g. to store already compressed data."""
+
+    BLOCK_SIZE = 128 * 1024
+    DICTIONARY_SIZE = 32 * 1024
+
+    def __init__(self, fileobj, compresslevel=6, workers=None):
+        self.compresslevel = compresslevel
+        self._fileobj = fileobj
+        self._level = compresslevel
+        workers = workers or os.cpu_count() or 1
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ArchiveCompressor')
+        self._max_pending = 2 * workers
+        self._pending = collections.deque()
+        self._buffer = bytearray()
+        self._dictionary = None
+        self._crc = 0
+        self._size = 0
+        # A header without file name or modification time, as written by gzip.GzipFile
+        self._fileobj.write(b'\x1f\x8b\x08\x00' + struct.pack('<L', 0) + b'\x00\xff')
+
+    def write(self, data):
+        self._crc = zlib.crc32(data, self._crc)
+        self._size += len(data)
+        self._buffer += data
+        while len(self._buffer) >= self.BLOCK_SIZE:
+            self._submit(bytes(self._buffer[:self.BLOCK_SIZE]))
+            del self._buffer[:self.BLOCK_SIZE]
+        return len(data)
+
+    def set_level(self, level):
+        """Compresses data written from now on at level, ending the current block if necessary"""
+        if level != self._level:
+            if self._buffer:
+                self._submit(bytes(self._buffer))
+                self._buffer.clear()
+            self._level = level
+
+    def tell(self):
+        return self._size
+
+    def flush(self):
+        pass
+
+    def close(self):
+        if self._buffer:
+            self._submit(bytes(self._buffer))
+            self._buffer.clear()
+        while self._pending:
+            self._fileobj.write(self._pending.popleft().result())
+        self._executor.shutdown()
+        # The final (empty) block, followed by the trailer
+        self._fileobj.write(zlib.compressobj(self.compresslevel, zlib.DEFLATED, -zlib.MAX_WBITS).flush())
+        self._fileobj.write(struct.pack('<LL', self._crc & 0xffffffff, self._size & 0xffffffff))
+
+    def _submit(self, block):
+        self._pending.append(self._executor.submit(_compress_block, block, self._level, self._dictionary))
+        self._dictionary = block[-self.DICTIONARY_SIZE:]
+        while len(self._pending) > self._max_pending:
+            self._fileobj.write(self._pending.popleft().result())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *args):
+        if exc_type is None:
+            self.close()
+        else:
+            self._executor.shutdown(wait=False)
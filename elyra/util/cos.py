@@ -13,43 +13,106 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import base64
+import certifi
+import hashlib
 import os
+import threading
+import urllib3
+
+from concurrent.futures import ThreadPoolExecutor
 from minio import Minio
-from minio.error import ResponseError, BucketAlreadyOwnedByYou, BucketAlreadyExists
+from minio.definitions import UploadPart
+from minio.error import ResponseError, BadDigest, BucketAlreadyOwnedByYou, BucketAlreadyExists, NoSuchBucket, \
+    NoSuchKey
 from urllib.parse import urlparse
 from traitlets.config import LoggingConfigurable
 
+# Multipart uploads use Minio's private methods (_new_multipart_upload, _do_put_object,
+# _list_incomplete_uploads, _list_object_parts and _complete_multipart_upload), since its public
+# API doesn't let parts be verified, retried or resumed.  They exist, with the signatures used
+# here, in the Minio versions setup.py allows (which test_cos.py checks).
+MIN_PART_SIZE = 5 * 1024 * 1024  # the minimum size of all but the last part of a multipart upload
+DEFAULT_PART_SIZE = 16 * 1024 * 1024
+DEFAULT_PART_WORKERS = 4
+PART_RETRIES = 3
+
+
+class ChecksumError(RuntimeError):
+    """Raised when the ETag of uploaded data doesn't match its checksum (if ETags are verified)"""
+    pass
+
 
 class CosClient(LoggingConfigurable):
     client = None
 
-    def __init__(self, config=None, endpoint=None, access_key=None, secret_key=None, secure=False, bucket=None):
+    # (endpoint, access_key, secret_key, secure, bucket) -> CosClient, see get_instance()
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, config=None, endpoint=None, access_key=None, secret_key=None, secure=False, bucket=None,
+                 pool_size=10):
+        self.endpoint, self.access_key, self.secret_key, self.secure, self.bucket = \
+            CosClient._get_settings(config, endpoint, access_key, secret_key, secure, bucket)
+        self.pool_size = pool_size
+
+        self.client = self.__initialize_object_store()
+
+    @classmethod
+    def get_instance(cls, config=None, endpoint=None, access_key=None, secret_key=None, secure=False, bucket=None,
+                     pool_size=10):
+        """Returns the CosClient for the given object storage endpoint, credentials and bucket,
+           creating it on first use.  Clients are shared (and are safe to use from multiple
+           threads), so their connections are reused and the bucket is only checked for once.
+        """
+        key = cls._get_settings(config, endpoint, access_key, secret_key, secure, bucket)
+        with cls._instances_lock:
+            instance = cls._instances.get(key)
+            if instance is None:
+                instance = cls._instances[key] = cls(config=config, endpoint=endpoint, access_key=access_key,
+                                                     secret_key=secret_key, secure=secure, bucket=bucket,
+                                                     pool_size=pool_size)
+        return instance
+
+    @staticmethod
+    def _get_settings(config, endpoint, access_key, secret_key, secure, bucket):
+        """Returns the (endpoint, access_key, secret_key, secure, bucket) tuple of settings, which
+           are taken from the runtime configuration if provided.
+        """
         if config:
-            self.endpoint = urlparse(config.metadata['cos_endpoint'])
-            self.access_key = config.metadata['cos_username']
-            self.secret_key = config.metadata['cos_password']
+            endpoint = config.metadata['cos_endpoint']
+            access_key = config.metadata['cos_username']
+            secret_key = config.metadata['cos_password']
             if 'cos_secure' in config.metadata.keys():
-                self.secure = config.metadata['cos_secure']
-            else:
-                self.secure = secure
-            self.bucket = config.metadata['cos_bucket']
-        else:
-            self.endpoint = urlparse(endpoint)
-            self.access_key = access_key
-            self.secret_key = secret_key
-            self.secure = secure
-            self.bucket = bucket
+                secure = config.metadata['cos_secure']
+            bucket = config.metadata['cos_bucket']
+        return urlparse(endpoint), access_key, secret_key, secure, bucket
 
-        self.client = self.__initialize_object_store()
+    @classmethod
+    def clear_instances(cls):
+        with cls._instances_lock:
+            cls._instances.clear()
 
     def __initialize_object_store(self):
 
-        # Initialize minioClient with an endpoint and access/secret keys.
+        # Initialize minioClient with an endpoint and access/secret keys.  The connection pool is
+        # sized for the number of concurrent uploads, otherwise matching Minio's default.
+        http_client = urllib3.PoolManager(timeout=urllib3.Timeout.DEFAULT_TIMEOUT,
+                                          maxsize=self.pool_size,
+                                          cert_reqs='CERT_REQUIRED',
+                                          ca_certs=certifi.where(),
+                                          retries=urllib3.Retry(total=5, backoff_factor=0.2,
+                                                                status_forcelist=[500, 502, 503, 504]))
         self.client = Minio(endpoint=self.endpoint.netloc,
                             access_key=self.access_key,
                             secret_key=self.secret_key,
-                            secure=self.secure)
+                            secure=self.secure,
+                            http_client=http_client)
 
+        self.__ensure_bucket()
+        return self.client
+
+    def __ensure_bucket(self):
         # Make a bucket with the make_bucket API call.
         try:
             if not self.client.bucket_exists(self.bucket):
@@ -64,24 +127,214 @@ class CosClient(LoggingConfigurable):
             self.log.error("Object Storage error", exc_info=True)
             raise
 
-        return self.client
-
-    def upload_file(self, file_name, file_path):
+    def upload_file(self, file_name, file_path, part_size=DEFAULT_PART_SIZE, part_workers=DEFAULT_PART_WORKERS,
+                    verify_etags=False):
         """
         Uploads contents from a file, located on the local filesystem at `file_path`,
-        as `file_name` in object storage.
+        as `file_name` in object storage.  Files larger than `part_size` are uploaded in
+        parts (see upload_stream()).
         :param file_name: Name of the file object in object storage
         :param file_path: Path on the local filesystem from which object data will be read.
+        :param part_size: The size of the parts in which large files are uploaded
+        :param part_workers: The maximum number of parts uploaded concurrently
+        :param verify_etags: Whether the ETags returned are verified to be MD5 checksums
         :return:
         """
         try:
-            self.client.fput_object(bucket_name=self.bucket,
-                                    object_name=file_name,
-                                    file_path=file_path)
+            with open(file_path, 'rb') as data:
+                self.__upload(file_name, data, os.path.getsize(file_path), part_size, part_workers, verify_etags)
         except BaseException:
             self.log.error('Error uploading file {} to bucket {}'.format(file_path, self.bucket), exc_info=True)
             raise
 
+    def upload_stream(self, file_name, data, length, part_size=DEFAULT_PART_SIZE, part_workers=DEFAULT_PART_WORKERS,
+                      verify_etags=False):
+        """
+        Uploads contents read from a file object, such as a pipe, as `file_name` in object storage.
+        Contents larger than `part_size` are uploaded as a multipart upload, with up to `part_workers`
+        parts uploaded (and held in memory) concurrently.  Each part is sent with its MD5 checksum
+        (Content-MD5), which object storage verifies, and failed parts are retried.  Should the upload
+        fail nonetheless, the parts already uploaded are reused when the same contents are next
+        uploaded as `file_name`.  The ETags returned are only expected to be the MD5 checksums of the
+        parts (and object) if `verify_etags` is set, since they aren't with some server-side
+        encryption (e.g., SSE-KMS) and S3-compatible services.
+        :param file_name: Name of the file object in object storage
+        :param data: Readable file object from which object data will be read.
+        :param length: The number of bytes to be read from `data`
+        :param part_size: The size of the parts in which large contents are uploaded
+        :param part_workers: The maximum number of parts uploaded concurrently
+        :param verify_etags: Whether the ETags returned are verified to be MD5 checksums
+        :return:
+        """
+        try:
+            self.__upload(file_name, data, length, part_size, part_workers, verify_etags)
+        except BaseException:
+            self.log.error('Error uploading file {} to bucket {}'.format(file_name, self.bucket), exc_info=True)
+            raise
+
+    def __upload(self, file_name, data, length, part_size, part_workers, verify_etags):
+        if part_size < MIN_PART_SIZE:
+            raise ValueError('The part size must be at least {} bytes.'.format(MIN_PART_SIZE))
+
+        if length <= part_size:
+            part_data = CosClient.__read(data, length)
+            self.__retry(self.__put_part, file_name, part_data, hashlib.md5(part_data).digest(), verify_etags)
+            return
+
+        part_count = -(-length // part_size)
+        upload_id, stored_parts = self.__find_incomplete_upload(file_name)
+        if upload_id:
+            self.log.info("Resuming upload of file {} to bucket {}, with {} of its {} parts already uploaded.".
+                          format(file_name, self.bucket, len(stored_parts), part_count))
+        else:
+            upload_id = self.__retry(self.client._new_multipart_upload, self.bucket, file_name)
+
+        # Parts are read in order and uploaded concurrently, with at most part_workers held in memory
+        uploaded_parts = {}
+        futures = []
+        pending_parts = threading.BoundedSemaphore(part_workers)
+        with ThreadPoolExecutor(max_workers=part_workers, thread_name_prefix='CosClientPart') as executor:
+            for part_number in range(1, part_count + 1):
+                if any(future.done() and future.exception() for future in futures):
+                    break
+                part_data = CosClient.__read(data, min(part_size, length - (part_number - 1) * part_size))
+                md5 = hashlib.md5(part_data).digest()
+                # Only parts whose ETag is their MD5 can be recognized (and reused)
+                stored_part = stored_parts.get(part_number)
+                if stored_part and stored_part.etag == md5.hex() and stored_part.size == len(part_data):
+                    uploaded_parts[part_number] = stored_part
+                    continue
+                pending_parts.acquire()
+                future = executor.submit(self.__retry, self.__put_part, file_name, part_data, md5, verify_etags,
+                                         upload_id, part_number)
+                future.add_done_callback(lambda f: pending_parts.release())
+                futures.append(future)
+
+        for future in futures:
+            part = future.result()
+            uploaded_parts[part.part_number] = part
+
+        result = self.__retry(self.client._complete_multipart_upload, self.bucket, file_name, upload_id,
+                              uploaded_parts)
+        if not verify_etags:
+            return
+
+        # The ETag of a multipart object is the MD5 of its parts' MD5s, followed by the number of parts
+        expected_etag = '{}-{}'.format(hashlib.md5(b''.join(bytes.fromhex(uploaded_parts[part_number].etag)
+                                                            for part_number in sorted(uploaded_parts))).hexdigest(),
+                                       part_count)
+        if result.etag.strip('"') != expected_etag:
+            raise ChecksumError('Checksum mismatch uploading file {} to bucket {}: expected ETag {}, got {}.'.
+                                format(file_name, self.bucket, expected_etag, result.etag))
+
+    def __put_part(self, file_name, part_data, md5, verify_etags, upload_id='', part_number=0):
+        """Uploads part_data as a part of a multipart upload or, if no upload_id is given, as
+           the object's contents, along with its MD5 digest md5 for object storage to verify.  If
+           verify_etags, the ETag is also verified against md5.  Returns the UploadPart."""
+        # Minio only sends the Content-MD5 header over TLS
+        headers = {'Content-Md5': base64.b64encode(md5).decode()}
+        try:
+            etag = self.client._do_put_object(self.bucket, file_name, part_data, len(part_data),
+                                              upload_id=upload_id, part_number=part_number, metadata=headers)
+        except NoSuchBucket:
+            if upload_id:
+                raise
+            # The bucket was removed since this (shared) client checked for it
+            self.__ensure_bucket()
+            etag = self.client._do_put_object(self.bucket, file_name, part_data, len(part_data), metadata=headers)
+        if verify_etags and etag != md5.hex():
+            raise ChecksumError('Checksum mismatch uploading part {} of file {} to bucket {}: expected ETag {}, '
+                                'got {}.'.format(part_number, file_name, self.bucket, md5.hex(), etag))
+        return UploadPart(self.bucket, file_name, upload_id, part_number, etag, None, len(part_data))
+
+    def __find_incomplete_upload(self, file_name):
+        """Returns the id and UploadParts, by part number, of the most recent incomplete upload
+           of file_name, or None and no parts if there isn't one"""
+        try:
+            uploads = [upload for upload in self.client._list_incomplete_uploads(self.bucket, prefix=file_name,
+                                                                                 recursive=True,
+                                                                                 is_aggregate_size=False)
+                       if upload.object_name == file_name]
+            if uploads:
+                upload = max(uploads, key=lambda upload: upload.initiated)
+                parts = self.client._list_object_parts(self.bucket, file_name, upload.upload_id)
+                return upload.upload_id, {part.part_number: part for part in parts}
+        except ResponseError:
+            self.log.warning('Error listing incomplete uploads of file {} in bucket {}'.format(file_name, self.bucket),
+                             exc_info=True)
+        return None, {}
+
+    def __retry(self, func, *args):
+        """Calls func, retrying up to PART_RETRIES times should it fail with a checksum mismatch (as
+           detected by object storage or by comparing ETags) or a connection error that persisted
+           through the HTTP client's own retries."""
+        for attempt in range(1, PART_RETRIES + 1):
+            try:
+                return func(*args)
+            except (BadDigest, ChecksumError, urllib3.exceptions.HTTPError) as ex:
+                if attempt == PART_RETRIES:
+                    raise
+                self.log.warning('Retrying failed object storage request ({} of {}): {}'.
+                                 format(attempt, PART_RETRIES - 1, ex))
+
+    @staticmethod
+    def __read(data, length):
+        """Reads exactly length bytes from data, which may return fewer bytes than requested"""
+        chunks = []
+        remaining = length
+        while remaining > 0:
+            chunk = data.read(remaining)
+            if not chunk:
+                raise RuntimeError('Unexpected end of data, {} of {} bytes read.'.format(length - remaining, length))
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b''.join(chunks)
+
+    def remove_file(self, file_name):
+        """
+        Removes an object from object storage.
+        :param file_name: Name of the file object in object storage
+        :return:
+        """
+        try:
+            self.client.remove_object(bucket_name=self.bucket,
+                                      object_name=file_name)
+        except BaseException:
+            self.log.error('Error removing file {} from bucket {}'.format(file_name, self.bucket), exc_info=True)
+            raise
+
+    def file_exists(self, file_name):
+        """
+        Checks (with a HEAD request) whether an object exists in object storage.
+        :param file_name: Name of the file object in object storage
+        :return: True if the object exists
+        """
+        try:
+            self.client.stat_object(bucket_name=self.bucket,
+                                    object_name=file_name)
+        except NoSuchKey:
+            return False
+        except BaseException:
+            self.log.error('Error checking for file {} in bucket {}'.format(file_name, self.bucket), exc_info=True)
+            raise
+        return True
+
+    def copy_file(self, source_file_name, file_name):
+        """
+        Copies an object within the bucket, without transferring its contents through the client.
+        :param source_file_name: Name of the file object to copy
+        :param file_name: Name of the copied file object
+        :return:
+        """
+        try:
+            self.client.copy_object(bucket_name=self.bucket,
+                                    object_name=file_name,
+                                    object_source='/{}/{}'.format(self.bucket, source_file_name))
+        except BaseException:
+            self.log.error('Error copying file {} to {} in bucket {}'.format(source_file_name, file_name, self.bucket),
+                           exc_info=True)
+            raise
+
     def upload_file_to_dir(self, dir, file_name, file_path):
         """
         Uploads contents from a file, located on the local filesystem at `file_path`,
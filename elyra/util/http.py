@@ -15,6 +15,7 @@
 
 """Mixins for Tornado handlers."""
 
+import hashlib
 import json
 import traceback
 
@@ -74,3 +75,21 @@ class HttpErrorMixin(object):
         self.set_header('Content-Type', 'application/json')
         self.set_status(status_code, reason=reply['reason'])
         self.finish(json.dumps(reply))
+
+
+class HttpCacheMixin(object):
+    """Mixes conditional GET support into tornado.web.RequestHandlers so that unchanged
+       resources can be answered with '304 Not Modified' before they are produced.
+    """
+    def check_not_modified(self, *version):
+        """Sets the response's ETag to a strong ETag derived from the parts of version, which must
+           identify the content of the response.  If the ETag matches the request's If-None-Match
+           header, the request is finished with '304 Not Modified' and True is returned.
+        """
+        content = '\0'.join(str(part) for part in version)
+        self.set_header('Etag', '"{}"'.format(hashlib.sha1(content.encode('utf-8')).hexdigest()))
+        if self.check_etag_header():
+            self.set_status(304)
+            self.finish()
+            return True
+        return False
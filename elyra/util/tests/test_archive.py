@@ -20,8 +20,10 @@ import tarfile
 import tempfile
 
 from datetime import datetime
+from unittest import mock
 
-from elyra.util import create_temp_archive
+from elyra.util import create_temp_archive, get_archive_hash, get_file_hash, stream_archive
+from elyra.util.archive import COMPRESSIONS
 
 
 class ArchiveTestCase(unittest.TestCase):
@@ -127,6 +129,95 @@ class ArchiveTestCase(unittest.TestCase):
 
         self.assertArchivedFileCount(archive_path, 0)
 
+    def test_archive_is_reproducible(self):
+        subdir_name = os.path.join(self.test_dir, 'subdir')
+        os.makedirs(subdir_name)
+        self._create_test_files(subdir_name)
+
+        test_archive_name = 'reproducible-' + self.test_timestamp + '.tar.gz'
+        archive_path = create_temp_archive(test_archive_name, self.test_dir, recursive=True)
+        archive_hash = get_file_hash(archive_path)
+
+        # Timestamps don't affect the archive, but contents do
+        os.utime(os.path.join(self.test_dir, 'a.py'), (0, 0))
+        archive_path = create_temp_archive(test_archive_name, self.test_dir, recursive=True)
+        self.assertEqual(archive_hash, get_file_hash(archive_path))
+
+        with open(os.path.join(subdir_name, 'b.py'), 'w') as f:
+            f.write('print("changed")')
+        archive_path = create_temp_archive(test_archive_name, self.test_dir, recursive=True)
+        self.assertNotEqual(archive_hash, get_file_hash(archive_path))
+
+    def test_stream_archive(self):
+        test_archive_name = 'stream-' + self.test_timestamp + '.tar.gz'
+        archive_path = create_temp_archive(test_archive_name, self.test_dir, ['*.py'])
+        with open(archive_path, 'rb') as f:
+            archive = f.read()
+
+        archive_hash, archive_size = get_archive_hash(self.test_dir, ['*.py'])
+        self.assertEqual(archive_hash, get_file_hash(archive_path))
+        self.assertEqual(archive_size, len(archive))
+
+        with stream_archive(self.test_dir, ['*.py'], expected_hash=archive_hash) as stream:
+            self.assertEqual(archive, stream.read())
+
+        with self.assertRaises(RuntimeError):
+            with stream_archive(self.test_dir, ['*.py'], expected_hash=get_file_hash(archive_path)[::-1]) as stream:
+                stream.read()
+
+    def test_archive_compressions(self):
+        subdir_name = os.path.join(self.test_dir, 'subdir')
+        os.makedirs(subdir_name)
+        with open(os.path.join(subdir_name, 'data.txt'), 'w') as f:
+            f.write('0123456789' * 100000)
+        with open(os.path.join(subdir_name, 'image.png'), 'wb') as f:
+            f.write(os.urandom(500000))
+
+        for compression in COMPRESSIONS:
+            test_archive_name = compression + '-' + self.test_timestamp + '.tar.gz'
+            archive_path = create_temp_archive(test_archive_name, self.test_dir, recursive=True,
+                                               compression=compression)
+            self.assertArchivedFileCount(archive_path, 6)
+            with tarfile.open(archive_path, "r:gz") as tar:
+                self.assertEqual(tar.extractfile('subdir/data.txt').read(), b'0123456789' * 100000)
+            self.assertEqual(get_archive_hash(self.test_dir, recursive=True, compression=compression)[0],
+                             get_file_hash(archive_path))
+
+        with self.assertRaises(ValueError):
+            create_temp_archive('unknown-' + self.test_timestamp + '.tar.gz', self.test_dir, compression='zip')
+
+    def test_archive_with_glob_patterns(self):
+        for dir_name in ['data', 'data/raw', 'src', 'src/pkg', 'src/pkg/sub']:
+            os.makedirs(os.path.join(self.test_dir, dir_name))
+            self._create_test_files(os.path.join(self.test_dir, dir_name))
+
+        test_archive_name = 'glob-' + self.test_timestamp + '.tar.gz'
+        archive_path = create_temp_archive(archive_name=test_archive_name,
+                                           source_dir=self.test_dir,
+                                           files=['d.txt', 'data/*.json', 'src/**/b.py', 'src/pkg/sub'],
+                                           recursive=True)
+
+        self.assertArchivedContent(archive_path, ['d.txt', 'data/d.txt', 'data/raw/d.txt', 'data/c.json',
+                                                  'src/d.txt', 'src/b.py', 'src/pkg/d.txt', 'src/pkg/b.py',
+                                                  'src/pkg/sub/a.py', 'src/pkg/sub/b.py', 'src/pkg/sub/c.json',
+                                                  'src/pkg/sub/d.txt'])
+
+    def test_archive_excluded_directories_are_not_walked(self):
+        for dir_name in ['.git/objects', 'node_modules/pkg', 'subdir/.ipynb_checkpoints', 'data']:
+            os.makedirs(os.path.join(self.test_dir, dir_name))
+            self._create_test_files(os.path.join(self.test_dir, dir_name))
+
+        test_archive_name = 'excluded-' + self.test_timestamp + '.tar.gz'
+        with mock.patch('elyra.util.archive.os.scandir', wraps=os.scandir) as scandir:
+            archive_path = create_temp_archive(archive_name=test_archive_name,
+                                               source_dir=self.test_dir,
+                                               files=['data/*.py'],
+                                               recursive=True)
+
+        self.assertArchivedContent(archive_path, ['data/a.py', 'data/b.py'])
+        walked = sorted(os.path.relpath(call[0][0], self.test_dir) for call in scandir.call_args_list)
+        self.assertListEqual(walked, ['.', 'data'])
+
     def assertArchivedContent(self, archive_path, expected_content):
         actual_content = []
         with tarfile.open(archive_path, "r:gz") as tar:
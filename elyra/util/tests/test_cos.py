@@ -0,0 +1,201 @@
+#
+# Copyright 2018-2020 IBM Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import base64
+import hashlib
+import inspect
+import io
+import pytest
+import uuid
+
+from datetime import datetime
+from minio import Minio
+from minio.definitions import IncompleteUpload, MultipartUploadResult, UploadPart
+from minio.error import BadDigest
+from urllib3.exceptions import ProtocolError
+
+from elyra.util import cos
+
+MiB = 1024 * 1024
+
+
+class MockMinio(object):
+    """In-process stand-in for the S3 requests made by CosClient"""
+    bucket_checks = 0
+
+    def __init__(self, endpoint, access_key=None, secret_key=None, secure=False, http_client=None):
+        self.endpoint = endpoint
+        self.http_client = http_client
+        self.objects = {}
+        self.uploads = {}  # upload_id -> (object_name, {part_number: part data})
+        self.puts = []
+        self.failures = {}  # part_number -> list of exceptions raised, or 'corrupt', by its next puts
+        self.md5_etags = True  # whether ETags are MD5 checksums, as they aren't with SSE-KMS
+
+    def bucket_exists(self, bucket_name):
+        MockMinio.bucket_checks += 1
+        return True
+
+    def _do_put_object(self, bucket_name, object_name, part_data, part_size, upload_id='', part_number=0,
+                       metadata=None, sse=None, progress=None):
+        self.puts.append(part_number)
+        failures = self.failures.get(part_number)
+        if failures:
+            failure = failures.pop(0)
+            if failure == 'corrupt':
+                part_data = part_data[1:]
+            else:
+                raise failure
+        if metadata['Content-Md5'] != base64.b64encode(hashlib.md5(part_data).digest()).decode():
+            raise BadDigest(None)
+        if upload_id:
+            self.uploads[upload_id][1][part_number] = part_data
+        else:
+            self.objects[object_name] = part_data
+        return self._get_etag(part_data)
+
+    def _get_etag(self, data):
+        return hashlib.md5(data).hexdigest() if self.md5_etags else uuid.uuid4().hex
+
+    def _new_multipart_upload(self, bucket_name, object_name):
+        upload_id = uuid.uuid4().hex
+        self.uploads[upload_id] = (object_name, {})
+        return upload_id
+
+    def _list_incomplete_uploads(self, bucket_name, prefix='', recursive=False, is_aggregate_size=True):
+        for upload_id, (object_name, _) in self.uploads.items():
+            if object_name.startswith(prefix):
+                yield IncompleteUpload(bucket_name, object_name, upload_id, datetime.now())
+
+    def _list_object_parts(self, bucket_name, object_name, upload_id):
+        for part_number, part_data in self.uploads[upload_id][1].items():
+            yield UploadPart(bucket_name, object_name, upload_id, part_number, self._get_etag(part_data),
+                             None, len(part_data))
+
+    def _complete_multipart_upload(self, bucket_name, object_name, upload_id, uploaded_parts):
+        _, parts = self.uploads.pop(upload_id)
+        self.objects[object_name] = b''.join(parts[part_number] for part_number in sorted(uploaded_parts))
+        etag = hashlib.md5(b''.join(hashlib.md5(parts[part_number]).digest()
+                                    for part_number in sorted(uploaded_parts))).hexdigest()
+        if not self.md5_etags:
+            etag = uuid.uuid4().hex
+        return MultipartUploadResult(bucket_name, object_name, None, '"{}-{}"'.format(etag, len(uploaded_parts)))
+
+
+@pytest.fixture
+def mock_minio(monkeypatch):
+    MockMinio.bucket_checks = 0
+    monkeypatch.setattr(cos, 'Minio', MockMinio)
+    yield MockMinio
+    cos.CosClient.clear_instances()
+
+
+def test_get_instance_reuses_clients(mock_minio):
+    client = cos.CosClient.get_instance(endpoint='http://localhost:9000', access_key='user', secret_key='pass',
+                                        bucket='test-bucket', pool_size=16)
+    assert client.client.http_client.connection_pool_kw['maxsize'] == 16
+    assert mock_minio.bucket_checks == 1
+
+    assert cos.CosClient.get_instance(endpoint='http://localhost:9000', access_key='user', secret_key='pass',
+                                      bucket='test-bucket') is client
+    assert mock_minio.bucket_checks == 1
+
+    # Different settings get their own client
+    other = cos.CosClient.get_instance(endpoint='http://localhost:9000', access_key='user', secret_key='pass',
+                                       bucket='other-bucket')
+    assert other is not client
+    assert mock_minio.bucket_checks == 2
+
+
+@pytest.fixture
+def cos_client(mock_minio):
+    return cos.CosClient(endpoint='http://localhost:9000', access_key='user', secret_key='pass', bucket='test-bucket')
+
+
+def test_upload_small_file(cos_client, tmp_path):
+    file_path = tmp_path / 'small.bin'
+    file_path.write_bytes(b'small')
+    cos_client.upload_file('dir/small.bin', str(file_path))
+    assert cos_client.client.objects['dir/small.bin'] == b'small'
+    assert cos_client.client.puts == [0]
+
+
+def test_upload_parts(cos_client):
+    data = bytes(range(256)) * (22 * MiB // 256)
+    cos_client.upload_stream('large.bin', io.BytesIO(data), len(data), part_size=5 * MiB, part_workers=3)
+    assert cos_client.client.objects['large.bin'] == data
+    assert sorted(cos_client.client.puts) == [1, 2, 3, 4, 5]
+
+
+def test_upload_retries_failed_parts(cos_client):
+    data = bytes(range(256)) * (12 * MiB // 256)
+    cos_client.client.failures = {2: [ProtocolError('Connection reset'), 'corrupt']}
+    cos_client.upload_stream('large.bin', io.BytesIO(data), len(data), part_size=5 * MiB)
+    assert cos_client.client.objects['large.bin'] == data
+    assert sorted(cos_client.client.puts) == [1, 2, 2, 2, 3]
+
+
+def test_upload_resumes(cos_client):
+    data = bytes(range(256)) * (12 * MiB // 256)
+    cos_client.client.failures = {2: [ProtocolError('Connection reset')] * cos.PART_RETRIES}
+    with pytest.raises(ProtocolError):
+        cos_client.upload_stream('large.bin', io.BytesIO(data), len(data), part_size=5 * MiB)
+    assert 'large.bin' not in cos_client.client.objects
+
+    # The parts already uploaded aren't uploaded again when the upload is repeated
+    cos_client.client.puts = []
+    cos_client.upload_stream('large.bin', io.BytesIO(data), len(data), part_size=5 * MiB)
+    assert cos_client.client.objects['large.bin'] == data
+    assert 1 not in cos_client.client.puts and 2 in cos_client.client.puts
+
+
+def test_upload_checksum_mismatch(cos_client):
+    cos_client.client.failures = {0: ['corrupt'] * cos.PART_RETRIES}
+    with pytest.raises(BadDigest):
+        cos_client.upload_stream('small.bin', io.BytesIO(b'small'), 5)
+    assert len(cos_client.client.puts) == cos.PART_RETRIES
+
+
+def test_upload_etags_not_md5(cos_client):
+    # As with SSE-KMS, the ETags aren't MD5 checksums, so they're only verified if requested
+    cos_client.client.md5_etags = False
+    data = bytes(range(256)) * (12 * MiB // 256)
+    cos_client.upload_stream('large.bin', io.BytesIO(data), len(data), part_size=5 * MiB)
+    cos_client.upload_stream('small.bin', io.BytesIO(b'small'), 5)
+    assert cos_client.client.objects == {'large.bin': data, 'small.bin': b'small'}
+
+    with pytest.raises(cos.ChecksumError):
+        cos_client.upload_stream('small.bin', io.BytesIO(b'small'), 5, verify_etags=True)
+
+
+def test_upload_verified_etags(cos_client):
+    data = bytes(range(256)) * (12 * MiB // 256)
+    cos_client.upload_stream('large.bin', io.BytesIO(data), len(data), part_size=5 * MiB, verify_etags=True)
+    assert cos_client.client.objects['large.bin'] == data
+
+
+@pytest.mark.parametrize('method, parameters', [
+    ('_new_multipart_upload', ['bucket_name', 'object_name']),
+    ('_do_put_object', ['bucket_name', 'object_name', 'part_data', 'part_size', 'upload_id', 'part_number',
+                        'metadata']),
+    ('_list_incomplete_uploads', ['bucket_name', 'prefix', 'recursive', 'is_aggregate_size']),
+    ('_list_object_parts', ['bucket_name', 'object_name', 'upload_id']),
+    ('_complete_multipart_upload', ['bucket_name', 'object_name', 'upload_id', 'uploaded_parts']),
+])
+def test_minio_private_methods(method, parameters):
+    # CosClient relies on these private methods of the installed Minio (see cos.py)
+    assert callable(getattr(Minio, method, None))
+    signature = inspect.signature(getattr(Minio, method))
+    assert all(parameter in signature.parameters for parameter in parameters)
@@ -29,6 +29,7 @@ const ERROR_DETAILS_HIDDEN = 'elyra-pipelineSubmission-error-hidden';
 const ERROR_DIALOG_WIDTH = 600;
 const ERROR_DIALOG_HEIGHT = 400;
 const JP_DIALOG_CONTENT = 'jp-Dialog-content';
+const JOB_POLL_INTERVAL = 1000; // ms
 
 export class SubmissionHandler {
   static handleError(
@@ -140,7 +141,11 @@ export class SubmissionHandler {
 
         response.json().then(
           (result: any) => {
-            if (response.status !== 200 && response.status !== 201) {
+            if (
+              response.status !== 200 &&
+              response.status !== 201 &&
+              response.status !== 202
+            ) {
               return this.handleError(result, submissionType);
             }
             return dialogCallback(result);
@@ -154,6 +159,91 @@ export class SubmissionHandler {
     );
   }
 
+  /**
+   * Polls the progress of a pipeline submitted in the background until it
+   * finishes, calling dialogCallback with the completed job.  Polling stops
+   * when the progress dialog is dismissed.
+   */
+  static waitForJob(
+    jobId: string,
+    submissionType: string,
+    dialogCallback: (job: any) => void
+  ): void {
+    const settings = ServerConnection.makeSettings();
+    const requestUrl = URLExt.join(settings.baseUrl, 'api/scheduler', jobId);
+
+    const waitDialog = new Dialog({
+      title: 'Submitting pipeline...',
+      body: 'This may take some time',
+      buttons: [Dialog.okButton()]
+    });
+    let dismissed = false;
+    let pollTimer: any = null;
+    waitDialog.launch().then(() => {
+      dismissed = true;
+      clearTimeout(pollTimer);
+    });
+
+    const requestOptions = { method: 'GET' };
+    const poll = (): void => {
+      ServerConnection.makeRequest(requestUrl, requestOptions, settings)
+        .then((response: any) =>
+          response.json().then(
+            (job: any) => {
+              if (dismissed) {
+                return;
+              }
+              if (response.status !== 200 || job.status === 'failed') {
+                waitDialog.resolve();
+                return this.handleError(job, submissionType);
+              }
+              if (job.status === 'completed') {
+                waitDialog.resolve();
+                return dialogCallback(job);
+              }
+              pollTimer = setTimeout(poll, JOB_POLL_INTERVAL);
+            },
+            (reason: any) => {
+              if (dismissed) {
+                return;
+              }
+              waitDialog.resolve();
+              if (response.status === 404) {
+                return this.handle404(submissionType);
+              }
+              return this.handleError(
+                {
+                  reason:
+                    'Error ' + response.status + ' ' + response.statusText,
+                  message:
+                    'The progress of the ' +
+                    submissionType +
+                    ' could not be retrieved.'
+                },
+                submissionType
+              );
+            }
+          )
+        )
+        .catch((reason: any) => {
+          // Network errors (or errors raised above)
+          if (dismissed) {
+            return;
+          }
+          waitDialog.resolve();
+          return this.handleError(
+            {
+              reason: 'Error retrieving the progress of the ' + submissionType,
+              message:
+                reason && reason.message ? reason.message : String(reason)
+            },
+            submissionType
+          );
+        });
+    };
+    poll();
+  }
+
   static submitPipeline(
     pipeline: any,
     runtime_config: string,
@@ -168,25 +258,26 @@ export class SubmissionHandler {
       submissionType,
       (data: any) => {
         const exporting = pipeline.pipelines[0]['app_data']['export'];
-        let dialogTitle = '';
-        let dialogBody = <p></p>;
         if (exporting) {
-          dialogTitle = 'Pipeline export succeeded';
-        } else {
-          dialogTitle = 'Job submission to ' + runtime_config + ' succeeded';
-          dialogBody = (
-            <p>
-              Check the status of your run at{' '}
-              <a href={data.url} target="_blank" rel="noopener noreferrer">
-                Run Details
-              </a>
-            </p>
-          );
+          return showDialog({
+            title: 'Pipeline export succeeded',
+            body: <p></p>,
+            buttons: [Dialog.okButton()]
+          });
         }
-        return showDialog({
-          title: dialogTitle,
-          body: dialogBody,
-          buttons: [Dialog.okButton()]
+        return this.waitForJob(data.job_id, submissionType, (job: any) => {
+          return showDialog({
+            title: 'Job submission to ' + runtime_config + ' succeeded',
+            body: (
+              <p>
+                Check the status of your run at{' '}
+                <a href={job.url} target="_blank" rel="noopener noreferrer">
+                  Run Details
+                </a>
+              </p>
+            ),
+            buttons: [Dialog.okButton()]
+          });
         });
       }
     );
@@ -51,7 +51,7 @@ setup_args = dict(
         "kfp==0.5.1",
         "kfp-notebook>=0.8.0",
         "kfp-server-api==0.5.0",
-        "minio>=5.0.10",
+        "minio>=5.0.10,<7.0.0",
         'nbdime>=2.0.0',
         'jupyterlab>=2.0.0',
         'jupyterlab-git>=0.20.0',